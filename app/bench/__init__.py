@@ -0,0 +1,56 @@
+# app/bench: reproducible benchmarks whose results are saved as JSON so runs
+# on different commits can be compared.
+#
+#   python -m app.bench.micro                 # engine microbenchmarks
+#   python -m app.bench.load --games 500      # end-to-end load against local uvicorn services
+#   python -m app.bench.compare OLD.json NEW.json
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+# Where results are written unless --out says otherwise
+RESULTS_DIR = os.environ.get("BENCH_RESULTS_DIR", "bench_results")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def percentiles(samples: List[float], points=(50, 90, 99)) -> dict:
+    """Nearest-rank percentiles plus mean / max of ``samples`` (any unit)."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    n = len(ordered)
+    summary = {"count": n, "mean": sum(ordered) / n, "max": ordered[-1]}
+    for p in points:
+        summary[f"p{p}"] = ordered[min(n - 1, max(0, int(round(p / 100 * n)) - 1))]
+    return summary
+
+
+def save_results(suite: str, params: dict, metrics: dict, out_dir: str = RESULTS_DIR) -> str:
+    """Write one run as ``<out_dir>/<suite>-<commit>-<timestamp>.json`` and return the path."""
+    commit = git_commit() or "nogit"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    record = {
+        "suite": suite,
+        "commit": commit,
+        "timestamp": stamp,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": params,
+        "metrics": metrics,
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{suite}-{commit}-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2, sort_keys=True)
+    return path
@@ -0,0 +1,65 @@
+# app/bench/compare.py
+#
+# Compare two saved benchmark runs metric by metric:
+#
+#   python -m app.bench.compare bench_results/micro-abc123-....json bench_results/micro-def456-....json
+import argparse
+import json
+
+# Metrics where a larger number is better; everything else is a cost
+HIGHER_IS_BETTER = ("per_sec", "games_completed", "moves")
+# Sizes of the run, not results
+IGNORED = ("ops", "count")
+
+
+def flatten(metrics: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in metrics.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(old: dict, new: dict, threshold: float = 0.05):
+    """Rows of (metric, old, new, relative change, verdict)."""
+    a, b = flatten(old["metrics"]), flatten(new["metrics"])
+    rows = []
+    for name in sorted(a.keys() & b.keys()):
+        if name.rsplit(".", 1)[-1] in IGNORED:
+            continue
+        before, after = a[name], b[name]
+        change = (after - before) / before if before else 0.0
+        better = change > 0 if any(tag in name for tag in HIGHER_IS_BETTER) else change < 0
+        verdict = "" if abs(change) < threshold else ("better" if better else "WORSE")
+        rows.append((name, before, after, change, verdict))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.05, help="relative change worth flagging")
+    parser.add_argument("--all", action="store_true", help="also list unchanged metrics")
+    args = parser.parse_args(argv)
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    print(f"{old['suite']}: {old['commit']} ({old['timestamp']}) -> {new['commit']} ({new['timestamp']})")
+    worse = 0
+    for name, before, after, change, verdict in compare(old, new, args.threshold):
+        if verdict or args.all:
+            print(f"  {name:<40} {before:>14.4g} -> {after:>14.4g}  {change:+7.1%}  {verdict}")
+        worse += verdict == "WORSE"
+    print(f"{worse} metric(s) worse by more than {args.threshold:.0%}")
+    return 1 if worse else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,257 @@
+# app/bench/load.py
+#
+# End-to-end load test: starts the user, room and game services with uvicorn
+# on free local ports, then simulated clients register, create / join rooms,
+# start games and play them to the end over /ws/{room_id}.
+#
+#   python -m app.bench.load --games 500 --concurrency 200
+#   python -m app.bench.load --games 2000 --external   # services already running on 8001-8003
+#
+# Reports per-step REST latency percentiles, move round-trip percentiles,
+# moves per second and game-service memory per game, and saves them as JSON.
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+from websockets.asyncio.client import connect
+
+from app.bench import RESULTS_DIR, percentiles, save_results
+
+SERVICES = [
+    ("user", "app.user.user_service:app", "USER_SERVICE_URL"),
+    ("room", "app.room.room_service:app", "ROOM_SERVICE_URL"),
+    ("game", "app.game.services.game_service:app", "GAME_SERVICE_URL"),
+]
+DEFAULT_PORTS = {"user": 8001, "game": 8002, "room": 8003}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident set size of a process (Linux /proc); 0 where unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class Cluster:
+    """The three services as uvicorn subprocesses wired to each other's ports."""
+
+    def __init__(self):
+        self.ports = {name: free_port() for name, _, _ in SERVICES}
+        self.procs = {}
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.ports[name]}"
+
+    def start(self):
+        env = dict(os.environ)
+        for name, _, var in SERVICES:
+            env[var] = self.url(name)
+        env.setdefault("BOT_MOVE_DELAY", "0")
+        # simulated clients fire as fast as the server answers
+        env.setdefault("WS_ACTION_RATE", "1000000")
+        env.setdefault("WS_ACTION_BURST", "1000000")
+        for name, app, _ in SERVICES:
+            self.procs[name] = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", app, "--port", str(self.ports[name]),
+                 "--log-level", "warning", "--no-access-log"],
+                env=env,
+            )
+
+    def stop(self):
+        for proc in self.procs.values():
+            proc.terminate()
+        for proc in self.procs.values():
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+async def wait_ready(session: httpx.AsyncClient, urls, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    for url in urls:
+        while True:
+            try:
+                if (await session.get(url)).status_code < 500:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} did not come up")
+            await asyncio.sleep(0.2)
+
+
+class Stats:
+    def __init__(self):
+        self.rest = {"register": [], "create_room": [], "join_room": [], "start_game": []}
+        self.moves = []          # seconds from sending a move to seeing its move_made
+        self.errors = 0
+        self.games_done = 0
+
+
+async def timed(stats: Stats, step: str, call):
+    start = time.perf_counter()
+    r = await call
+    stats.rest[step].append(time.perf_counter() - start)
+    if r.status_code != 200:
+        stats.errors += 1
+        raise RuntimeError(f"{step} -> {r.status_code}")
+    return r.json()
+
+
+async def play_side(ws_base: str, room_id: str, player: str, stats: Stats, rng: random.Random):
+    """One player's socket: fire at unshot cells on every turn until there is a winner."""
+    cells = [(r, c) for r in range(12) for c in range(12)]
+    rng.shuffle(cells)
+    sent_at = None
+    async with connect(f"{ws_base}/ws/{room_id}?player={player}&v=2", ping_interval=None) as ws:
+        while True:
+            msg = json.loads(await ws.recv())
+            event = msg.get("event")
+            if event == "ping":
+                await ws.send(json.dumps({"action": "pong"}))
+                continue
+            if event == "move_made" and msg.get("by") == player and sent_at is not None:
+                stats.moves.append(time.perf_counter() - sent_at)
+                sent_at = None
+            if msg.get("winner"):
+                return
+            if event == "connected" and msg.get("message") == "waiting_for_game":
+                continue
+            if msg.get("current_turn") == player and sent_at is None and cells:
+                row, col = cells.pop()
+                sent_at = time.perf_counter()
+                await ws.send(json.dumps({"action": "move", "row": row, "col": col}))
+
+
+async def play_game(session, urls, index: int, stats: Stats, rng: random.Random):
+    tag = uuid.uuid4().hex[:8]
+    host, guest, room_id = f"h{index}_{tag}", f"g{index}_{tag}", f"load_{index}_{tag}"
+    for name in (host, guest):
+        await timed(stats, "register", session.post(f"{urls['user']}/register", json={"username": name}))
+    await timed(stats, "create_room", session.post(
+        f"{urls['room']}/create_room", json={"room_id": room_id, "host_player": host}))
+    await timed(stats, "join_room", session.post(
+        f"{urls['room']}/join_room", json={"room_id": room_id, "guest_player": guest}))
+    await timed(stats, "start_game", session.post(
+        f"{urls['room']}/start_game/{room_id}", params={"username": host}))
+
+    ws_base = urls["game"].replace("http://", "ws://")
+    await asyncio.gather(
+        play_side(ws_base, room_id, host, stats, random.Random(rng.random())),
+        play_side(ws_base, room_id, guest, stats, random.Random(rng.random())),
+    )
+    stats.games_done += 1
+
+
+async def run_load(urls, games: int, concurrency: int, seed: int = 0, game_pid: int = None) -> dict:
+    stats = Stats()
+    rng = random.Random(seed)
+    limit = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as session:
+        await wait_ready(session, [f"{urls['user']}/users/_", f"{urls['room']}/internal/rooms",
+                                   f"{urls['game']}/registry"])
+        rss_before = rss_bytes(game_pid) if game_pid else 0
+
+        async def one(i):
+            async with limit:
+                try:
+                    await play_game(session, urls, i, stats, rng)
+                except Exception:
+                    stats.errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(games)))
+        elapsed = time.perf_counter() - start
+
+        registry = (await session.get(f"{urls['game']}/registry")).json()
+        rss_after = rss_bytes(game_pid) if game_pid else 0
+
+    ms = lambda xs: percentiles([x * 1000 for x in xs])
+    games_held = max(1, sum(registry.get("games", {}).values()))
+    return {
+        "seconds": elapsed,
+        "games_completed": stats.games_done,
+        "errors": stats.errors,
+        "games_per_sec": stats.games_done / elapsed,
+        "moves": len(stats.moves),
+        "moves_per_sec": len(stats.moves) / elapsed,
+        "move_rtt_ms": ms(stats.moves),
+        "rest_ms": {step: ms(samples) for step, samples in stats.rest.items()},
+        "memory": {
+            "approx_bytes_per_game": registry.get("approx_bytes_per_game"),
+            "rss_growth_bytes": rss_after - rss_before if game_pid else None,
+            "rss_growth_per_game": (rss_after - rss_before) / games_held if game_pid else None,
+        },
+    }
+
+
+def print_report(metrics: dict):
+    print(f"{metrics['games_completed']} games in {metrics['seconds']:.1f}s "
+          f"({metrics['games_per_sec']:.1f} games/s), errors {metrics['errors']}")
+    rtt = metrics["move_rtt_ms"]
+    if rtt["count"]:
+        print(f"moves: {metrics['moves']}  {metrics['moves_per_sec']:.0f}/s  "
+              f"rtt p50 {rtt['p50']:.2f}ms  p90 {rtt['p90']:.2f}ms  p99 {rtt['p99']:.2f}ms  max {rtt['max']:.2f}ms")
+    for step, s in metrics["rest_ms"].items():
+        if s["count"]:
+            print(f"{step:<12} p50 {s['p50']:7.2f}ms  p90 {s['p90']:7.2f}ms  p99 {s['p99']:7.2f}ms")
+    mem = metrics["memory"]
+    print(f"memory: ~{mem['approx_bytes_per_game']} B/game (registry estimate)"
+          + (f", RSS +{mem['rss_growth_per_game']:.0f} B/game" if mem["rss_growth_per_game"] is not None else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end load test of the three services.")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100, help="games in flight (2 sockets each)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--external", action="store_true",
+                        help="use services already running on ports 8001-8003 instead of starting them")
+    parser.add_argument("--out", default=RESULTS_DIR, help="results directory")
+    args = parser.parse_args(argv)
+
+    cluster = None
+    if args.external:
+        urls = {name: f"http://127.0.0.1:{port}" for name, port in DEFAULT_PORTS.items()}
+        game_pid = None
+    else:
+        cluster = Cluster()
+        cluster.start()
+        urls = {name: cluster.url(name) for name in cluster.ports}
+        game_pid = cluster.procs["game"].pid
+
+    try:
+        print(f"=== Load: {args.games} games, {args.concurrency} concurrent ===")
+        metrics = asyncio.run(run_load(urls, args.games, args.concurrency, args.seed, game_pid))
+    finally:
+        if cluster:
+            cluster.stop()
+
+    print_report(metrics)
+    params = {"games": args.games, "concurrency": args.concurrency, "seed": args.seed, "external": args.external}
+    print(f"\nresults: {save_results('load', params, metrics, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# app/bench/micro.py
+#
+# Microbenchmarks for the game engine hot paths:
+#
+#   python -m app.bench.micro [--repeat 7] [--out bench_results]
+#
+# Every case is timed ``repeat`` times over a fixed number of operations;
+# the median per-operation time is the headline figure. The encode_* cases
+# compare the JSON backends of app.serialization (each one installed here)
+# with the plain dict + json.dumps path the game service used before.
+import argparse
+import json
+import random
+import time
+
+from app import serialization
+from app.bench import RESULTS_DIR, percentiles, save_results
+from app.game.events import MoveDelta
+from app.game.game_manager import GameManager
+from app.game.logic import Board, BitBoard, BOARD_SIZE, SHIP_SPECS
+from app.game.services.game_service import move_delta, serialize_boards, with_boards
+
+
+def _boards(cls, count, seed):
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = cls()
+        board.auto_place_all_ships(rng)
+        boards.append(board)
+    return boards
+
+
+def bench_place_ship(cls, ops):
+    """One whole fleet per op via place_ship, as auto_place_all_ships does."""
+    rng = random.Random(1)
+    boards = [cls() for _ in range(ops)]
+    start = time.perf_counter()
+    for board in boards:
+        for name, (length, width, count) in SHIP_SPECS.items():
+            for i in range(count):
+                board.place_ship(f"{name}#{i+1}" if count > 1 else name, length, width, rng)
+    return time.perf_counter() - start
+
+
+def bench_receive_shot(cls, ops):
+    """Every cell of fresh boards shot once, in random order (a realistic hit / miss mix)."""
+    cells = BOARD_SIZE * BOARD_SIZE
+    boards = _boards(cls, -(-ops // cells), 2)
+    rng = random.Random(3)
+    shots = []
+    for board in boards:
+        order = [divmod(c, BOARD_SIZE) for c in range(cells)]
+        rng.shuffle(order)
+        shots.extend((board, row, col) for row, col in order)
+    shots = shots[:ops]
+    start = time.perf_counter()
+    for board, row, col in shots:
+        board.receive_shot(row, col)
+    return time.perf_counter() - start
+
+
+def bench_auto_place(cls, ops):
+    """The fleet placement path games actually use (precomputed position tables)."""
+    rng = random.Random(1)
+    boards = [cls() for _ in range(ops)]
+    start = time.perf_counter()
+    for board in boards:
+        board.auto_place_all_ships(rng)
+    return time.perf_counter() - start
+
+
+def bench_all_sunk(cls, ops):
+    boards = _boards(cls, 64, 4)
+    for board in boards[::2]:
+        for _ in range(60):
+            board.receive_shot(random.randrange(BOARD_SIZE), random.randrange(BOARD_SIZE))
+    start = time.perf_counter()
+    for i in range(ops):
+        boards[i & 63].all_sunk()
+    return time.perf_counter() - start
+
+
+def _games(count, cls):
+    """Games 30 moves in, so both boards and views carry hits and misses."""
+    games = []
+    for i in range(count):
+        game = GameManager("p1", "p2", board_cls=cls, seed=i)
+        for _ in range(30):
+            game.make_move(game.current_turn, random.randrange(BOARD_SIZE), random.randrange(BOARD_SIZE))
+        games.append(game)
+    return games
+
+
+def bench_serialize_boards(cls, ops):
+    """serialize_boards() plus JSON encoding, as the protocol-1 move_made path used to do."""
+    games = _games(32, cls)
+    start = time.perf_counter()
+    for i in range(ops):
+        json.dumps(serialize_boards(games[i & 31], "p1"), separators=(",", ":"))
+    return time.perf_counter() - start
+
+
+def bench_with_boards(cls, ops):
+    """The cached path the service uses now: splice pre-encoded boards, re-encode after each move."""
+    games = _games(32, cls)
+    rng = random.Random(5)
+    start = time.perf_counter()
+    for i in range(ops):
+        game = games[i & 31]
+        if i % 2 == 0:
+            game.make_move(game.current_turn, rng.randrange(BOARD_SIZE), rng.randrange(BOARD_SIZE))
+        with_boards({"event": "move_made"}, game, "p1")
+    return time.perf_counter() - start
+
+
+def _deltas(count):
+    """Field values of real protocol-2 move_made events."""
+    events = []
+    rng = random.Random(6)
+    for game in _games(count, BitBoard):
+        by = game.current_turn
+        seq = game.seq
+        result = game.make_move(by, rng.randrange(BOARD_SIZE), rng.randrange(BOARD_SIZE))
+        move = game.last_move if game.seq != seq else None
+        event = move_delta(game, "room_1", by, 0, 0, result, move)
+        events.append({name: getattr(event, name) for name in MoveDelta.__dataclass_fields__ if name != "event"})
+    return events
+
+
+def bench_encode_move_dict(codec, ops):
+    """Before: a dict per move_made through stdlib json.dumps (what Starlette's send_json does)."""
+    events = _deltas(32)
+    start = time.perf_counter()
+    for i in range(ops):
+        json.dumps({"event": "move_made", **events[i & 31]}, separators=(",", ":"), ensure_ascii=False)
+    return time.perf_counter() - start
+
+
+def bench_encode_move_struct(codec, ops):
+    """After: a typed MoveDelta through the serialization backend."""
+    events = _deltas(32)
+    dumps = codec.dumps
+    start = time.perf_counter()
+    for i in range(ops):
+        dumps(MoveDelta(**events[i & 31]))
+    return time.perf_counter() - start
+
+
+def bench_encode_board(codec, ops):
+    """One 12x12 grid of one-letter strings, the bulk of every full-board frame."""
+    grids = [game.views["p1"] for game in _games(32, BitBoard)]
+    dumps = codec.dumps
+    start = time.perf_counter()
+    for i in range(ops):
+        dumps(grids[i & 31])
+    return time.perf_counter() - start
+
+
+def _codec_cases():
+    cases = [("encode_move_made/dict+json", bench_encode_move_dict, None, 100_000)]
+    for name in serialization.available():
+        codec = serialization.select(name)
+        cases.append((f"encode_move_made/struct+{name}", bench_encode_move_struct, codec, 100_000))
+        cases.append((f"encode_board/{name}", bench_encode_board, codec, 50_000))
+    return cases
+
+
+CASES = [
+    ("place_ship/Board", bench_place_ship, Board, 2_000),
+    ("place_ship/BitBoard", bench_place_ship, BitBoard, 2_000),
+    ("auto_place/Board", bench_auto_place, Board, 2_000),
+    ("auto_place/BitBoard", bench_auto_place, BitBoard, 2_000),
+    ("receive_shot/Board", bench_receive_shot, Board, 144_000),
+    ("receive_shot/BitBoard", bench_receive_shot, BitBoard, 144_000),
+    ("all_sunk/Board", bench_all_sunk, Board, 200_000),
+    ("all_sunk/BitBoard", bench_all_sunk, BitBoard, 200_000),
+    ("serialize_boards/Board", bench_serialize_boards, Board, 20_000),
+    ("serialize_boards/BitBoard", bench_serialize_boards, BitBoard, 20_000),
+    ("with_boards/BitBoard", bench_with_boards, BitBoard, 20_000),
+    *_codec_cases(),
+]
+
+
+def run(repeat: int = 7, only=None) -> dict:
+    metrics = {}
+    for name, fn, cls, ops in CASES:
+        if only and not any(o in name for o in only):
+            continue
+        fn(cls, max(1, ops // 10))  # warm-up (caches, position tables)
+        per_op = [fn(cls, ops) / ops * 1e9 for _ in range(repeat)]
+        summary = percentiles(per_op, points=(50,))
+        metrics[name] = {"ops": ops, "ns_per_op": summary["p50"], "ns_per_op_min": min(per_op),
+                         "ns_per_op_max": summary["max"]}
+        print(f"{name:<28} {summary['p50']:>12.0f} ns/op   (min {min(per_op):.0f}, max {summary['max']:.0f})")
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Game engine microbenchmarks.")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--only", nargs="*", help="run only cases whose name contains one of these")
+    parser.add_argument("--out", default=RESULTS_DIR, help="results directory")
+    args = parser.parse_args(argv)
+
+    random.seed(1234)
+    print("=== Engine microbenchmarks (median of %d runs) ===" % args.repeat)
+    metrics = run(args.repeat, args.only)
+    params = {"repeat": args.repeat, "only": args.only}
+    path = save_results("micro", params, metrics, args.out)
+    print(f"\nresults: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,18 @@ import shlex
 import sys
 from app.cli.utils import wait_for_service, async_input, print_board
 from app.cli.game_client import GameClient
+from app.cli.lobby_watcher import LobbyWatcher
 
 ROOM_SERVICE = "http://127.0.0.1:8003"
 USER_SERVICE = "http://127.0.0.1:8001"
 GAME_SERVICE = "http://127.0.0.1:8002"
 
+# Rooms per list_rooms page
+ROOMS_PAGE = 20
+
+# Player name that makes the game service seat its bot (BOT_PLAYER_NAME there)
+BOT_PLAYER = "bot"
+
 HELP_TEXT = """
 Available commands:
   register <username>
@@ -17,9 +24,16 @@ Available commands:
   list_users
   create_room <room_id>
   join_room <room_id>
-  list_rooms
+  list_rooms [status|all]   # open rooms by default, newest first
+  list_rooms next           # next page of the last listing
+  watch_rooms [mine|<room_id>]  # live lobby events (all rooms by default)
+  unwatch                   # stop watch_rooms
+  play                      # queue for an automatic opponent
+  cancel_play               # leave the matchmaking queue
   start_game <room_id>
+  practice                  # start a game against the computer and connect to it
   connect <room_id>         # connect websocket to game
+  spectate <room_id>        # watch a game (both fog-of-war boards)
   board                     # show your board (if connected)
   shoot <row> <col>         # fire at row,col (0-based, 0..11)
   leave                     # leave current game (disconnect ws)
@@ -52,6 +66,9 @@ async def repl():
     async with aiohttp.ClientSession() as session:
         current_user = None
         gc: GameClient | None = None
+        rooms_query = None  # query of the last list_rooms page, for "list_rooms next"
+        watcher = LobbyWatcher(session)
+        match_watcher: LobbyWatcher | None = None
 
         while True:
             try:
@@ -75,6 +92,9 @@ async def repl():
             if cmd == "exit":
                 if gc:
                     await gc.disconnect()
+                await watcher.stop()
+                if match_watcher:
+                    await match_watcher.stop()
                 print("Bye.")
                 return
 
@@ -134,8 +154,76 @@ async def repl():
                 continue
 
             if cmd == "list_rooms":
-                status, data = await call_get(session, f"{ROOM_SERVICE}/list_rooms")
+                if args and args[0] == "next":
+                    if not rooms_query or rooms_query.get("cursor") is None:
+                        print("No more rooms.")
+                        continue
+                else:
+                    which = args[0] if args else "waiting"
+                    rooms_query = {"limit": ROOMS_PAGE}
+                    if which != "all":
+                        rooms_query["status"] = which
+                query = "&".join(f"{k}={v}" for k, v in rooms_query.items())
+                status, data = await call_get(session, f"{ROOM_SERVICE}/rooms?{query}")
+                if status != 200:
+                    print(data)
+                    continue
+                for room in data["rooms"]:
+                    print(f"  {room['room_id']:<16} host={room['host']:<12} guest={room['guest'] or '-':<12} {room['status']}")
+                if not data["rooms"]:
+                    print("No rooms.")
+                rooms_query["cursor"] = data["next_cursor"]
+                if data["next_cursor"] is not None:
+                    print(f"  ... {data['total']} in total, 'list_rooms next' for more")
+                continue
+
+            if cmd == "watch_rooms":
+                await watcher.stop()
+                if args and args[0] == "mine":
+                    if not current_user:
+                        print("You must register/login first.")
+                        continue
+                    await watcher.start(player=current_user)
+                elif args:
+                    await watcher.start(room_id=args[0])
+                else:
+                    await watcher.start()
+                continue
+
+            if cmd == "unwatch":
+                if watcher.running:
+                    await watcher.stop()
+                    print("Stopped watching rooms.")
+                else:
+                    print("Not watching rooms.")
+                continue
+
+            if cmd == "play":
+                if not current_user:
+                    print("You must register/login first.")
+                    continue
+                # listen first so the match_found event cannot be missed
+                if match_watcher:
+                    await match_watcher.stop()
+                match_watcher = LobbyWatcher(session, current_user, quiet=True)
+                await match_watcher.start(player=current_user, events="match_found")
+                status, data = await call_post(session, f"{ROOM_SERVICE}/matchmaking/join", {"username": current_user})
+                if status == 200:
+                    print(f"Queued for a match (position {data['position']}).")
+                else:
+                    print(data)
+                    await match_watcher.stop()
+                continue
+
+            if cmd == "cancel_play":
+                if not current_user:
+                    print("You must register/login first.")
+                    continue
+                status, data = await call_post(session, f"{ROOM_SERVICE}/matchmaking/leave", {"username": current_user})
                 print(data)
+                if match_watcher:
+                    await match_watcher.stop()
+                    match_watcher = None
                 continue
 
             if cmd == "start_game":
@@ -171,6 +259,31 @@ async def repl():
                 await gc.connect(rid)
                 continue
 
+            if cmd == "spectate":
+                if len(args) != 1:
+                    print("Usage: spectate <room_id>")
+                    continue
+                if gc:
+                    await gc.disconnect()
+                gc = GameClient(session, current_user or "", spectator=True)
+                await gc.connect(args[0])
+                continue
+
+            if cmd == "practice":
+                if not current_user:
+                    print("You must register/login first.")
+                    continue
+                status, data = await call_post(session, f"{GAME_SERVICE}/game/create",
+                                               {"player1": current_user, "player2": BOT_PLAYER})
+                if status != 200:
+                    print(data)
+                    continue
+                if gc:
+                    await gc.disconnect()
+                gc = GameClient(session, current_user)
+                await gc.connect(data["room_id"])
+                continue
+
             if cmd == "board":
                 if not gc or not gc.own_board:
                     print("No board available. Connect to a game first.")
@@ -7,11 +7,15 @@ from .utils import print_board
 
 GAME_WS_BASE = "ws://127.0.0.1:8002/ws"
 
+# Delta protocol: move_made carries only the changed cells (see game_service)
+PROTOCOL_VERSION = 2
+
 
 class GameClient:
-    def __init__(self, session: ClientSession, username: str):
+    def __init__(self, session: ClientSession, username: str, spectator: bool = False):
         self.session = session
         self.username = username
+        self.spectator = spectator  # watch only: both fog-of-war boards, no shots
 
         self.ws = None
         self.listener_task: Optional[asyncio.Task] = None
@@ -22,6 +26,8 @@ class GameClient:
 
         self.own_board = None
         self.opponent_view = None
+        self.public_boards = None  # spectators: player -> their board as the opponent sees it
+        self.seq = 0
 
         self._connected = asyncio.Event()
 
@@ -34,7 +40,9 @@ class GameClient:
             return
 
         self.room_id = room_id
-        ws_url = f"{GAME_WS_BASE}/{room_id}?player={self.username}"
+        ws_url = f"{GAME_WS_BASE}/{room_id}?player={self.username}&v={PROTOCOL_VERSION}"
+        if self.spectator:
+            ws_url += "&role=spectator"
 
         try:
             self.ws = await self.session.ws_connect(ws_url)
@@ -95,6 +103,16 @@ class GameClient:
     async def _handle_event(self, data: dict):
         event = data.get("event")
 
+        # --------------------------
+        # HEARTBEAT
+        # --------------------------
+        if event == "ping":
+            try:
+                await self.ws.send_json({"action": "pong"})
+            except Exception:
+                pass
+            return
+
         # --------------------------
         # CONNECTED
         # --------------------------
@@ -102,9 +120,7 @@ class GameClient:
             print("ℹ️", data.get("message", "Connected."))
 
             if data.get("boards"):
-                boards = data["boards"]
-                self.own_board = boards.get("self")
-                self.opponent_view = boards.get("opponent")
+                self._load_snapshot(data)
 
             self.current_turn = data.get("current_turn")
             self.winner = data.get("winner")
@@ -113,6 +129,7 @@ class GameClient:
             if self.own_board:
                 print("Your board:")
                 print_board(self.own_board)
+            self._print_public()
 
             self._connected.set()
             return
@@ -122,10 +139,35 @@ class GameClient:
         # --------------------------
         if event == "game_created":
             print("🚀 Game created:", data.get("players"))
+            if data.get("boards"):
+                self._load_snapshot(data)
             self.current_turn = data.get("current_turn")
             print(f"Current turn: {self.current_turn}")
             return
 
+        # --------------------------
+        # RESYNC (full snapshot after a gap)
+        # --------------------------
+        if event == "resync":
+            self._load_snapshot(data)
+            self.current_turn = data.get("current_turn")
+            self.winner = data.get("winner")
+            print(f"🔄 Resynced at move {self.seq}. Current turn: {self.current_turn}")
+            return
+
+        # --------------------------
+        # RESUME (just the moves missed since our seq)
+        # --------------------------
+        if event == "resume":
+            for seq, _, target, row, col, result in data.get("moves", []):
+                if seq == self.seq + 1:
+                    self._apply(target, row, col, result)
+                    self.seq = seq
+            self.current_turn = data.get("current_turn")
+            self.winner = data.get("winner")
+            print(f"🔄 Caught up to move {self.seq}. Current turn: {self.current_turn}")
+            return
+
         # --------------------------
         # MOVE MADE
         # --------------------------
@@ -140,10 +182,20 @@ class GameClient:
             self.current_turn = data.get("current_turn")
             self.winner = data.get("winner")
 
-            # update your private board + opponent fog
-            boards = data.get("boards", {})
-            self.own_board = boards.get("self")
-            self.opponent_view = boards.get("opponent")
+            # apply the changed cells to your private board / opponent fog
+            seq = data.get("seq", 0)
+            if seq > self.seq + 1:
+                # missed at least one move: ask for just those
+                await self._request_resume()
+            elif seq == self.seq + 1:
+                if self.spectator:
+                    board = (self.public_boards or {}).get(data.get("target"))
+                else:
+                    board = self.own_board if data.get("target") == self.username else self.opponent_view
+                if board:
+                    for r, c, mark in data.get("cells", []):
+                        board[r][c] = mark
+                self.seq = seq
 
             print(f"Next turn: {self.current_turn}")
 
@@ -154,6 +206,7 @@ class GameClient:
             if self.opponent_view:
                 print("\nOpponent (fog-of-war):")
                 print_board(self.opponent_view)
+            self._print_public()
 
             if self.winner:
                 print(f"\n🏆 Winner: {self.winner}")
@@ -168,6 +221,37 @@ class GameClient:
 
         print("Event:", data)
 
+    def _apply(self, target: str, row: int, col: int, result: str):
+        """Mark one logged move on the board it hit (protocol-2 "resume" entries)."""
+        if result == "already":
+            return
+        if self.spectator:
+            board = (self.public_boards or {}).get(target)
+        else:
+            board = self.own_board if target == self.username else self.opponent_view
+        if board:
+            board[row][col] = "M" if result == "miss" else "X"
+
+    def _load_snapshot(self, data: dict):
+        boards = data.get("boards") or {}
+        if self.spectator:
+            self.public_boards = boards
+        else:
+            self.own_board = boards.get("self")
+            self.opponent_view = boards.get("opponent")
+        self.seq = data.get("seq", 0)
+
+    def _print_public(self):
+        for player, board in (self.public_boards or {}).items():
+            print(f"\n{player}'s fleet (fog-of-war):")
+            print_board(board)
+
+    async def _request_resume(self):
+        try:
+            await self.ws.send_json({"action": "resume", "seq": self.seq})
+        except Exception as e:
+            print("Failed to request missed moves:", e)
+
     # ============================
     # SEND SHOT
     # ============================
@@ -176,6 +260,10 @@ class GameClient:
             print("Not connected.")
             return
 
+        if self.spectator:
+            print("❌ Spectators cannot shoot.")
+            return
+
         if self.winner:
             print("Game finished.")
             return
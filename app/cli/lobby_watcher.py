@@ -0,0 +1,88 @@
+# app/cli/lobby_watcher.py
+import asyncio
+from typing import Optional
+from aiohttp import ClientSession, WSMsgType
+
+LOBBY_WS_URL = "ws://127.0.0.1:8003/ws/lobby"
+
+
+class LobbyWatcher:
+    """Prints room service lobby events in the background until stopped."""
+
+    def __init__(self, session: ClientSession, username: Optional[str] = None, quiet: bool = False):
+        self.session = session
+        self.username = username
+        self.quiet = quiet  # only print events, not the opening snapshot
+        self.ws = None
+        self.listener_task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.ws is not None
+
+    async def start(self, **filters):
+        query = "&".join(f"{k}={v}" for k, v in filters.items() if v)
+        url = f"{LOBBY_WS_URL}?{query}" if query else LOBBY_WS_URL
+        try:
+            self.ws = await self.session.ws_connect(url)
+        except Exception as e:
+            print("Lobby connect failed:", e)
+            return
+        self.listener_task = asyncio.create_task(self._listener())
+        if not self.quiet:
+            print("👀 Watching rooms ('unwatch' to stop).")
+
+    async def stop(self):
+        if self.listener_task:
+            self.listener_task.cancel()
+            self.listener_task = None
+        if self.ws:
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+        self.ws = None
+
+    async def _listener(self):
+        try:
+            async for msg in self.ws:
+                if msg.type == WSMsgType.TEXT:
+                    self._show(msg.json())
+                elif msg.type in (WSMsgType.CLOSED, WSMsgType.ERROR):
+                    break
+        except asyncio.CancelledError:
+            return
+        print("\n[lobby] feed closed.")
+        self.ws = None
+
+    def _show(self, data: dict):
+        event = data.get("event")
+        if event == "snapshot":
+            if self.quiet:
+                return
+            rooms = data.get("rooms", [])
+            print(f"\n[lobby] {len(rooms)} room(s):")
+            for room in rooms:
+                print(f"  {room['room_id']:<16} host={room['host']:<12} guest={room['guest'] or '-':<12} {room['status']}")
+            return
+
+        room_id = data.get("room_id")
+        room = data.get("room") or {}
+        if event == "room_created":
+            print(f"\n[lobby] ➕ {room_id} created by {room.get('host')}")
+        elif event == "guest_joined":
+            print(f"\n[lobby] 🙋 {room.get('guest')} joined {room_id}")
+        elif event == "game_started":
+            print(f"\n[lobby] 🚀 game started in {room_id}")
+        elif event == "game_finished":
+            winner = room.get("winner")
+            outcome = f"{winner} won" if winner else "no winner"
+            print(f"\n[lobby] 🏁 {room_id} finished: {outcome} ({room.get('reason')})")
+        elif event == "room_closed":
+            print(f"\n[lobby] ✖ {room_id} closed")
+        elif event == "match_found":
+            players = (room.get("host"), room.get("guest"))
+            opponent = players[1] if players[0] == self.username else players[0]
+            print(f"\n[match] 🎯 matched with {opponent} in {room_id} — 'connect {room_id}' to play")
+        else:
+            print("\n[lobby]", data)
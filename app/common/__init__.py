@@ -0,0 +1,3 @@
+# Building blocks shared by more than one service
+from app.common.connection import Connection, Frame
+from app.common.tasks import spawn
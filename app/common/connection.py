@@ -0,0 +1,121 @@
+import asyncio
+import os
+import time
+from typing import Callable, Optional, Union
+from fastapi import WebSocket
+from app.common.tasks import spawn
+
+# Outbound frames buffered per socket before the slow-consumer policy kicks in
+SEND_QUEUE_SIZE = int(os.environ.get("WS_SEND_QUEUE_SIZE", "64"))
+
+# What to do when a socket's queue is full:
+#   "resync"     drop everything queued and send one fresh snapshot instead
+#   "disconnect" close the socket
+POLICY_RESYNC = "resync"
+POLICY_DISCONNECT = "disconnect"
+SLOW_CONSUMER_POLICY = os.environ.get("WS_SLOW_CONSUMER_POLICY", POLICY_RESYNC)
+
+# Queue marker standing for "a snapshot of the state at the time it is written"
+_RESYNC = object()
+
+Frame = Union[str, bytes]
+
+
+class Connection:
+    """
+    One server-side WebSocket (game, spectator or lobby feed) with its own
+    bounded outbound queue and writer task.
+
+    ``send()`` never awaits: frames are queued and a dedicated task writes
+    them, so a slow socket only ever delays itself. ``resync`` builds a
+    snapshot frame for this connection (or returns None when there is
+    nothing to resync yet); it is called by the writer when the queue
+    overflowed under the resync policy.
+    """
+
+    def __init__(
+        self,
+        ws: WebSocket,
+        player: str,
+        protocol: int = 1,
+        fmt: str = "json",
+        resync: Optional[Callable[["Connection"], Optional[Frame]]] = None,
+        max_queue: int = SEND_QUEUE_SIZE,
+        policy: str = SLOW_CONSUMER_POLICY,
+    ):
+        self.ws = ws
+        self.player = player
+        self.protocol = protocol
+        self.fmt = fmt
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self.last_seen = time.monotonic()  # last frame received, for heartbeats
+        self._resync = resync
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._writer: Optional[asyncio.Task] = None
+
+    @property
+    def binary(self) -> bool:
+        return self.fmt == "binary"
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    def send(self, frame: Frame) -> bool:
+        """Queue a frame for this socket. Returns False if it was not queued."""
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            self._overflow()
+            return False
+
+    def _overflow(self):
+        if self.policy == POLICY_DISCONNECT or self._resync is None:
+            self.dropped += self._queue.qsize()
+            spawn(self.close(code=1013))  # try again later
+            return
+
+        # drop the backlog; one snapshot written later replaces all of it
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(_RESYNC)
+
+    async def _write_loop(self):
+        ws = self.ws
+        try:
+            while True:
+                frame = await self._queue.get()
+                if frame is _RESYNC:
+                    frame = self._resync(self)
+                    if frame is None:
+                        continue
+                if isinstance(frame, bytes):
+                    await ws.send_bytes(frame)
+                else:
+                    await ws.send_text(frame)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # socket is gone; the receive loop will notice and clean up
+            self.closed = True
+
+    async def close(self, code: Optional[int] = None):
+        """Stop the writer; with ``code``, also close the socket."""
+        self.closed = True
+        writer, self._writer = self._writer, None
+        if writer and writer is not asyncio.current_task():
+            writer.cancel()
+        if code is not None:
+            try:
+                await self.ws.close(code=code)
+            except Exception:
+                pass
@@ -0,0 +1,26 @@
+import asyncio
+import logging
+from typing import Coroutine, Set
+
+log = logging.getLogger(__name__)
+
+# Fire-and-forget tasks still running; the event loop only holds weak references
+_running: Set[asyncio.Task] = set()
+
+
+def spawn(coro: Coroutine) -> asyncio.Task:
+    """Run ``coro`` in the background, keeping it alive until it is done; a failure is logged."""
+    task = asyncio.create_task(coro)
+    _running.add(task)
+    task.add_done_callback(_finished)
+    return task
+
+
+def _finished(task: asyncio.Task):
+    _running.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        log.error("background task %s failed", task.get_name(), exc_info=task.exception())
+
+
+def running() -> int:
+    return len(_running)
@@ -35,9 +35,19 @@ export function useGameSocket(roomId, username) {
         return;
       }
 
-      console.log("WS MESSAGE:", data);
       const event = data.event;
 
+      // ------------------------------
+      // EVENT: PING
+      // (heartbeat; a socket that never answers is closed)
+      // ------------------------------
+      if (event === "ping") {
+        ws.send(JSON.stringify({ action: "pong" }));
+        return;
+      }
+
+      console.log("WS MESSAGE:", data);
+
       // ------------------------------
       // EVENT: CONNECTED
       // ------------------------------
@@ -60,6 +70,17 @@ export function useGameSocket(roomId, username) {
         return;
       }
 
+      // ------------------------------
+      // EVENT: RESYNC
+      // (server dropped queued updates for this socket and sends a fresh snapshot)
+      // ------------------------------
+      if (event === "resync") {
+        setBoards(data.boards || null);
+        setCurrentTurn(data.current_turn || null);
+        setWinner(data.winner || null);
+        return;
+      }
+
       // ------------------------------
       // EVENT: MOVE MADE
       // ------------------------------
@@ -0,0 +1,44 @@
+from app.game.bot import DensityBot
+from app.game.logic import BitBoard
+import random
+import time
+
+# Run with: python -m app.game.bench_bot_run
+
+GAMES = 1000
+
+
+def play(seed):
+    """One bot game against a random fleet; returns (shots, seconds spent deciding/updating)."""
+    board = BitBoard()
+    board.auto_place_all_ships(random.Random(seed))
+    bot = DensityBot(rng=random.Random(seed))
+    shots = 0
+    spent = 0.0
+    while not board.all_sunk():
+        start = time.perf_counter()
+        row, col = bot.choose()
+        spent += time.perf_counter() - start
+        result = board.receive_shot(row, col)
+        start = time.perf_counter()
+        bot.observe(row, col, result)
+        spent += time.perf_counter() - start
+        shots += 1
+    return shots, spent
+
+
+# warm the position tables
+DensityBot()
+
+start = time.perf_counter()
+results = [play(seed) for seed in range(GAMES)]
+elapsed = time.perf_counter() - start
+
+shots = sorted(s for s, _ in results)
+moves = sum(shots)
+bot_time = sum(t for _, t in results)
+print(f"=== DensityBot, {GAMES} games ===")
+print(f"shots to win: mean {moves / GAMES:.1f}  p50 {shots[GAMES // 2]}  "
+      f"min {shots[0]}  max {shots[-1]}")
+print(f"per move: {bot_time / moves * 1e6:.1f}us (choose + observe)")
+print(f"games per second (single core, no delay): {GAMES / elapsed:.0f}")
@@ -0,0 +1,73 @@
+from app.game.logic import Board, BitBoard, BOARD_SIZE, SHIP_SPECS
+import random
+import time
+
+# Run with: python -m app.game.bench_placement_run
+
+ROUNDS = 5000
+
+
+def legacy_place_ship(board, name, length, width=1):
+    """The original rejection sampler from Board.place_ship, kept for comparison."""
+    attempts = 0
+    while attempts < 500:
+        attempts += 1
+        orientation = random.choice(["H", "V"])
+        if orientation == "H":
+            row = random.randint(0, BOARD_SIZE - width)
+            col = random.randint(0, BOARD_SIZE - length)
+            coords = [(row + w, col + l) for w in range(width) for l in range(length)]
+        else:
+            row = random.randint(0, BOARD_SIZE - length)
+            col = random.randint(0, BOARD_SIZE - width)
+            coords = [(row + l, col + w) for l in range(length) for w in range(width)]
+        if board.can_place(coords):
+            board.add_ship(name, coords)
+            return attempts
+    raise RuntimeError(f"Could not place {name} after {attempts} attempts")
+
+
+def legacy_auto_place(board):
+    attempts = 0
+    for name, (length, width, count) in SHIP_SPECS.items():
+        for i in range(count):
+            ship_name = f"{name}#{i+1}" if count > 1 else name
+            attempts += legacy_place_ship(board, ship_name, length, width)
+    return attempts
+
+
+def bench(label, make_board, place):
+    timings = []
+    for _ in range(ROUNDS):
+        board = make_board()
+        start = time.perf_counter()
+        place(board)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    p50 = timings[len(timings) // 2]
+    p99 = timings[int(len(timings) * 0.99)]
+    worst = timings[-1]
+    print(f"{label:<28} mean {mean*1e6:8.1f}us  p50 {p50*1e6:8.1f}us  "
+          f"p99 {p99*1e6:8.1f}us  max {worst*1e6:8.1f}us")
+
+
+random.seed(1234)
+# warm the placement tables so both sides are measured in steady state
+BitBoard().auto_place_all_ships()
+
+print(f"=== Fleet placement, {ROUNDS} boards each ===")
+bench("legacy sampler / Board", Board, legacy_auto_place)
+bench("legacy sampler / BitBoard", BitBoard, legacy_auto_place)
+bench("constraint / Board", Board, lambda b: b.auto_place_all_ships())
+bench("constraint / BitBoard", BitBoard, lambda b: b.auto_place_all_ships())
+
+attempts = [legacy_auto_place(Board()) for _ in range(ROUNDS)]
+print(f"\nlegacy sampler attempts per fleet: mean {sum(attempts)/len(attempts):.1f}, "
+      f"max {max(attempts)}")
+
+# seeded layouts are reproducible
+a, b = BitBoard(), BitBoard()
+a.auto_place_all_ships(random.Random(7))
+b.auto_place_all_ships(random.Random(7))
+print("seeded layouts identical:", a.grid == b.grid)
@@ -0,0 +1,233 @@
+import random
+from typing import Dict, List, Optional, Tuple
+from app.game.logic import BOARD_SIZE, SHIP_SPECS
+from app.game.placement import fleet, legal_positions
+
+CELLS = BOARD_SIZE * BOARD_SIZE
+
+# Weight multiplier per already-hit cell a candidate position covers (target mode)
+HIT_WEIGHT = 20
+
+
+class _Shape:
+    """All positions of one ship shape, with the cells each covers and a per-cell reverse index."""
+
+    __slots__ = ("length", "width", "cells", "masks", "cover")
+
+    def __init__(self, length: int, width: int):
+        self.length = length
+        self.width = width
+        positions = legal_positions(length, width, BOARD_SIZE)
+        self.cells = [tuple(r * BOARD_SIZE + c for r, c in coords) for coords, _ in positions]
+        self.masks = [mask for _, mask in positions]
+        self.cover: List[List[int]] = [[] for _ in range(CELLS)]
+        for i, cells in enumerate(self.cells):
+            for cell in cells:
+                self.cover[cell].append(i)
+
+
+_shapes: Dict[Tuple[int, int], _Shape] = {}
+
+
+def _shape(length: int, width: int) -> _Shape:
+    shape = _shapes.get((length, width))
+    if shape is None:
+        shape = _shapes[(length, width)] = _Shape(length, width)
+    return shape
+
+
+_initial: Dict[tuple, Tuple[int, ...]] = {}
+
+
+def _initial_density(afloat: Dict[_Shape, int]) -> Tuple[int, ...]:
+    """Density map of an untouched board for a fleet, computed once per fleet."""
+    key = tuple(sorted(((shape.length, shape.width), count) for shape, count in afloat.items()))
+    density = _initial.get(key)
+    if density is None:
+        counts = [0] * CELLS
+        for shape, count in afloat.items():
+            for cells in shape.cells:
+                for cell in cells:
+                    counts[cell] += count
+        density = _initial[key] = tuple(counts)
+    return density
+
+
+class DensityBot:
+    """
+    Hunt/target Battleship player driven by a probability-density map.
+
+    ``density[cell]`` counts, over every ship still afloat, the positions
+    that could still hold it and cover the cell. It is maintained
+    incrementally: a miss (or a resolved sunk ship) only retires the few
+    positions that touch those cells, so a move costs a handful of list
+    updates plus one scan of the 144 cells, not a full recount.
+
+    While there are hits that belong to no sunk ship the bot is in target
+    mode: it scores only positions through those hits, weighted by how many
+    hits each covers, so it finishes the wounded ship first.
+    """
+
+    def __init__(self, name: str = "bot", specs=SHIP_SPECS, rng=None):
+        self.name = name
+        self.rng = rng or random.Random()
+        # shape -> ships of that shape still afloat, plus ship name -> shape
+        self.afloat: Dict[_Shape, int] = {}
+        self.ship_shape: Dict[str, _Shape] = {}
+        for ship_name, length, width in fleet(specs):
+            shape = _shape(length, width)
+            self.afloat[shape] = self.afloat.get(shape, 0) + 1
+            self.ship_shape[ship_name] = shape
+
+        self.shot = bytearray(CELLS)
+        self.blocked = bytearray(CELLS)   # misses and cells of resolved sunk ships
+        self.open_hits = set()            # hit cells not yet attributed to a sunk ship
+        self.alive = {shape: bytearray(b"\x01") * len(shape.cells) for shape in self.afloat}
+        self.density = list(_initial_density(self.afloat))
+
+    # ---------------------------
+    # Knowledge updates
+    # ---------------------------
+    def _retire(self, shape: _Shape, index: int):
+        """A position became impossible: drop it from the density map."""
+        alive = self.alive[shape]
+        if not alive[index]:
+            return
+        alive[index] = 0
+        count = self.afloat[shape]
+        if count:
+            density = self.density
+            for cell in shape.cells[index]:
+                density[cell] -= count
+
+    def _block(self, cell: int):
+        """Nothing afloat can cover ``cell`` any more."""
+        if self.blocked[cell]:
+            return
+        self.blocked[cell] = 1
+        for shape in self.alive:
+            for index in shape.cover[cell]:
+                self._retire(shape, index)
+
+    def _sink(self, ship_name: str, cell: int):
+        shape = self.ship_shape.get(ship_name)
+        if shape is None or not self.afloat.get(shape):
+            return
+
+        # one fewer ship of this shape: remove one copy of its alive positions
+        alive = self.alive[shape]
+        density = self.density
+        for index, cells in enumerate(shape.cells):
+            if alive[index]:
+                for c in cells:
+                    density[c] -= 1
+        self.afloat[shape] -= 1
+
+        # if exactly one position explains the sinking shot, its cells are settled
+        candidates = [
+            index for index in shape.cover[cell]
+            if all(c == cell or c in self.open_hits for c in shape.cells[index])
+        ]
+        if len(candidates) == 1:
+            for c in shape.cells[candidates[0]]:
+                self.open_hits.discard(c)
+                self._block(c)
+        else:
+            self.open_hits.discard(cell)
+
+    def observe(self, row: int, col: int, result: str):
+        """Record the outcome of a shot (a ``receive_shot`` result)."""
+        cell = row * BOARD_SIZE + col
+        if result in ("invalid", "already") or self.shot[cell]:
+            return
+        self.shot[cell] = 1
+        if result == "miss":
+            self._block(cell)
+        elif result == "hit":
+            self.open_hits.add(cell)
+        elif result.startswith("sunk "):
+            self.open_hits.add(cell)
+            self._sink(result[len("sunk "):], cell)
+
+    # ---------------------------
+    # Decisions
+    # ---------------------------
+    def _target_scores(self) -> Optional[List[int]]:
+        scores = [0] * CELLS
+        shot = self.shot
+        open_hits = self.open_hits
+        best = 0
+        seen = set()
+        for hit in open_hits:
+            for shape, alive in self.alive.items():
+                count = self.afloat[shape]
+                if not count:
+                    continue
+                for index in shape.cover[hit]:
+                    if not alive[index] or (shape, index) in seen:
+                        continue
+                    seen.add((shape, index))
+                    cells = shape.cells[index]
+                    covered = sum(1 for c in cells if c in open_hits)
+                    weight = count * HIT_WEIGHT ** covered
+                    for c in cells:
+                        if not shot[c]:
+                            scores[c] += weight
+                            if scores[c] > best:
+                                best = scores[c]
+        return scores if best else None
+
+    def choose(self) -> Tuple[int, int]:
+        """Next cell to fire at, as (row, col)."""
+        scores = self._target_scores() if self.open_hits else None
+        if scores is None:
+            scores = self.density
+        shot = self.shot
+        best = -1
+        picks = []
+        for cell in range(CELLS):
+            if shot[cell]:
+                continue
+            score = scores[cell]
+            if score > best:
+                best = score
+                picks = [cell]
+            elif score == best:
+                picks.append(cell)
+        cell = picks[0] if len(picks) == 1 else self.rng.choice(picks)
+        return divmod(cell, BOARD_SIZE)
+
+    @classmethod
+    def from_board(cls, board, name: str = "bot", rng=None) -> "DensityBot":
+        """
+        Rebuild a bot's knowledge from the board it has been shooting at
+        (after a restart, or to shoot for a player). Uses only public
+        information through the interface every board engine has: hits and
+        misses from ``grid`` and which ships are sunk from ``ships``.
+        """
+        bot = cls(name, rng=rng)
+        for row, marks in enumerate(board.grid):
+            for col, mark in enumerate(marks):
+                if mark == "M":
+                    bot.observe(row, col, "miss")
+                elif mark == "X":
+                    bot.observe(row, col, "hit")
+        # BitBoard knows where each sunk ship lay; the grid engine only that it sank
+        masks = getattr(board, "ship_masks", None)
+        for index, ship in enumerate(board.ships):
+            if ship["coords"]:
+                continue
+            cell = masks[index].bit_length() - 1 if masks is not None else bot._sunk_cell(ship["name"])
+            if cell is not None:
+                bot._sink(ship["name"], cell)
+        return bot
+
+    def _sunk_cell(self, ship_name: str) -> Optional[int]:
+        """A hit cell of some position of the ship made only of hits (where it may have sunk)."""
+        shape = self.ship_shape.get(ship_name)
+        if shape is None:
+            return None
+        for cells in shape.cells:
+            if all(c in self.open_hits for c in cells):
+                return cells[-1]
+        return None
@@ -0,0 +1,102 @@
+"""
+Typed server -> client events of the game WebSocket.
+
+Slotted dataclasses, encoded by ``app.serialization`` in field order (the
+order of the JSON keys). Events that carry boards are encoded without them
+and the cached board encodings are spliced in afterwards (see
+``game_service.with_boards``).
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+ROLE_SPECTATOR = "spectator"
+
+
+@dataclass(slots=True, kw_only=True)
+class Snapshot:
+    """Full state for one player: connected / game_created / resync (+ boards)."""
+    event: str
+    game_id: str
+    players: List[str]
+    current_turn: Optional[str]
+    winner: Optional[str]
+    seq: int
+
+
+@dataclass(slots=True, kw_only=True)
+class SpectatorSnapshot:
+    """Full public state for spectators (+ both fog-of-war boards)."""
+    event: str
+    role: str = field(default=ROLE_SPECTATOR, init=False)
+    game_id: str
+    players: List[str]
+    current_turn: Optional[str]
+    winner: Optional[str]
+    seq: int
+
+
+@dataclass(slots=True, kw_only=True)
+class MoveMade:
+    """Protocol-1 move_made (+ boards)."""
+    event: str = field(default="move_made", init=False)
+    game_id: str
+    seq: int
+    by: str
+    row: int
+    col: int
+    result: str
+    current_turn: Optional[str]
+    winner: Optional[str]
+
+
+@dataclass(slots=True, kw_only=True)
+class MoveDelta:
+    """
+    Protocol-2 move_made, identical for every recipient: ``target`` names the
+    player whose board was shot and ``cells`` lists the changed cells as
+    [row, col, mark] (empty when the move was rejected or repeated).
+    """
+    event: str = field(default="move_made", init=False)
+    game_id: str
+    seq: int
+    by: str
+    target: str
+    row: int
+    col: int
+    result: str
+    sunk: Optional[str]
+    cells: List[list]
+    current_turn: Optional[str]
+    winner: Optional[str]
+
+
+@dataclass(slots=True, kw_only=True)
+class Resume:
+    """The moves after ``since``, each as [seq, by, target, row, col, result]."""
+    event: str = field(default="resume", init=False)
+    game_id: str
+    since: int
+    seq: int
+    moves: List[list]
+    current_turn: Optional[str]
+    winner: Optional[str]
+
+
+@dataclass(slots=True, kw_only=True)
+class Waiting:
+    """Sent on connect before /game/create."""
+    event: str = field(default="connected", init=False)
+    message: str = field(default="waiting_for_game", init=False)
+
+
+@dataclass(slots=True, kw_only=True)
+class SpectatorWaiting:
+    event: str = field(default="connected", init=False)
+    role: str = field(default=ROLE_SPECTATOR, init=False)
+    message: str = field(default="waiting_for_game", init=False)
+
+
+@dataclass(slots=True, kw_only=True)
+class Ping:
+    """Heartbeat; clients answer with {"action": "pong"}."""
+    event: str = field(default="ping", init=False)
@@ -1,19 +1,104 @@
-from app.game.logic import Board
+import random
+from typing import List, NamedTuple, Optional
+from app.game.logic import BitBoard, BOARD_SIZE, board_from_state
+from app.serialization import dumps as _dumps
+
+
+class Move(NamedTuple):
+    """A shot that reached a board; ``result`` is the raw ``receive_shot`` result."""
+    seq: int
+    player: str
+    target: str
+    row: int
+    col: int
+    result: str
+
+
+# Move log: two bytes per Move, its seq implied by the position in the log.
+#   byte 0  cell (row * BOARD_SIZE + col)
+#   byte 1  shooter (0 = players[0], 1 = players[1]) << 7 | result code
+# Result codes; a sunk ship is LOG_SUNK + its index in the target's fleet.
+LOG_MISS = 0
+LOG_HIT = 1
+LOG_ALREADY = 2
+LOG_SUNK = 3
+
+
+def _fleet_names(board) -> List[str]:
+    names = getattr(board, "ship_names", None)
+    return names if names is not None else [ship["name"] for ship in board.ships]
+
 
 class GameManager:
-    def __init__(self, player1: str, player2: str):
-        """Initialize a 2-player Battleship game."""
+    def __init__(self, player1: str, player2: str, board_cls=BitBoard, seed=None, layouts=None):
+        """Initialize a 2-player Battleship game.
+
+        ``board_cls`` selects the board engine; ``BitBoard`` by default,
+        ``logic.Board`` for the original list-of-lists grid. Passing ``seed``
+        makes the ship layouts reproducible; otherwise, if ``layouts`` (a
+        ``LayoutPool``) is given, the fleets are taken from it.
+        """
         self.players = [player1, player2]
         self.boards = {
-            player1: Board(),
-            player2: Board()
+            player1: board_cls(),
+            player2: board_cls()
         }
+        rng = random.Random(seed) if seed is not None else None
         for board in self.boards.values():
-            board.auto_place_all_ships()
+            if layouts is not None and rng is None:
+                board.apply_layout(layouts.get())
+            else:
+                board.auto_place_all_ships(rng)
 
         self.current_turn = player1
         self.winner = None
 
+        # bumped on every shot that reaches a board, so clients can spot gaps
+        self.seq = 0
+        self.last_move = None
+
+        # append-only log of every Move (see LOG_*); holds seqs log_start+1 .. seq
+        self.log = bytearray()
+        self.log_start = 0
+
+        self._init_views()
+
+    def _init_views(self):
+        # player -> fog-of-war view of the opponent's board (only X / M revealed),
+        # updated in place by make_move
+        self.views = {p: self.boards[self.get_opponent(p)].fog_view() for p in self.players}
+        # ("self" | "view", player) -> {encoder: encoded board}, dropped when
+        # that board changes
+        self._encoded = {}
+
+    def to_state(self):
+        """JSON-friendly snapshot of the whole game (for persistence)."""
+        return {
+            "players": self.players,
+            "current_turn": self.current_turn,
+            "winner": self.winner,
+            "seq": self.seq,
+            "boards": {p: board.to_state() for p, board in self.boards.items()},
+            "log": self.log.hex(),
+            "log_start": self.log_start,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a game saved with ``to_state()``."""
+        game = cls.__new__(cls)
+        game.players = list(state["players"])
+        game.boards = {p: board_from_state(b) for p, b in state["boards"].items()}
+        game.current_turn = state["current_turn"]
+        game.winner = state["winner"]
+        game.seq = state["seq"]
+        game.last_move = None
+        # games saved before the log existed keep working, just without history
+        game.log = bytearray.fromhex(state.get("log", ""))
+        game.log_start = state.get("log_start", game.seq - len(game.log) // 2)
+        game._init_views()
+        return game
+
     def get_opponent(self, player: str):
         return self.players[1] if self.players[0] == player else self.players[0]
 
@@ -27,6 +112,14 @@ class GameManager:
 
         opponent = self.get_opponent(player)
         result = self.boards[opponent].receive_shot(row, col)
+        if result != "invalid":
+            self.seq += 1
+            self.last_move = Move(self.seq, player, opponent, row, col, result)
+            self._log(player, opponent, row, col, result)
+            if result != "already":
+                self.views[player][row][col] = "M" if result == "miss" else "X"
+                self._encoded.pop(("view", player), None)
+                self._encoded.pop(("self", opponent), None)
 
         # Switch turn only if miss
         if result.startswith("miss") or result.startswith("already"):
@@ -39,6 +132,75 @@ class GameManager:
 
         return result
 
+    def forfeit(self, player: str) -> Optional[str]:
+        """End the game with ``player`` conceding; returns the winner (None if it was already over)."""
+        if self.winner:
+            return None
+        self.winner = self.get_opponent(player)
+        return self.winner
+
+    # ---------------------------
+    # Move log
+    # ---------------------------
+    def _log(self, player: str, target: str, row: int, col: int, result: str):
+        if result == "miss":
+            code = LOG_MISS
+        elif result == "hit":
+            code = LOG_HIT
+        elif result == "already":
+            code = LOG_ALREADY
+        else:
+            code = LOG_SUNK + _fleet_names(self.boards[target]).index(result[len("sunk "):])
+        shooter = 0 if player == self.players[0] else 1
+        self.log.append(row * BOARD_SIZE + col)
+        self.log.append(shooter << 7 | code)
+
+    def _logged(self, seq: int) -> Move:
+        i = 2 * (seq - self.log_start - 1)
+        cell, info = self.log[i], self.log[i + 1]
+        shooter = info >> 7
+        code = info & 0x7F
+        player, target = self.players[shooter], self.players[1 - shooter]
+        if code == LOG_MISS:
+            result = "miss"
+        elif code == LOG_HIT:
+            result = "hit"
+        elif code == LOG_ALREADY:
+            result = "already"
+        else:
+            result = "sunk " + _fleet_names(self.boards[target])[code - LOG_SUNK]
+        row, col = divmod(cell, BOARD_SIZE)
+        return Move(seq, player, target, row, col, result)
+
+    def moves_since(self, seq: int) -> Optional[List[Move]]:
+        """
+        The moves after ``seq``, oldest first; None when ``seq`` is older than
+        the log (or ahead of the game), so the caller must send full state.
+        """
+        if seq < self.log_start or seq > self.seq:
+            return None
+        return [self._logged(s) for s in range(seq + 1, self.seq + 1)]
+
+    def encoded(self, kind: str, player: str, encoder):
+        """
+        ``encoder`` applied to the player's own board (kind "self") or
+        fog-of-war view (kind "view"), cached until that board changes.
+        """
+        cache = self._encoded.setdefault((kind, player), {})
+        value = cache.get(encoder)
+        if value is None:
+            grid = self.boards[player].grid if kind == "self" else self.views[player]
+            value = cache[encoder] = encoder(grid)
+        return value
+
+    def board_json(self, player: str) -> str:
+        """JSON text of the player's own board, cached until it is shot at."""
+        return self.encoded("self", player, _dumps)
+
+    def view_json(self, player: str) -> str:
+        """JSON text of the player's fog-of-war view, cached until the player shoots."""
+        return self.encoded("view", player, _dumps)
+
     def display_boards(self):
         """Print both boards (for testing only)."""
         for p, board in self.boards.items():
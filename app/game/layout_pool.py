@@ -0,0 +1,79 @@
+import os
+import queue
+import threading
+from app.game.logic import BOARD_SIZE, SHIP_SPECS
+from app.game.placement import generate_layout
+
+# Number of ready fleet layouts kept in the pool (one game uses two); 0 turns the pool off.
+LAYOUT_POOL_SIZE = int(os.environ.get("LAYOUT_POOL_SIZE", "512"))
+
+
+class LayoutPool:
+    """
+    Bounded queue of pre-generated fleet layouts, refilled by a daemon thread.
+
+    ``get()`` pops a ready layout without blocking; when the pool is empty it
+    counts a miss and generates one inline, so callers never wait on the
+    refill thread. With ``size`` 0 there is no pool: no thread is started
+    and every layout is generated inline.
+    """
+
+    def __init__(self, size: int = LAYOUT_POOL_SIZE, specs=SHIP_SPECS, board_size: int = BOARD_SIZE):
+        if size < 0:
+            raise ValueError(f"layout pool size must be 0 (off) or more, got {size}")
+        self.size = size
+        self.specs = specs
+        self.board_size = board_size
+        self.hits = 0
+        self.misses = 0
+        # maxsize 0 would make the queue unbounded; with the pool off it is never filled
+        self._queue = queue.Queue(maxsize=max(size, 1))
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the refill thread (no-op if it is already running or the pool is off)."""
+        if not self.size or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refill, name="layout-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _refill(self):
+        layout = None
+        while not self._stop.is_set():
+            if layout is None:
+                layout = generate_layout(self.specs, self.board_size)
+            try:
+                # wake up regularly so stop() is honoured while the pool is full
+                self._queue.put(layout, timeout=0.5)
+                layout = None
+            except queue.Full:
+                pass
+
+    def get(self):
+        """Return a ready layout, generating one inline if the pool is empty."""
+        try:
+            layout = self._queue.get_nowait()
+        except queue.Empty:
+            self.misses += 1
+            return generate_layout(self.specs, self.board_size)
+        self.hits += 1
+        return layout
+
+    def stats(self):
+        served = self.hits + self.misses
+        return {
+            "size": self.size,
+            "ready": self._queue.qsize(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / served if served else None,
+            "running": bool(self._thread and self._thread.is_alive()),
+        }
@@ -1,4 +1,5 @@
 import random
+from app.game.placement import generate_layout, legal_positions
 
 # --- Configuration ---
 BOARD_SIZE = 12
@@ -32,37 +33,35 @@ class Board:
             for r, c in coords
         )
 
-    def place_ship(self, name, length, width=1):
-        """Place a ship randomly (length x width) without overlapping."""
-        placed = False
-        attempts = 0
-        while not placed and attempts < 500:
-            attempts += 1
-            orientation = random.choice(["H", "V"])
-            if orientation == "H":
-                row = random.randint(0, BOARD_SIZE - width)
-                col = random.randint(0, BOARD_SIZE - length)
-                coords = [(row + w, col + l) for w in range(width) for l in range(length)]
-            else:  # Vertical orientation
-                row = random.randint(0, BOARD_SIZE - length)
-                col = random.randint(0, BOARD_SIZE - width)
-                coords = [(row + l, col + w) for l in range(length) for w in range(width)]
-
-            if self.can_place(coords):
-                for r, c in coords:
-                    self.grid[r][c] = "O"
-                self.ships.append({"name": name, "coords": coords})
-                placed = True
-
-        if not placed:
-            raise RuntimeError(f"Could not place {name} after {attempts} attempts")
-
-    def auto_place_all_ships(self):
-        """Automatically places all ships on the board."""
-        for name, (length, width, count) in SHIP_SPECS.items():
-            for i in range(count):
-                ship_name = f"{name}#{i+1}" if count > 1 else name
-                self.place_ship(ship_name, length, width)
+    def free_positions(self, length, width=1):
+        """All positions (coords tuples) where a length x width ship fits right now."""
+        return [
+            coords for coords, _ in legal_positions(length, width, BOARD_SIZE)
+            if self.can_place(coords)
+        ]
+
+    def place_ship(self, name, length, width=1, rng=None):
+        """Place a ship (length x width) uniformly at random among the free positions."""
+        positions = self.free_positions(length, width)
+        if not positions:
+            raise RuntimeError(f"Could not place {name}: no free position left")
+        self.add_ship(name, (rng or random).choice(positions))
+
+    def add_ship(self, name, coords, mask=None):
+        """Put a ship on the given cells (caller checks ``can_place`` first)."""
+        for r, c in coords:
+            self.grid[r][c] = "O"
+        self.ships.append({"name": name, "coords": list(coords)})
+
+    def auto_place_all_ships(self, rng=None):
+        """Automatically places all ships on the board (seedable through ``rng``)."""
+        self.apply_layout(generate_layout(SHIP_SPECS, BOARD_SIZE, rng))
+
+    def apply_layout(self, layout):
+        """Place a ready fleet layout, as produced by ``placement.generate_layout``."""
+        for name, coords, mask in layout:
+            self.add_ship(name, coords, mask)
+
     def receive_shot(self, row: int, col: int):
         """
         Process a shot fired at (row, col).
@@ -102,3 +101,177 @@ class Board:
         """Check if all ships have been sunk."""
         return all(len(ship["coords"]) == 0 for ship in self.ships)
 
+    def fog_view(self):
+        """What the opponent sees: hits and misses only, everything else water."""
+        return [[c if c in ("X", "M") else "~" for c in row] for row in self.grid]
+
+    def to_state(self):
+        """JSON-friendly snapshot of the board, see ``board_from_state``."""
+        return {
+            "engine": "grid",
+            "grid": ["".join(row) for row in self.grid],
+            "ships": [[ship["name"], [list(c) for c in ship["coords"]]] for ship in self.ships],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        board = cls()
+        board.grid = [list(row) for row in state["grid"]]
+        board.ships = [
+            {"name": name, "coords": [tuple(c) for c in coords]} for name, coords in state["ships"]
+        ]
+        return board
+
+
+class BitBoard(Board):
+    """
+    Board engine backed by integer bitmasks.
+
+    Cell (row, col) maps to bit ``row * BOARD_SIZE + col``. Ship occupancy,
+    hits and misses are each a single BOARD_SIZE**2-bit int, and ``cell_ship``
+    maps every cell to the index of the ship covering it, so shot resolution,
+    sunk detection and the game-over check are constant-time bit operations.
+
+    ``grid``, ``receive_shot`` and ``all_sunk`` behave exactly like ``Board``.
+    """
+
+    def __init__(self):
+        self.occupied = 0
+        self.hits = 0
+        self.misses = 0
+        self.cell_ship = bytearray(BOARD_SIZE * BOARD_SIZE)  # ship index + 1, 0 = water
+        self.ship_names = []
+        self.ship_masks = []
+
+    @property
+    def grid(self):
+        """Render the board as the usual list-of-lists of "~", "O", "X", "M"."""
+        occupied, hits, misses = self.occupied, self.hits, self.misses
+        grid = []
+        bit = 1
+        for _ in range(BOARD_SIZE):
+            row = []
+            for _ in range(BOARD_SIZE):
+                if hits & bit:
+                    row.append("X")
+                elif misses & bit:
+                    row.append("M")
+                elif occupied & bit:
+                    row.append("O")
+                else:
+                    row.append("~")
+                bit <<= 1
+            grid.append(row)
+        return grid
+
+    @property
+    def ships(self):
+        """Ships as ``{"name", "coords"}`` dicts, coords listing the cells not yet hit."""
+        return [
+            {"name": name, "coords": mask_to_coords(mask & ~self.hits)}
+            for name, mask in zip(self.ship_names, self.ship_masks)
+        ]
+
+    def can_place(self, coords):
+        """Check if a ship can be placed at given coordinates (no overlap and within bounds)."""
+        if not all(0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE for r, c in coords):
+            return False
+        return not (self.occupied & coords_to_mask(coords))
+
+    def free_positions(self, length, width=1):
+        """All positions (coords tuples) where a length x width ship fits right now."""
+        occupied = self.occupied
+        return [
+            coords for coords, mask in legal_positions(length, width, BOARD_SIZE)
+            if not mask & occupied
+        ]
+
+    def add_ship(self, name, coords, mask=None):
+        """Put a ship on the given cells (caller checks ``can_place`` first).
+
+        ``mask`` is the cells' bitmask when the caller already has it.
+        """
+        if mask is None:
+            mask = coords_to_mask(coords)
+        self.ship_names.append(name)
+        self.ship_masks.append(mask)
+        self.occupied |= mask
+        index = len(self.ship_masks)
+        for r, c in coords:
+            self.cell_ship[r * BOARD_SIZE + c] = index
+
+    def receive_shot(self, row: int, col: int):
+        """Process a shot fired at (row, col). Same results as ``Board.receive_shot``."""
+        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+            return "invalid"
+
+        cell = row * BOARD_SIZE + col
+        bit = 1 << cell
+
+        if (self.hits | self.misses) & bit:
+            return "already"
+
+        if self.occupied & bit:
+            self.hits |= bit
+            index = self.cell_ship[cell] - 1
+            if not (self.ship_masks[index] & ~self.hits):
+                return f"sunk {self.ship_names[index]}"
+            return "hit"
+
+        self.misses |= bit
+        return "miss"
+
+    def all_sunk(self):
+        """Check if all ships have been sunk."""
+        return not (self.occupied & ~self.hits)
+
+    def fog_view(self):
+        """What the opponent sees: hits and misses only, everything else water."""
+        view = [["~"] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        for mark, mask in (("X", self.hits), ("M", self.misses)):
+            for r, c in mask_to_coords(mask):
+                view[r][c] = mark
+        return view
+
+    def to_state(self):
+        """JSON-friendly snapshot of the board, see ``board_from_state``."""
+        return {
+            "engine": "bit",
+            "ships": [[name, mask] for name, mask in zip(self.ship_names, self.ship_masks)],
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        board = cls()
+        for name, mask in state["ships"]:
+            board.add_ship(name, mask_to_coords(mask), mask)
+        board.hits = state["hits"]
+        board.misses = state["misses"]
+        return board
+
+
+def board_from_state(state):
+    """Rebuild a Board or BitBoard from ``to_state()`` output."""
+    cls = BitBoard if state.get("engine") == "bit" else Board
+    return cls.from_state(state)
+
+
+def coords_to_mask(coords):
+    """Convert a list of (row, col) cells to a bitmask."""
+    mask = 0
+    for r, c in coords:
+        mask |= 1 << (r * BOARD_SIZE + c)
+    return mask
+
+
+def mask_to_coords(mask):
+    """Convert a bitmask back to a row-major list of (row, col) cells."""
+    coords = []
+    while mask:
+        low = mask & -mask
+        cell = low.bit_length() - 1
+        coords.append(divmod(cell, BOARD_SIZE))
+        mask ^= low
+    return coords
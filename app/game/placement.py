@@ -0,0 +1,110 @@
+import random
+from functools import lru_cache
+
+# Upper bound on how many times the layout search may undo a placed ship.
+MAX_BACKTRACKS = 1000
+
+# Random draws from a ship's position table before falling back to enumerating
+# all of its free positions.
+SAMPLE_TRIES = 8
+
+
+@lru_cache(maxsize=None)
+def legal_positions(length: int, width: int, board_size: int):
+    """
+    Every in-bounds position of a length x width ship on an empty board.
+
+    Returns a tuple of (coords, mask) pairs, where coords is the row-major
+    tuple of (row, col) cells and mask has bit ``row * board_size + col`` set
+    for each of them. Both orientations are included, square ships once.
+    """
+    shapes = [(width, length)]  # horizontal: `width` rows of `length` cells
+    if length != width:
+        shapes.append((length, width))  # vertical
+
+    positions = []
+    for height, span in shapes:
+        for row in range(board_size - height + 1):
+            for col in range(board_size - span + 1):
+                coords = tuple(
+                    (row + dr, col + dc) for dr in range(height) for dc in range(span)
+                )
+                mask = 0
+                for r, c in coords:
+                    mask |= 1 << (r * board_size + c)
+                positions.append((coords, mask))
+    return tuple(positions)
+
+
+def fleet(specs):
+    """Expand ship specs (name -> (length, width, count)) to (name, length, width) entries."""
+    ships = []
+    for name, (length, width, count) in specs.items():
+        for i in range(count):
+            ship_name = f"{name}#{i+1}" if count > 1 else name
+            ships.append((ship_name, length, width))
+    return ships
+
+
+def generate_layout(specs, board_size: int, rng=None, max_backtracks: int = MAX_BACKTRACKS):
+    """
+    Place a whole fleet without overlaps and return it as [(name, coords, mask), ...].
+
+    Each ship is drawn uniformly from the precomputed positions that are still
+    free. If a ship has nowhere to go, the previous ship is moved to one of its
+    untried positions (depth-first backtracking), at most ``max_backtracks``
+    times, so the cost is bounded even for crowded specs. ``rng`` is any object
+    with ``randrange`` (e.g. ``random.Random(seed)``); defaults to ``random``.
+    """
+    rng = rng or random
+    ships = fleet(specs)
+    tables = [legal_positions(length, width, board_size) for _, length, width in ships]
+
+    occupied = 0
+    chosen = []      # (coords, mask) per placed ship
+    candidates = []  # untried free positions per depth, None until first needed
+    backtracks = 0
+
+    while len(chosen) < len(ships):
+        depth = len(chosen)
+        table = tables[depth]
+        if len(candidates) == depth:
+            # A few uniform draws from the table are usually enough and are
+            # still uniform over the free positions; enumerate only if they fail.
+            position = None
+            for _ in range(SAMPLE_TRIES):
+                drawn = table[rng.randrange(len(table))]
+                if not drawn[1] & occupied:
+                    position = drawn
+                    break
+            if position is not None:
+                candidates.append(None)
+                chosen.append(position)
+                occupied |= position[1]
+                continue
+            candidates.append([p for p in table if not p[1] & occupied])
+
+        free = candidates[depth]
+        if not free:
+            candidates.pop()
+            if depth == 0 or backtracks >= max_backtracks:
+                raise RuntimeError(
+                    f"Could not place {ships[depth][0]} after {backtracks} backtracks"
+                )
+            backtracks += 1
+            undone = chosen.pop()
+            occupied ^= undone[1]
+            if candidates[-1] is None:
+                candidates[-1] = [
+                    p for p in tables[depth - 1] if not p[1] & occupied and p is not undone
+                ]
+            continue
+
+        # swap-remove a random candidate so a backtrack never retries it
+        i = rng.randrange(len(free))
+        free[i], free[-1] = free[-1], free[i]
+        position = free.pop()
+        chosen.append(position)
+        occupied |= position[1]
+
+    return [(name, coords, mask) for (name, _, _), (coords, mask) in zip(ships, chosen)]
@@ -0,0 +1,99 @@
+import os
+import time
+from typing import Literal, Optional, Union
+from pydantic import Field, StrictInt, TypeAdapter, ValidationError
+from typing_extensions import Annotated, TypedDict
+from app.game.logic import BOARD_SIZE
+
+# Client frames a socket may send per second, and the burst it may save up
+WS_ACTION_RATE = float(os.environ.get("WS_ACTION_RATE", "10"))
+WS_ACTION_BURST = float(os.environ.get("WS_ACTION_BURST", "20"))
+# Frames dropped in a row (over the rate) before the socket is closed
+WS_FLOOD_LIMIT = int(os.environ.get("WS_FLOOD_LIMIT", "200"))
+
+Cell = Annotated[StrictInt, Field(ge=0, lt=BOARD_SIZE)]
+
+
+# ---------------------------
+# Client action schema
+# ---------------------------
+# Unknown keys (the CLI still sends "player_name" and "room_id") are dropped:
+# a move always acts for the socket's own player.
+class MoveAction(TypedDict):
+    action: Literal["move"]
+    row: Cell
+    col: Cell
+
+
+class ResyncAction(TypedDict):
+    action: Literal["resync"]
+
+
+class ResumeAction(TypedDict):
+    action: Literal["resume"]
+    seq: Annotated[StrictInt, Field(ge=0)]
+
+
+class PongAction(TypedDict):
+    action: Literal["pong"]
+
+
+Action = Annotated[Union[MoveAction, ResyncAction, ResumeAction, PongAction], Field(discriminator="action")]
+
+# built once: validation runs in pydantic-core, straight from the frame text
+_schema = TypeAdapter(Action)
+
+
+def parse_text(text: str) -> Optional[dict]:
+    """Validated action dict from a JSON text frame, or None if it does not match the schema."""
+    try:
+        return _schema.validate_json(text)
+    except ValidationError:
+        return None
+
+
+def parse_dict(raw) -> Optional[dict]:
+    """Same check for an already-decoded action (binary frames)."""
+    if raw is None:
+        return None
+    try:
+        return _schema.validate_python(raw)
+    except ValidationError:
+        return None
+
+
+# ---------------------------
+# Rate limiting
+# ---------------------------
+class TokenBucket:
+    """
+    Per-connection rate limiter: ``rate`` tokens per second up to ``burst``;
+    each frame takes one. ``rejected_in_row`` counts consecutive drops so
+    a flooding socket can be closed.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "rejected", "rejected_in_row", "clock")
+
+    def __init__(self, rate: float = WS_ACTION_RATE, burst: float = WS_ACTION_BURST, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.updated = clock()
+        self.rejected = 0
+        self.rejected_in_row = 0
+
+    def allow(self) -> bool:
+        now = self.clock()
+        tokens = self.tokens + (now - self.updated) * self.rate
+        self.updated = now
+        if tokens > self.burst:
+            tokens = self.burst
+        if tokens < 1:
+            self.tokens = tokens
+            self.rejected += 1
+            self.rejected_in_row += 1
+            return False
+        self.tokens = tokens - 1
+        self.rejected_in_row = 0
+        return True
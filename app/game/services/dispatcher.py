@@ -0,0 +1,535 @@
+# app/game/services/dispatcher.py
+#
+# Run the game service as N worker processes behind one local dispatcher:
+#
+#   python -m app.game.services.dispatcher --workers 4 --port 8002
+#
+# Every room lives in exactly one worker. The dispatcher owns the public
+# port, reads just enough of each HTTP request to find its room_id
+# (/game/create body, /ws/{room_id}, /game/{room_id}/...) and forwards the
+# raw bytes to the owning worker, chosen by consistent hashing. WebSocket
+# upgrades are spliced through unchanged after the handshake.
+#
+# Endpoints that describe the whole service (/list_games, /metrics,
+# /registry, /scheduler) are asked of every worker and merged here. Other
+# room-less requests go to worker 0, or to the worker named by ?worker=N
+# (e.g. /debug/profile); /debug/tracing?room_id=... goes to the room's owner.
+import argparse
+import asyncio
+import bisect
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import uuid
+from typing import List, Optional, Tuple
+from urllib.parse import unquote
+
+import httpx
+from app.game.services.registry import encode_cursor
+
+GAME_APP = "app.game.services.game_service:app"
+
+# virtual nodes per worker on the hash ring
+RING_REPLICAS = 64
+
+MAX_HEAD_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+# paths whose room id is in the URL
+ROOM_PATHS = [
+    re.compile(r"^/ws/([^/?]+)"),
+    re.compile(r"^/game/(?!create\b)([^/?]+)/"),
+]
+
+
+class HashRing:
+    """Consistent hash ring mapping keys (room ids) to node indices."""
+
+    def __init__(self, nodes: int, replicas: int = RING_REPLICAS):
+        points = []
+        for node in range(nodes):
+            for replica in range(replicas):
+                points.append((_hash(f"worker-{node}#{replica}"), node))
+        points.sort()
+        self._keys = [key for key, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> int:
+        i = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[i]
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+# --------------------------------------
+# Minimal HTTP/1.1 framing
+# --------------------------------------
+class BadRequest(Exception):
+    pass
+
+
+async def read_head(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """Request/status line plus headers, or None at EOF."""
+    try:
+        return await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise BadRequest("truncated head")
+        return None
+    except asyncio.LimitOverrunError:
+        raise BadRequest("head too large")
+
+
+def parse_head(head: bytes) -> Tuple[List[str], List[Tuple[str, str]]]:
+    lines = head.decode("latin-1").split("\r\n")
+    start = lines[0].split(" ", 2)
+    headers = []
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers.append((name.strip(), value.strip()))
+    return start, headers
+
+
+def header(headers, name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def build_head(start: List[str], headers) -> bytes:
+    lines = [" ".join(start)] + [f"{k}: {v}" for k, v in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def relay_response(upstream: asyncio.StreamReader, client: asyncio.StreamWriter,
+                         method: str, head: bytes) -> bool:
+    """
+    Copy one response (whose head was already read) to the client.
+    Returns False if the connection must close.
+    """
+    client.write(head)
+
+    start, headers = parse_head(head)
+    status = int(start[1])
+    keep_alive = (header(headers, "connection") or "").lower() != "close"
+
+    if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        return keep_alive
+
+    length = header(headers, "content-length")
+    if length is not None:
+        remaining = int(length)
+        while remaining:
+            chunk = await upstream.read(min(remaining, 65536))
+            if not chunk:
+                raise ConnectionError("worker closed mid-body")
+            client.write(chunk)
+            remaining -= len(chunk)
+            await client.drain()
+        return keep_alive
+
+    if (header(headers, "transfer-encoding") or "").lower() == "chunked":
+        while True:
+            size_line = await upstream.readuntil(b"\r\n")
+            client.write(size_line)
+            size = int(size_line.split(b";")[0], 16)
+            if size == 0:
+                # trailers end with an empty line
+                while True:
+                    line = await upstream.readuntil(b"\r\n")
+                    client.write(line)
+                    if line == b"\r\n":
+                        break
+                await client.drain()
+                return keep_alive
+            client.write(await upstream.readexactly(size + 2))
+            await client.drain()
+
+    # body delimited by connection close
+    while True:
+        chunk = await upstream.read(65536)
+        if not chunk:
+            break
+        client.write(chunk)
+        await client.drain()
+    return False
+
+
+async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            writer.write(chunk)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        try:
+            writer.close()
+        except Exception:
+            pass
+
+
+# --------------------------------------
+# Dispatcher
+# --------------------------------------
+class Dispatcher:
+    """Routes each request to the worker that owns its room."""
+
+    def __init__(self, worker_ports: List[int], worker_host: str = "127.0.0.1"):
+        self.worker_host = worker_host
+        self.worker_ports = worker_ports
+        self.ring = HashRing(len(worker_ports))
+        self.http: Optional[httpx.AsyncClient] = None
+        # whole-service GET endpoints, answered from every worker's reply
+        self.merged = {
+            "/list_games": self.list_games,
+            "/metrics": self.metrics,
+            "/registry": self.registry_stats,
+            "/scheduler": self.scheduler_stats,
+        }
+
+    def worker_for(self, room_id: str) -> int:
+        return self.ring.node_for(room_id)
+
+    def route(self, method: str, path: str, body: bytes):
+        """
+        (worker index, body) for a request. /game/create without a room_id
+        gets one assigned here so the id is unique across workers.
+        """
+        if method == "POST" and path.split("?")[0] == "/game/create":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 0, body
+            if not isinstance(payload, dict):
+                return 0, body
+            if not payload.get("room_id"):
+                payload["room_id"] = f"game_{uuid.uuid4().hex[:12]}"
+                body = json.dumps(payload).encode()
+            return self.worker_for(str(payload["room_id"])), body
+
+        for pattern in ROOM_PATHS:
+            match = pattern.match(path)
+            if match:
+                return self.worker_for(unquote(match.group(1))), body
+
+        route, _, query = path.partition("?")
+        params = httpx.QueryParams(query)
+        if route == "/debug/tracing" and params.get("room_id"):
+            return self.worker_for(params["room_id"]), body
+        if params.get("worker") is not None:
+            worker = int(params["worker"])
+            if not 0 <= worker < len(self.worker_ports):
+                raise BadRequest("no such worker")
+            return worker, body
+
+        # other room-less endpoints (/layout_pool, /debug/profile, ...) are answered by worker 0
+        return 0, body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        upstreams = {}  # worker -> (reader, writer), kept alive for this client
+        try:
+            while True:
+                head = await read_head(reader)
+                if head is None:
+                    break
+                start, headers = parse_head(head)
+                if len(start) != 3:
+                    raise BadRequest("bad request line")
+                method, path, _ = start
+
+                if (header(headers, "transfer-encoding") or "").lower() == "chunked":
+                    writer.write(b"HTTP/1.1 411 Length Required\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+                    break
+                length = int(header(headers, "content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    raise BadRequest("body too large")
+                body = await reader.readexactly(length) if length else b""
+
+                merge = self.merged.get(path.split("?")[0]) if method == "GET" else None
+                if merge is not None:
+                    await merge(path, writer)
+                    continue
+
+                worker, new_body = self.route(method, path, body)
+                if new_body is not body:
+                    headers = [(k, v) for k, v in headers if k.lower() != "content-length"]
+                    headers.append(("content-length", str(len(new_body))))
+                    head = build_head(start, headers)
+
+                if (header(headers, "upgrade") or "").lower() == "websocket":
+                    await self.splice(worker, head + new_body, reader, writer)
+                    return
+
+                up_reader, response_head = await self.forward(upstreams, worker, head + new_body)
+                if not await relay_response(up_reader, writer, method, response_head):
+                    break
+                await writer.drain()
+        except (BadRequest, ValueError):
+            writer.write(b"HTTP/1.1 400 Bad Request\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            try:
+                writer.write(b"HTTP/1.1 502 Bad Gateway\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+            except Exception:
+                pass
+        finally:
+            for _, up_writer in upstreams.values():
+                up_writer.close()
+            try:
+                await writer.drain()
+                writer.close()
+            except Exception:
+                pass
+
+    async def forward(self, upstreams: dict, worker: int, request: bytes):
+        """
+        Send a request to ``worker`` over this client's upstream connection and
+        return (reader, response head). A kept-alive upstream the worker has
+        closed in the meantime is replaced and the request sent once more.
+        """
+        for _ in range(2):
+            if worker not in upstreams:
+                upstreams[worker] = await asyncio.open_connection(
+                    self.worker_host, self.worker_ports[worker]
+                )
+            up_reader, up_writer = upstreams[worker]
+            try:
+                up_writer.write(request)
+                await up_writer.drain()
+                head = await read_head(up_reader)
+            except (ConnectionError, BadRequest):
+                head = None
+            if head is not None:
+                return up_reader, head
+            up_writer.close()
+            del upstreams[worker]
+        raise ConnectionError("worker closed the connection")
+
+    async def splice(self, worker: int, request: bytes, reader, writer):
+        """Hand a WebSocket upgrade to its worker and copy bytes both ways until either side closes."""
+        up_reader, up_writer = await asyncio.open_connection(
+            self.worker_host, self.worker_ports[worker]
+        )
+        up_writer.write(request)
+        await up_writer.drain()
+        await asyncio.gather(pipe(reader, up_writer), pipe(up_reader, writer))
+
+    async def scatter(self, path: str) -> list:
+        """GET ``path`` from every worker; an exception stands in for a worker that could not be reached."""
+        return await asyncio.gather(*[
+            self.http.get(f"http://{self.worker_host}:{port}{path}")
+            for port in self.worker_ports
+        ], return_exceptions=True)
+
+    async def respond(self, writer: asyncio.StreamWriter, body: bytes,
+                      content_type: str = "application/json", status: str = "200 OK"):
+        writer.write(
+            f"HTTP/1.1 {status}\r\ncontent-type: {content_type}\r\n"
+            f"content-length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def list_games(self, path: str, writer: asyncio.StreamWriter):
+        """
+        Every worker returns its first page after the cursor, already in
+        (created, room_id) order; a k-way merge of those pages gives the
+        global page, and its last game is the next cursor.
+        """
+        limit = int(httpx.QueryParams(path.partition("?")[2]).get("limit", 100))
+        pages, total, more = [], 0, False
+        for resp in await self.scatter(path):
+            if isinstance(resp, Exception):
+                continue
+            if 400 <= resp.status_code < 500:
+                # bad cursor / parameters: every worker says the same
+                await self.respond(writer, resp.content, status=f"{resp.status_code} {resp.reason_phrase}")
+                return
+            if resp.status_code != 200:
+                continue
+            data = resp.json()
+            pages.append(data["games"])
+            total += data["total"]
+            more = more or data["next_cursor"] is not None
+
+        merged = heapq.merge(*pages, key=lambda g: (g["created"], g["room_id"]))
+        page = list(itertools.islice(merged, limit))
+        more = more or sum(map(len, pages)) > len(page)
+        last = page[-1] if page else None
+        body = json.dumps({
+            "active_games": [g["room_id"] for g in page],
+            "games": page,
+            "total": total,
+            "limit": limit,
+            "next_cursor": encode_cursor(last["created"], last["room_id"]) if last and more else None,
+        }).encode()
+        await self.respond(writer, body)
+
+    async def metrics(self, path: str, writer: asyncio.StreamWriter):
+        """Every worker's /metrics as one exposition, each sample labelled with its worker."""
+        texts, up = [], []
+        for worker, resp in enumerate(await self.scatter(path)):
+            ok = not isinstance(resp, Exception) and resp.status_code == 200
+            up.append(f'dispatcher_worker_up{{worker="{worker}"}} {int(ok)}')
+            if ok:
+                texts.append((worker, resp.text))
+        text = merge_metrics(texts)
+        text += "# HELP dispatcher_worker_up Whether the worker answered this scrape\n"
+        text += "# TYPE dispatcher_worker_up gauge\n" + "\n".join(up) + "\n"
+        await self.respond(writer, text.encode(), "text/plain; version=0.0.4; charset=utf-8")
+
+    async def merged_stats(self, path: str) -> dict:
+        parts, down = [], []
+        for worker, resp in enumerate(await self.scatter(path)):
+            if isinstance(resp, Exception) or resp.status_code != 200:
+                down.append(worker)
+            else:
+                parts.append(resp.json())
+        merged = merge_stats(parts) if parts else {}
+        merged["workers"] = len(self.worker_ports)
+        merged["workers_down"] = down
+        return merged
+
+    async def registry_stats(self, path: str, writer: asyncio.StreamWriter):
+        stats = await self.merged_stats(path)
+        games = stats.get("games")
+        if games:
+            played = games.get("active", 0) + games.get("finished", 0)
+            stats["approx_bytes_per_game"] = stats.get("approx_bytes", 0) // played if played else 0
+        await self.respond(writer, json.dumps(stats).encode())
+
+    async def scheduler_stats(self, path: str, writer: asyncio.StreamWriter):
+        await self.respond(writer, json.dumps(await self.merged_stats(path)).encode())
+
+    async def serve(self, host: str, port: int):
+        self.http = httpx.AsyncClient(timeout=5.0)
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEAD_BYTES)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.http.aclose()
+
+
+# --------------------------------------
+# Merging worker replies
+# --------------------------------------
+def merge_stats(parts: list):
+    """
+    Several workers' JSON stats as one: integers add up, dicts merge key by
+    key, lists concatenate; anything else (names, float settings) keeps the
+    first worker's value.
+    """
+    first = parts[0]
+    if isinstance(first, dict):
+        keys = dict.fromkeys(key for part in parts if isinstance(part, dict) for key in part)
+        return {key: merge_stats([part[key] for part in parts if isinstance(part, dict) and key in part])
+                for key in keys}
+    if isinstance(first, list):
+        return [item for part in parts if isinstance(part, list) for item in part]
+    if isinstance(first, int) and not isinstance(first, bool):
+        return sum(part for part in parts if isinstance(part, int))
+    return first
+
+
+def label_worker(sample: str, worker: int) -> str:
+    """Add worker="N" to one Prometheus sample line."""
+    name, brace, rest = sample.partition("{")
+    if brace:
+        return f'{name}{{worker="{worker}",{rest}'
+    name, _, value = sample.partition(" ")
+    return f'{name}{{worker="{worker}"}} {value}'
+
+
+def merge_metrics(texts) -> str:
+    """
+    Join (worker, exposition text) pairs into one exposition. HELP / TYPE
+    lines appear once per family and all samples of a family stay together,
+    as the text format requires.
+    """
+    families = {}  # family name -> (HELP/TYPE lines, samples)
+    for worker, text in texts:
+        family = families.setdefault(None, ([], []))
+        for line in text.splitlines():
+            if not line:
+                continue
+            if line.startswith("#"):
+                parts = line.split(" ", 3)
+                if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                    family = families.setdefault(parts[2], ([], []))
+                    if line not in family[0]:
+                        family[0].append(line)
+                continue
+            family[1].append(label_worker(line, worker))
+    lines = []
+    for headers, samples in families.values():
+        lines.extend(headers)
+        lines.extend(samples)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+# --------------------------------------
+# Worker processes
+# --------------------------------------
+def spawn_workers(count: int, host: str, base_port: int, log_level: str = "warning"):
+    """
+    Start ``count`` uvicorn game-service workers on consecutive ports. Each
+    worker needs its own durable store: a "{worker}" placeholder in
+    GAME_STORAGE is replaced by the worker index.
+    """
+    procs = []
+    for i in range(count):
+        env = dict(os.environ)
+        if "{worker}" in env.get("GAME_STORAGE", ""):
+            env["GAME_STORAGE"] = env["GAME_STORAGE"].replace("{worker}", str(i))
+        procs.append(subprocess.Popen([
+            sys.executable, "-m", "uvicorn", GAME_APP,
+            "--host", host, "--port", str(base_port + i), "--log-level", log_level,
+        ], env=env))
+    return procs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the game service as N room-affine workers.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8002, help="public port (dispatcher)")
+    parser.add_argument("--base-port", type=int, default=9102, help="first worker port")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args(argv)
+
+    ports = [args.base_port + i for i in range(args.workers)]
+    procs = spawn_workers(args.workers, "127.0.0.1", args.base_port, args.log_level)
+    dispatcher = Dispatcher(ports)
+
+    def shutdown(*_):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+    print(f"Dispatching {args.host}:{args.port} -> workers on ports {ports}", flush=True)
+    try:
+        asyncio.run(dispatcher.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
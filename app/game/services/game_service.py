@@ -1,12 +1,110 @@
 # app/game/services/game_service.py
 import asyncio
-from typing import Dict, Optional
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from app import serialization
+from app.game.bot import DensityBot
+from app.game.events import (
+    ROLE_SPECTATOR, MoveDelta, MoveMade, Resume, Snapshot, SpectatorSnapshot, SpectatorWaiting, Waiting,
+)
 from app.game.game_manager import GameManager
+from app.game.layout_pool import LayoutPool
+from app.game import wire
+from app.common.connection import Connection, Frame
+from app.common.tasks import spawn
+from app.game.services import actions
+from app.game.services.actions import TokenBucket, WS_FLOOD_LIMIT
+from app.game.services.registry import GameRegistry, STATUS_ACTIVE, STATUS_FINISHED, STATUS_WAITING
+from app.game.services.scheduler import GameScheduler, MAX_AUTO_MOVES, POLICY_FORFEIT, TURN_TIMEOUT_POLICY
+from app.game.services.tracing import MoveTracer
+from app.interservice import ServiceClient, ROOM_SERVICE_URL, require_internal
+from app.metrics import FAST_BUCKETS, MetricsRegistry, SamplingProfiler, instrument
+from app.storage import service_storage
+
+# Ready-made fleet layouts, so /game/create does not generate them inline
+layout_pool = LayoutPool()
+
+# Durable copy of every game (GAME_STORAGE / BATTLESHIP_STORAGE, in-memory by default)
+storage = service_storage("GAME_STORAGE")
+
+
+
+def game_evicted(room_id: str, entry):
+    """A room left the registry: drop its stored game; an unfinished one is reported as expired."""
+    storage.delete_game(room_id)
+    scheduler.disarm(room_id)
+    turn_clocks.discard(room_id)
+    auto_moves.pop(room_id, None)
+    if not entry.game.winner:
+        report_finished(room_id, None, REASON_EXPIRED)
+
+
+def save_game(room_id: str, gm: GameManager):
+    """Snapshot a game for restarts; skipped when the backend could not restore it anyway."""
+    if storage.durable:
+        storage.save_game(room_id, gm.to_state())
+
+
+# room_id -> GameManager, connected sockets and per-room move lock
+registry = GameRegistry(on_evict=game_evicted)
+
+# Pooled client for calls back to the room service
+services = ServiceClient({"room": ROOM_SERVICE_URL})
+
+# A game with this player name in either seat is played against the computer
+BOT_PLAYER = os.environ.get("BOT_PLAYER_NAME", "bot")
+# Seconds the bot waits before each shot, so humans can follow the game
+BOT_MOVE_DELAY = float(os.environ.get("BOT_MOVE_DELAY", "0.3"))
+
+
+def restore_bots():
+    """Give restored unfinished bot games their bot back, rebuilt from the public board state."""
+    for entry in registry.entries():
+        game = entry.game
+        if game is not None and BOT_PLAYER in game.players and not game.winner:
+            target = game.boards[game.get_opponent(BOT_PLAYER)]
+            entry.bot = DensityBot.from_board(target, BOT_PLAYER)
+            schedule_bot(entry.room_id)
+
 
-app = FastAPI(title="Battleship Game Service")
+def restore_turn_clocks():
+    """
+    Restart the turn clock of every restored game that was under way (a shot
+    was fired); the others wait for their players like new games.
+    """
+    for entry in registry.entries():
+        if entry.game is not None and not entry.game.winner and entry.game.seq:
+            turn_clocks.add(entry.room_id)
+            scheduler.arm(entry.room_id)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # first: restoring may already evict (and report) games
+    await services.start()
+    registry.restore(storage.load_games())
+    restore_bots()
+    restore_turn_clocks()
+    layout_pool.start()
+    sweeper = asyncio.create_task(registry.run_sweeper())
+    upkeep = asyncio.create_task(scheduler.run())
+    yield
+    upkeep.cancel()
+    sweeper.cancel()
+    await services.aclose()
+    layout_pool.stop()
+    storage.close()
+
+
+app = FastAPI(title="Battleship Game Service", lifespan=lifespan, default_response_class=serialization.JSONResponse)
 
 # --------------------------------------
 # CORS for frontend
@@ -19,36 +117,517 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# room_id -> GameManager
-games: Dict[str, GameManager] = {}
 
-# room_id -> { websocket: player_name }
-ws_clients: Dict[str, Dict[WebSocket, str]] = {}
+# --------------------------------------
+# Metrics (GET /metrics)
+# --------------------------------------
+def scrape_stats() -> dict:
+    """One walk of the registry per scrape: games by status, spectators and send queues."""
+    games = {STATUS_WAITING: 0, STATUS_ACTIVE: 0, STATUS_FINISHED: 0}
+    spectators = queued = deepest = dropped = 0
+    for entry in registry.entries():
+        games[entry.status] += 1
+        conns = list(entry.clients.values())
+        if entry.spectators:
+            spectators += len(entry.spectators)
+            conns.extend(entry.spectators)
+        for conn in conns:
+            depth = conn.queue_depth()
+            queued += depth
+            deepest = max(deepest, depth)
+            dropped += conn.dropped
+    return {"games": games, "spectators": spectators, "queued": queued, "deepest": deepest, "dropped": dropped}
+
+
+metrics = MetricsRegistry()
+instrument(app, metrics, services)
+scraped = metrics.per_scrape(scrape_stats)
+metrics.gauge("games", "Rooms by game status", ("status",),
+              fn=lambda: {(status,): count for status, count in scraped()["games"].items()})
+metrics.gauge("game_send_queue_frames", "Frames waiting in game sockets' send queues", fn=lambda: scraped()["queued"])
+metrics.gauge("game_send_queue_max_frames", "Deepest game socket send queue", fn=lambda: scraped()["deepest"])
+metrics.gauge("game_send_dropped_frames", "Frames dropped by open game sockets' overflow policy",
+              fn=lambda: scraped()["dropped"])
+metrics.gauge("game_spectators", "Open spectator sockets", fn=lambda: scraped()["spectators"])
+games_finished = metrics.counter("games_finished", "Games played to a winner")
+games_ended = metrics.counter("games_ended", "Games ended and reported to the room service, by reason", ("reason",))
+AUTO_MOVES = metrics.counter("turn_timeout_auto_moves", "Shots fired for players who ran out of time")
+HEARTBEAT_CLOSED = metrics.counter("ws_heartbeat_disconnects", "Sockets closed for not answering heartbeats")
+
+# Move path, split into phases; children are bound once so a move only does the observe()
+move_phase = metrics.histogram("game_move_phase_seconds", "Time per move in each phase", ("phase",), FAST_BUCKETS)
+MOVE_PARSE = move_phase.labels("parse")
+MOVE_APPLY = move_phase.labels("make_move")
+MOVE_SERIALIZE = move_phase.labels("serialize")
+MOVE_FANOUT = move_phase.labels("fanout")
+
+# Client frames dropped before reaching the game
+rejected = metrics.counter("ws_frames_rejected", "Client frames dropped by the WebSocket fast path", ("reason",))
+REJECTED_MALFORMED = rejected.labels("malformed")
+REJECTED_RATE = rejected.labels("rate_limited")
+FLOOD_CLOSED = metrics.counter("ws_flood_disconnects", "Sockets closed for flooding")
+
+# Sampled per-move traces and the CPU profiler behind /debug (both off until asked for)
+tracer = MoveTracer()
+profiler = SamplingProfiler()
+# The /debug routes are only mounted with GAME_DEBUG_ENDPOINTS=1, and then only for internal callers
+DEBUG_ENDPOINTS = os.environ.get("GAME_DEBUG_ENDPOINTS", "0") == "1"
+
+# Protocol 1 sends both full boards with every move_made event.
+# Protocol 2 (?v=2) sends only the changed cells plus a per-game "seq";
+# full boards go out on connected / game_created / resync only.
+PROTOCOL_FULL = 1
+PROTOCOL_DELTA = 2
+
+# ?fmt=binary selects the packed frames in app.game.wire
+FORMAT_JSON = "json"
+FORMAT_BINARY = "binary"
+
+# ?role=spectator watches a game: both fog-of-war boards plus the move feed
+# (JSON only), encoded once per move for all spectators
+ROLE_PLAYER = "player"
+
+# Compact JSON text from the configured backend (orjson / msgspec / stdlib, see app.serialization);
+# accepts the typed events of app.game.events as well as plain dicts
+encode_json = serialization.dumps
+
+# Frames that never change, encoded once
+WAITING_FRAME = encode_json(Waiting())
+SPECTATOR_WAITING_FRAME = encode_json(SpectatorWaiting())
+
+
+async def receive_action(conn: Connection, limiter: TokenBucket):
+    """
+    Next client action on ``conn`` as a validated dict (see
+    app.game.services.actions), from either a JSON text frame or a binary
+    frame, and the seconds spent decoding it. Frames over the socket's rate
+    are dropped before decoding and frames that fail the schema are dropped
+    after; both return None. A socket that keeps flooding is closed. Any
+    frame, a heartbeat pong included, marks the socket as alive.
+    """
+    ws = conn.ws
+    message = await ws.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    conn.last_seen = time.monotonic()
+
+    if not limiter.allow():
+        REJECTED_RATE.inc()
+        if limiter.rejected_in_row >= WS_FLOOD_LIMIT:
+            FLOOD_CLOSED.inc()
+            await ws.close(code=1008)
+            raise WebSocketDisconnect(1008)
+        return None, 0.0
+
+    start = time.perf_counter()
+    if message.get("bytes") is not None:
+        raw = actions.parse_dict(wire.decode_client_frame(message["bytes"]))
+    else:
+        raw = actions.parse_text(message.get("text") or "")
+    elapsed = time.perf_counter() - start
+    MOVE_PARSE.observe(elapsed)
+    if raw is None:
+        REJECTED_MALFORMED.inc()
+    return raw, elapsed
 
 
-# Safe sender to avoid crashes
-async def safe_send(ws: WebSocket, payload):
+# --------------------------------------
+# Utility: Fog-of-war
+# --------------------------------------
+def serialize_boards(game: GameManager, player: str):
+    # the fog-of-war view is kept up to date by GameManager.make_move
+    return {"self": game.boards[player].grid, "opponent": game.views[player]}
+
+
+def with_boards(payload, game: GameManager, player: str) -> str:
+    """
+    Encode ``payload`` plus a "boards" member, splicing in the game's cached
+    board encodings so unchanged boards are never re-serialized.
+    """
+    return splice_boards(encode_json(payload)[:-1], game, player)
+
+
+def splice_boards(head: str, game: GameManager, player: str) -> str:
+    """``head`` is an encoded event without its closing brace, shared by all recipients."""
+    return (
+        f'{head},"boards":{{"self":{game.board_json(player)},'
+        f'"opponent":{game.view_json(player)}}}}}'
+    )
+
+
+def with_public_boards(payload, game: GameManager) -> str:
+    """
+    Encode ``payload`` plus the public view: each player's board as their
+    opponent sees it, keyed by player name. Built from the cached fog encodings.
+    """
+    head = encode_json(payload)[:-1]
+    first, second = game.players
+    return (
+        f'{head},"boards":{{{encode_json(first)}:{game.view_json(second)},'
+        f'{encode_json(second)}:{game.view_json(first)}}}}}'
+    )
+
+
+def move_delta(game: GameManager, room_id: str, by: str, row: int, col: int, result: str, move) -> MoveDelta:
+    """Protocol-2 move_made event for a move (see ``MoveDelta``)."""
+    cells = []
+    sunk = None
+    if move is not None:
+        if move.result == "miss":
+            cells.append([move.row, move.col, "M"])
+        elif move.result != "already":
+            cells.append([move.row, move.col, "X"])
+            if move.result.startswith("sunk "):
+                sunk = move.result[len("sunk "):]
+
+    return MoveDelta(
+        game_id=room_id,
+        seq=game.seq,
+        by=by,
+        target=move.target if move else game.get_opponent(by),
+        row=row,
+        col=col,
+        result=result,
+        sunk=sunk,
+        cells=cells,
+        current_turn=game.current_turn,
+        winner=game.winner,
+    )
+
+
+def move_made(game: GameManager, room_id: str, by: str, row: int, col: int, result: str) -> MoveMade:
+    """Protocol-1 move_made event, before its boards are spliced in."""
+    return MoveMade(
+        game_id=room_id,
+        seq=game.seq,
+        by=by,
+        row=row,
+        col=col,
+        result=result,
+        current_turn=game.current_turn,
+        winner=game.winner,
+    )
+
+
+def snapshot(conn: Connection, event: str, game: GameManager, room_id: str):
+    """Full-state event (connected / game_created / resync) in the connection's format."""
+    if conn.binary:
+        return wire.encode_snapshot(event, game, conn.player)
+
+    return with_boards(Snapshot(
+        event=event,
+        game_id=room_id,
+        players=game.players,
+        current_turn=game.current_turn,
+        winner=game.winner,
+        seq=game.seq,
+    ), game, conn.player)
+
+
+def resume_frame(game: GameManager, room_id: str, since) -> Optional[str]:
+    """
+    Protocol-2 "resume" event: the moves after seq ``since`` from the game's
+    move log, each as [seq, by, target, row, col, result]. None when the log
+    cannot cover the gap, in which case the caller sends a full snapshot.
+    """
+    moves = game.moves_since(since)
+    if moves is None:
+        return None
+    return encode_json(Resume(
+        game_id=room_id,
+        since=since,
+        seq=game.seq,
+        moves=[[m.seq, m.player, m.target, m.row, m.col, m.result] for m in moves],
+        current_turn=game.current_turn,
+        winner=game.winner,
+    ))
+
+
+def catch_up(conn: Connection, event: str, game: GameManager, room_id: str, since,
+             public: bool = False) -> Frame:
+    """
+    What a (re)connecting socket needs: only the missed moves for a
+    protocol-2 JSON client that says which seq it has, else a full snapshot
+    (the public one for spectators).
+    """
+    if since is not None and conn.protocol == PROTOCOL_DELTA and not conn.binary:
+        frame = resume_frame(game, room_id, since)
+        if frame is not None:
+            return frame
+    if public:
+        return public_snapshot(event, game, room_id)
+    return snapshot(conn, event, game, room_id)
+
+
+def public_snapshot(event: str, game: GameManager, room_id: str) -> str:
+    """Spectator full-state event; the same frame serves every spectator."""
+    return with_public_boards(SpectatorSnapshot(
+        event=event,
+        game_id=room_id,
+        players=game.players,
+        current_turn=game.current_turn,
+        winner=game.winner,
+        seq=game.seq,
+    ), game)
+
+
+def resync_snapshot(room_id: str):
+    """Resync builder for the room's connections (used after a send-queue overflow)."""
+    def build(conn: Connection):
+        game = registry.game(room_id)
+        return snapshot(conn, "resync", game, room_id) if game else None
+    return build
+
+
+def spectator_resync(room_id: str):
+    def build(conn: Connection):
+        game = registry.game(room_id)
+        return public_snapshot("resync", game, room_id) if game else None
+    return build
+
+
+def broadcast_move(room_id: str, game: GameManager, by: str, row: int, col: int, result: str, move,
+                   trace=None):
+    """
+    Queue the move_made event for every socket in the room: full boards for
+    protocol 1, one shared delta for protocol 2, a packed frame for binary.
+    Spectators get one public frame per protocol, handed to their channel.
+    Each event is encoded at most once; protocol-1 frames only differ in the
+    spliced boards. Encoding time is recorded as the serialize phase, the
+    rest as fanout.
+    """
+    entry = registry.get(room_id)
+    if entry is None:
+        return
+    clock = time.perf_counter
+    start = clock()
+    encoding = 0.0
+    delta = head = None
+    for conn in entry.clients.values():
+        t = clock()
+        if conn.binary:
+            frame = wire.encode_move(game, conn.player, row, col, result, move)
+        elif conn.protocol == PROTOCOL_DELTA:
+            if delta is None:
+                delta = encode_json(move_delta(game, room_id, by, row, col, result, move))
+            frame = delta
+        else:
+            if head is None:
+                head = encode_json(move_made(game, room_id, by, row, col, result))[:-1]
+            frame = splice_boards(head, game, conn.player)
+        encoding += clock() - t
+        conn.send(frame)
+
+    watchers = entry.spectators
+    if watchers:
+        t = clock()
+        full = None
+        if watchers.full:
+            full = with_public_boards(move_made(game, room_id, by, row, col, result), game)
+        if watchers.delta and delta is None:
+            delta = encode_json(move_delta(game, room_id, by, row, col, result, move))
+        encoding += clock() - t
+        watchers.publish(full, delta)
+    fanout = clock() - start - encoding
+    MOVE_SERIALIZE.observe(encoding)
+    MOVE_FANOUT.observe(fanout)
+    if trace is not None:
+        trace.add("serialize", encoding)
+        trace.add("fanout", fanout)
+
+
+def play_move(room_id: str, gm: GameManager, player: str, row: int, col: int, trace=None):
+    """Apply one move (caller holds the room lock), persist it and fan it out. Returns the Move or None."""
+    seq_before = gm.seq
+    start = time.perf_counter()
+    result = gm.make_move(player, row, col)
+    elapsed = time.perf_counter() - start
+    MOVE_APPLY.observe(elapsed)
+    if trace is not None:
+        trace.add("make_move", elapsed)
+    move = gm.last_move if gm.seq != seq_before else None
+    if move is not None and gm.winner:
+        games_finished.inc()
+        game_over(room_id, gm.winner, REASON_WON)
+    elif move is not None and (room_id in turn_clocks or player != BOT_PLAYER):
+        # a shot restarts the clock (a hit keeps the turn); the first human shot starts it
+        turn_clocks.add(room_id)
+        scheduler.arm(room_id)
+    registry.touch(room_id)
+    if move is not None:
+        # buffered by the backend, never waits on the disk
+        save_game(room_id, gm)
+        if trace is not None:
+            trace.mark("save")
+
+    broadcast_move(room_id, gm, player, row, col, result, move, trace)
+    return move
+
+
+# --------------------------------------
+# Bot opponent
+# --------------------------------------
+# rooms whose bot turn task is running, so a turn is never played twice
+bot_turns = set()
+
+
+def schedule_bot(room_id: str):
+    """Start the bot's turn in the background if it is the bot's move."""
+    entry = registry.get(room_id)
+    if entry and entry.bot and entry.game and not entry.game.winner \
+            and entry.game.current_turn == entry.bot.name and room_id not in bot_turns:
+        bot_turns.add(room_id)
+        spawn(bot_turn(room_id))
+
+
+async def bot_turn(room_id: str):
+    """Fire until the turn passes (a hit keeps the turn), one shot per BOT_MOVE_DELAY."""
     try:
-        await ws.send_json(payload)
-    except Exception:
-        pass
+        await _bot_shots(room_id)
+    finally:
+        bot_turns.discard(room_id)
+
+
+async def _bot_shots(room_id: str):
+    while True:
+        await asyncio.sleep(BOT_MOVE_DELAY)
+        entry = registry.get(room_id)
+        if entry is None or entry.bot is None:
+            return
+        bot = entry.bot
+        async with entry.lock:
+            gm = entry.game
+            if gm is None or gm.winner or gm.current_turn != bot.name:
+                return
+            row, col = bot.choose()
+            move = play_move(room_id, gm, bot.name, row, col)
+            if move is not None:
+                bot.observe(row, col, move.result)
+            if gm.winner or gm.current_turn != bot.name:
+                return
 
 
 # --------------------------------------
-# Utility: Fog-of-war
+# Turn clock, heartbeats and game results
 # --------------------------------------
-def serialize_boards(game: GameManager, player: str):
-    opponent = game.get_opponent(player)
+# Why a game ended, as reported to the room service
+REASON_WON = "won"              # played to the last ship
+REASON_FORFEIT = "forfeit"      # the player on turn ran out of time
+REASON_ABANDONED = "abandoned"  # the player on turn had no socket open when the clock ran out
+REASON_EXPIRED = "expired"      # evicted unfinished: idle with nobody connected
+
+# room_id -> {player: shots the turn clock fired for them in a row}
+auto_moves = {}
+
+# Rooms whose turn clock runs. It starts once every seat is taken, or with the
+# first human shot, so a player who connects late is not timed out before the
+# game has begun; from then on every shot restarts it.
+turn_clocks = set()
+
+
+def seated(entry) -> bool:
+    """Every human player has a socket open (the bot's seat is always taken)."""
+    connected = {conn.player for conn in entry.clients.values()}
+    return all(p in connected or p == BOT_PLAYER for p in entry.game.players)
+
 
-    own = game.boards[player].grid
-    opp_real = game.boards[opponent].grid
+def start_turn_clock(room_id: str):
+    """Start the room's turn clock if its game is on and every seat is taken (no-op once running)."""
+    entry = registry.get(room_id)
+    if entry is None or entry.game is None or entry.game.winner or room_id in turn_clocks:
+        return
+    if seated(entry):
+        turn_clocks.add(room_id)
+        scheduler.arm(room_id)
 
-    opp_view = [
-        [c if c in ("X", "M") else "~" for c in row]
-        for row in opp_real
-    ]
 
-    return {"self": own, "opponent": opp_view}
+async def notify_finished(room_id: str, winner: Optional[str], reason: str):
+    """Tell the room service the game is over, so the room is marked finished (best effort)."""
+    try:
+        await services.post("room", "/internal/game_finished",
+                            json={"room_id": room_id, "winner": winner, "reason": reason}, idempotent=True)
+    except httpx.RequestError:
+        pass
+
+
+def report_finished(room_id: str, winner: Optional[str], reason: str):
+    games_ended.labels(reason).inc()
+    spawn(notify_finished(room_id, winner, reason))
+
+
+def game_over(room_id: str, winner: Optional[str], reason: str):
+    scheduler.disarm(room_id)
+    turn_clocks.discard(room_id)
+    auto_moves.pop(room_id, None)
+    report_finished(room_id, winner, reason)
+
+
+def player_connected(entry, player: str) -> bool:
+    return any(conn.player == player for conn in entry.clients.values())
+
+
+def forfeit(room_id: str, entry, player: str, reason: str):
+    """End the game in the opponent's favour and push the final state to everyone (caller holds the lock)."""
+    gm = entry.game
+    winner = gm.forfeit(player)
+    if winner is None:
+        return
+    registry.touch(room_id)
+    save_game(room_id, gm)
+    # a snapshot carries the winner and is understood by every client and format
+    for conn in entry.clients.values():
+        conn.send(snapshot(conn, "resync", gm, room_id))
+    if entry.spectators:
+        frame = public_snapshot("resync", gm, room_id)
+        entry.spectators.publish(frame, frame)
+    game_over(room_id, winner, reason)
+
+
+def auto_move(room_id: str, gm: GameManager, player: str):
+    """Fire the shot a DensityBot would, for a player who let the clock run out (caller holds the lock)."""
+    target = gm.boards[gm.get_opponent(player)]
+    row, col = DensityBot.from_board(target, player).choose()
+    counts = auto_moves.setdefault(room_id, {})
+    counts[player] = counts.get(player, 0) + 1
+    AUTO_MOVES.inc()
+    play_move(room_id, gm, player, row, col)
+
+
+async def turn_timeout(room_id: str):
+    """
+    The player on turn let the clock run out. With no socket open they
+    forfeit; otherwise TURN_TIMEOUT_POLICY decides between a shot fired
+    for them and a forfeit (also after MAX_AUTO_MOVES shots in a row).
+    """
+    entry = registry.get(room_id)
+    if entry is None:
+        return
+    async with entry.lock:
+        gm = entry.game
+        if gm is None or gm.winner:
+            return
+        player = gm.current_turn
+        if entry.bot is not None and player == entry.bot.name:
+            # the bot never runs out of time; make sure its turn is running
+            scheduler.arm(room_id)
+        elif not player_connected(entry, player):
+            forfeit(room_id, entry, player, REASON_ABANDONED)
+        elif TURN_TIMEOUT_POLICY == POLICY_FORFEIT \
+                or auto_moves.get(room_id, {}).get(player, 0) >= MAX_AUTO_MOVES:
+            forfeit(room_id, entry, player, REASON_FORFEIT)
+        else:
+            auto_move(room_id, gm, player)
+    schedule_bot(room_id)
+
+
+def close_silent(conn: Connection):
+    """A socket stopped answering heartbeats; its receive loop cleans up once it is closed."""
+    HEARTBEAT_CLOSED.inc()
+    spawn(conn.close(code=1001))
+
+
+# Turn deadlines and WebSocket heartbeats (started by the lifespan)
+scheduler = GameScheduler(registry, on_turn_timeout=turn_timeout, on_silent=close_silent)
 
 
 # --------------------------------------
@@ -64,24 +643,29 @@ class CreateGame(BaseModel):
 async def create_game(req: CreateGame):
     """
     RoomService calls this endpoint when the host starts the game.
-    Both players may already be connected via WS.
+    Both players may already be connected via WS. Naming BOT_PLAYER as
+    either player makes it a game against the computer.
     """
-    room_id = req.room_id or f"game_{len(games)+1}"
-
-    gm = GameManager(req.player1, req.player2)
-    games[room_id] = gm
+    room_id = req.room_id or registry.next_game_id()
+
+    gm = GameManager(req.player1, req.player2, layouts=layout_pool)
+    bot = DensityBot(BOT_PLAYER) if BOT_PLAYER in gm.players else None
+    entry = registry.put_game(room_id, gm, bot=bot)
+    save_game(room_id, gm)
+    # a new game in the room: its clock waits for both players again
+    scheduler.disarm(room_id)
+    turn_clocks.discard(room_id)
+    auto_moves.pop(room_id, None)
+    start_turn_clock(room_id)
 
     # IMPORTANT:
     # Notify all connected clients that the game has really started
-    if room_id in ws_clients:
-        for ws, player in ws_clients[room_id].items():
-            await safe_send(ws, {
-                "event": "game_created",
-                "game_id": room_id,
-                "players": gm.players,
-                "current_turn": gm.current_turn,
-                "boards": serialize_boards(gm, player)
-            })
+    for conn in entry.clients.values():
+        conn.send(snapshot(conn, "game_created", gm, room_id))
+    if entry.spectators:
+        frame = public_snapshot("game_created", gm, room_id)
+        entry.spectators.publish(frame, frame)
+    schedule_bot(room_id)
 
     return {"message": "game_created", "room_id": room_id}
 
@@ -90,66 +674,288 @@ async def create_game(req: CreateGame):
 # WEBSOCKET HANDLING
 # --------------------------------------
 @app.websocket("/ws/{room_id}")
-async def ws_endpoint(ws: WebSocket, room_id: str, player: str = Query(...)):
+async def ws_endpoint(
+    ws: WebSocket,
+    room_id: str,
+    player: Optional[str] = None,
+    v: int = PROTOCOL_FULL,
+    fmt: str = FORMAT_JSON,
+    role: str = ROLE_PLAYER,
+    since: Optional[int] = None,
+):
+    """
+    ``since`` is the last seq the client has seen (a reconnect): protocol-2
+    JSON clients then get only the missed moves instead of full boards.
+    """
+    if role == ROLE_SPECTATOR:
+        await spectate(ws, room_id, player, v, since)
+        return
+    # the bot's seat is played by the service itself, never by a socket
+    if role != ROLE_PLAYER or not player or player == BOT_PLAYER:
+        await ws.close(code=1008)
+        return
+
     await ws.accept()
 
-    # register connection
-    ws_clients.setdefault(room_id, {})[ws] = player
+    # register connection; all writes go through its queue and writer task
+    conn = Connection(ws, player, protocol=v, fmt=fmt, resync=resync_snapshot(room_id))
+    registry.add_client(room_id, ws, conn)
+    limiter = TokenBucket()
+    conn.start()
 
-    gm = games.get(room_id)
+    gm = registry.game(room_id)
 
-    # CASE 1: Game already created → send actual game state
+    # CASE 1: Game already created → send actual game state (or what was missed)
     if gm:
-        await safe_send(ws, {
-            "event": "connected",
-            "game_id": room_id,
-            "current_turn": gm.current_turn,
-            "boards": serialize_boards(gm, player)
-        })
+        conn.send(catch_up(conn, "connected", gm, room_id, since))
+        start_turn_clock(room_id)
 
     # CASE 2: Game NOT started yet → wait for /game/create
+    elif conn.binary:
+        conn.send(wire.encode_waiting())
     else:
-        await safe_send(ws, {
-            "event": "connected",
-            "message": "waiting_for_game"
-        })
+        conn.send(WAITING_FRAME)
 
     try:
         while True:
-            raw = await ws.receive_json()
+            raw, parse_time = await receive_action(conn, limiter)
+            if raw is None:
+                continue
 
-            if raw.get("action") == "move":
-                p = raw["player_name"]
+            if raw["action"] == "move":
+                # moves always act for the socket's own player, whatever the frame claims
+                p = player
                 row = raw["row"]
                 col = raw["col"]
 
-                gm = games.get(room_id)
+                lock = registry.lock(room_id)
+                if lock is None or not registry.game(room_id):
+                    continue
+
+                trace = tracer.begin(room_id, p)
+                if trace is not None:
+                    trace.add("parse", parse_time)
+
+                # one move at a time per room; the game is read under the lock
+                # since /game/create may replace it meanwhile
+                async with lock:
+                    if trace is not None:
+                        trace.mark("lock_wait")
+                    gm = registry.game(room_id)
+                    if gm:
+                        play_move(room_id, gm, p, row, col, trace)
+                        counts = auto_moves.get(room_id)
+                        if counts:
+                            counts.pop(p, None)
+                schedule_bot(room_id)
+                if trace is not None:
+                    tracer.finish(trace)
+
+            elif raw["action"] == "resync":
+                gm = registry.game(room_id)
                 if not gm:
                     continue
 
-                result = gm.make_move(p, row, col)
-
-                # broadcast updated boards
-                for client_ws, pname in ws_clients[room_id].items():
-                    await safe_send(client_ws, {
-                        "event": "move_made",
-                        "game_id": room_id,
-                        "by": p,
-                        "row": row,
-                        "col": col,
-                        "result": result,
-                        "current_turn": gm.current_turn,
-                        "winner": gm.winner,
-                        "boards": serialize_boards(gm, pname)
-                    })
+                conn.send(snapshot(conn, "resync", gm, room_id))
+
+            elif raw["action"] == "resume":
+                gm = registry.game(room_id)
+                if not gm:
+                    continue
+
+                conn.send(catch_up(conn, "resync", gm, room_id, raw["seq"]))
 
     except WebSocketDisconnect:
         pass
     finally:
-        ws_clients[room_id].pop(ws, None)
+        registry.remove_client(room_id, ws)
+        await conn.close()
 
 
-# List games (CLI uses this)
+async def spectate(ws: WebSocket, room_id: str, name: Optional[str], protocol: int, since: Optional[int] = None):
+    """
+    Spectator socket: a public snapshot (or the missed moves) now, then the
+    room's shared move feed. Frames may arrive with a seq at or below the
+    snapshot's, which clients skip. Accepts "resync", "resume" and "pong" only.
+    """
+    await ws.accept()
+    conn = Connection(ws, name or "", protocol=protocol, resync=spectator_resync(room_id))
+    conn.start()
+
+    gm = registry.game(room_id)
+    if gm:
+        conn.send(catch_up(conn, "connected", gm, room_id, since, public=True))
+    else:
+        conn.send(SPECTATOR_WAITING_FRAME)
+    registry.add_spectator(room_id, conn, delta=protocol == PROTOCOL_DELTA)
+    limiter = TokenBucket()
+
+    try:
+        while True:
+            raw, _ = await receive_action(conn, limiter)
+            gm = registry.game(room_id)
+            if raw is None or gm is None:
+                continue
+            if raw["action"] == "resync":
+                conn.send(public_snapshot("resync", gm, room_id))
+            elif raw["action"] == "resume":
+                conn.send(catch_up(conn, "resync", gm, room_id, raw["seq"], public=True))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        registry.remove_spectator(room_id, conn)
+        await conn.close()
+
+
+# Moves per chunk of a streamed replay
+REPLAY_CHUNK = 256
+
+
+@app.get("/game/{room_id}/replay")
+async def replay_game(room_id: str):
+    """
+    A finished game's move log as NDJSON: a header line (players, winner,
+    number of moves), then one {"seq", "by", "target", "row", "col",
+    "result"} line per move, streamed in chunks.
+    """
+    gm = registry.game(room_id)
+    if gm is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if not gm.winner:
+        raise HTTPException(status_code=409, detail="Game is still in progress")
+    moves = gm.moves_since(gm.log_start)
+
+    def lines():
+        yield encode_json({
+            "game_id": room_id,
+            "players": gm.players,
+            "winner": gm.winner,
+            "first_seq": gm.log_start + 1,
+            "moves": len(moves),
+        }) + "\n"
+        for i in range(0, len(moves), REPLAY_CHUNK):
+            yield "".join(
+                encode_json({"seq": m.seq, "by": m.player, "target": m.target,
+                             "row": m.row, "col": m.col, "result": m.result}) + "\n"
+                for m in moves[i:i + REPLAY_CHUNK]
+            )
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# List games (CLI uses this), one page at a time
 @app.get("/list_games")
-async def list_games():
-    return {"active_games": list(games.keys())}
+async def list_games(
+    status: Optional[str] = Query(None, pattern="^(waiting|active|finished)$"),
+    player: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """One page of games, oldest first; pass ``next_cursor`` back as ``cursor`` for the next."""
+    try:
+        total, page, next_cursor = registry.list(status=status, player=player, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {
+        "active_games": [g["room_id"] for g in page],
+        "games": page,
+        "total": total,
+        "limit": limit,
+        "next_cursor": next_cursor,
+    }
+
+
+# Room counts, evictions and estimated memory
+@app.get("/registry")
+async def registry_stats():
+    return {**registry.memory_stats(), "storage": storage.stats()}
+
+
+@app.get("/scheduler")
+async def scheduler_stats():
+    """Turn clock and heartbeat settings and counters."""
+    return scheduler.stats()
+
+
+# Layout pool size and hit/miss counters
+@app.get("/layout_pool")
+async def layout_pool_stats():
+    return layout_pool.stats()
+
+
+@app.get("/internal/upstreams", dependencies=[Depends(require_internal)])
+async def upstream_stats():
+    """Per-target request counts, breaker state and latency histograms."""
+    return services.stats()
+
+
+# --------------------------------------
+# Debug: move tracing and CPU profiling
+# --------------------------------------
+debug = APIRouter(prefix="/debug", dependencies=[Depends(require_internal)])
+
+
+@debug.post("/tracing")
+async def start_tracing(
+    sample_rate: float = Query(1.0, gt=0, le=1),
+    room_id: Optional[str] = None,
+    seconds: Optional[float] = Query(None, gt=0),
+):
+    """Trace a fraction of moves (optionally one room, optionally for ``seconds``)."""
+    tracer.configure(sample_rate, room_id, seconds)
+    return tracer.stats()
+
+
+@debug.delete("/tracing")
+async def stop_tracing(clear: bool = False):
+    tracer.stop()
+    if clear:
+        tracer.clear()
+    return tracer.stats()
+
+
+@debug.get("/tracing")
+async def tracing_report(room_id: Optional[str] = None, limit: int = Query(100, ge=1, le=2000)):
+    """Per-room mean span timings and the most recent traces, newest first."""
+    return {
+        **tracer.stats(),
+        "rooms": tracer.rooms(),
+        "traces": tracer.recent(room_id, limit),
+    }
+
+
+@debug.post("/profile")
+async def start_profile(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval: float = Query(0.005, ge=0.001, le=1),
+):
+    """Sample the event loop thread's stack every ``interval`` seconds for ``seconds``."""
+    # async endpoint: this runs on the event loop thread, which is the one to profile
+    if not profiler.start(seconds, interval, threading.get_ident()):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return profiler.stats()
+
+
+@debug.get("/profile")
+async def profile_status(limit: int = Query(20, ge=1, le=200)):
+    report = profiler.stats()
+    if not profiler.running:
+        report["top"] = profiler.top(limit)
+    return report
+
+
+@debug.get("/profile/download")
+async def download_profile():
+    """The last finished profile as folded stacks (flamegraph.pl / speedscope)."""
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="Profile still running")
+    if profiler.finished_at is None:
+        raise HTTPException(status_code=404, detail="No profile captured yet")
+    return PlainTextResponse(
+        profiler.folded(),
+        headers={"Content-Disposition": f'attachment; filename="game-service-{int(profiler.started_at)}.folded"'},
+    )
+
+
+if DEBUG_ENDPOINTS:
+    app.include_router(debug)
@@ -0,0 +1,442 @@
+import asyncio
+import bisect
+import gc
+import itertools
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from fastapi import WebSocket
+from app.game.game_manager import GameManager
+from app.game.services.spectators import SpectatorChannel
+
+# Number of independent shards; each sweep tick only walks one of them
+REGISTRY_SHARDS = int(os.environ.get("GAME_REGISTRY_SHARDS", "16"))
+# Hard cap on rooms kept in memory; least recently used idle rooms go first
+MAX_GAMES = int(os.environ.get("GAME_MAX_GAMES", "100000"))
+# Seconds a room may sit without moves or connections before it is evicted
+IDLE_TTL = float(os.environ.get("GAME_IDLE_TTL", "3600"))
+# Seconds a finished game is kept (e.g. for late reconnects) once its sockets are gone
+FINISHED_TTL = float(os.environ.get("GAME_FINISHED_TTL", "300"))
+# Seconds between sweep ticks
+SWEEP_INTERVAL = float(os.environ.get("GAME_SWEEP_INTERVAL", "5"))
+
+# Games sampled when estimating memory per game
+MEMORY_SAMPLE = 64
+
+STATUS_WAITING = "waiting"    # sockets connected, /game/create not called yet
+STATUS_ACTIVE = "active"
+STATUS_FINISHED = "finished"
+
+
+class RoomEntry:
+    """Everything the game service keeps for one room."""
+
+    __slots__ = ("room_id", "game", "clients", "spectators", "lock", "created", "created_at", "last_active",
+                 "finished_at", "bot", "listed")
+
+    def __init__(self, room_id: str, now: float):
+        self.room_id = room_id
+        self.game: Optional[GameManager] = None
+        self.clients: Dict[WebSocket, object] = {}
+        self.spectators: Optional[SpectatorChannel] = None  # created with the first spectator
+        self.lock = asyncio.Lock()
+        self.created = now
+        # wall clock: listing order, comparable across worker processes
+        self.created_at = time.time()
+        self.last_active = now
+        self.finished_at: Optional[float] = None
+        self.bot = None  # DensityBot holding one seat, for games against the computer
+        self.listed = None  # (status, players) the listing indexes hold it under
+
+    @property
+    def connected(self) -> bool:
+        """Any player or spectator socket open."""
+        return bool(self.clients or self.spectators)
+
+    @property
+    def status(self) -> str:
+        if self.game is None:
+            return STATUS_WAITING
+        return STATUS_FINISHED if self.game.winner else STATUS_ACTIVE
+
+    def summary(self) -> dict:
+        game = self.game
+        return {
+            "room_id": self.room_id,
+            "created": self.created_at,
+            "status": self.status,
+            "players": game.players if game else [],
+            "current_turn": game.current_turn if game else None,
+            "winner": game.winner if game else None,
+            "seq": game.seq if game else 0,
+            "clients": len(self.clients),
+            "spectators": len(self.spectators) if self.spectators else 0,
+        }
+
+
+class GameRegistry:
+    """
+    Sharded in-memory registry of rooms: their GameManager, connected sockets
+    and a per-room asyncio lock that serializes moves.
+
+    Each shard is an OrderedDict in least-recently-used order. ``sweep()``
+    evicts finished games after ``finished_ttl``, rooms idle for
+    ``idle_ttl`` and, above ``max_games``, the least recently used rooms.
+    Rooms with connected sockets (players or spectators) are never evicted.
+    ``on_evict(room_id, entry)`` is called for every evicted room that had a game.
+
+    For ``list()`` every room's listing key (see ``order_key``) is also kept
+    in sorted lists: all rooms, by status and by player. A page is then a
+    slice found by bisection instead of a sort of the whole registry.
+    """
+
+    def __init__(
+        self,
+        shards: int = REGISTRY_SHARDS,
+        max_games: int = MAX_GAMES,
+        idle_ttl: float = IDLE_TTL,
+        finished_ttl: float = FINISHED_TTL,
+        clock=time.monotonic,
+        on_evict=None,
+    ):
+        self._shards = [OrderedDict() for _ in range(max(1, shards))]
+        self.max_games = max_games
+        self.idle_ttl = idle_ttl
+        self.finished_ttl = finished_ttl
+        self.clock = clock
+        self.on_evict = on_evict
+        self.evicted = 0
+        self._next_shard = 0
+        self._ids = itertools.count(1)
+        self._all: List[tuple] = []
+        self._by_status: Dict[str, List[tuple]] = {
+            status: [] for status in (STATUS_WAITING, STATUS_ACTIVE, STATUS_FINISHED)
+        }
+        self._by_player: Dict[str, List[tuple]] = {}
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def _shard(self, room_id: str) -> OrderedDict:
+        return self._shards[hash(room_id) % len(self._shards)]
+
+    def get(self, room_id: str) -> Optional[RoomEntry]:
+        return self._shard(room_id).get(room_id)
+
+    def entry(self, room_id: str) -> RoomEntry:
+        """The room's entry, created if needed; marks it as recently used."""
+        shard = self._shard(room_id)
+        entry = shard.get(room_id)
+        now = self.clock()
+        if entry is None:
+            entry = shard[room_id] = RoomEntry(room_id, now)
+            bisect.insort(self._all, order_key(entry))
+            self._index(entry)
+        else:
+            shard.move_to_end(room_id)
+            entry.last_active = now
+        return entry
+
+    def game(self, room_id: str) -> Optional[GameManager]:
+        entry = self.get(room_id)
+        return entry.game if entry else None
+
+    def clients(self, room_id: str) -> Dict[WebSocket, object]:
+        entry = self.get(room_id)
+        return entry.clients if entry else {}
+
+    def lock(self, room_id: str) -> Optional[asyncio.Lock]:
+        """The room's move lock, or None for an unknown room (a lookup never creates one)."""
+        entry = self.get(room_id)
+        return entry.lock if entry else None
+
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self._shard(room_id)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def entries(self):
+        for shard in self._shards:
+            yield from shard.values()
+
+    # ---------------------------
+    # Index maintenance
+    # ---------------------------
+    def _index(self, entry: RoomEntry):
+        key = order_key(entry)
+        players = tuple(entry.game.players) if entry.game else ()
+        entry.listed = entry.status, players
+        bisect.insort(self._by_status[entry.status], key)
+        for player in players:
+            bisect.insort(self._by_player.setdefault(player, []), key)
+
+    def _unindex(self, entry: RoomEntry):
+        key = order_key(entry)
+        status, players = entry.listed
+        _discard(self._by_status[status], key)
+        for player in players:
+            games = self._by_player[player]
+            _discard(games, key)
+            if not games:
+                del self._by_player[player]
+
+    def _reindex(self, entry: RoomEntry):
+        """Move a room to its new status (and players) in the indexes, if they changed."""
+        if entry.listed != (entry.status, tuple(entry.game.players) if entry.game else ()):
+            self._unindex(entry)
+            self._index(entry)
+
+    def _drop(self, shard: OrderedDict, room_id: str) -> RoomEntry:
+        entry = shard.pop(room_id)
+        _discard(self._all, order_key(entry))
+        self._unindex(entry)
+        return entry
+
+    # ---------------------------
+    # Updates
+    # ---------------------------
+    def next_game_id(self) -> str:
+        while True:
+            room_id = f"game_{next(self._ids)}"
+            if room_id not in self:
+                return room_id
+
+    def put_game(self, room_id: str, game: GameManager, bot=None) -> RoomEntry:
+        entry = self.entry(room_id)
+        entry.game = game
+        entry.bot = bot
+        entry.finished_at = None
+        self._reindex(entry)
+        self.enforce_capacity()
+        return entry
+
+    def restore(self, states: Dict[str, dict]) -> int:
+        """
+        Load games saved with ``GameManager.to_state()`` (startup recovery).
+        The cyclic GC is paused meanwhile: rebuilding many games allocates
+        millions of small objects and would otherwise trigger collections
+        over and over. Finished games count as finished from now on, so they
+        expire after ``finished_ttl`` like any other.
+        """
+        gc.disable()
+        try:
+            for room_id, state in states.items():
+                entry = self.entry(room_id)
+                entry.game = GameManager.from_state(state)
+                if entry.game.winner:
+                    entry.finished_at = entry.last_active
+                self._reindex(entry)
+        finally:
+            gc.enable()
+        self.enforce_capacity()
+        return len(states)
+
+    def touch(self, room_id: str):
+        """Record activity (a move); notes when the game has just finished."""
+        entry = self.entry(room_id)
+        if entry.game and entry.game.winner and entry.finished_at is None:
+            entry.finished_at = entry.last_active
+            self._reindex(entry)
+
+    def add_client(self, room_id: str, ws: WebSocket, conn) -> RoomEntry:
+        entry = self.entry(room_id)
+        entry.clients[ws] = conn
+        return entry
+
+    def remove_client(self, room_id: str, ws: WebSocket):
+        """Forget a socket; a room with neither game nor sockets is dropped at once."""
+        shard = self._shard(room_id)
+        entry = shard.get(room_id)
+        if entry is None:
+            return
+        entry.clients.pop(ws, None)
+        entry.last_active = self.clock()
+        if not entry.connected and entry.game is None:
+            self._drop(shard, room_id)
+
+    def add_spectator(self, room_id: str, conn, delta: bool) -> RoomEntry:
+        entry = self.entry(room_id)
+        if entry.spectators is None:
+            entry.spectators = SpectatorChannel()
+        entry.spectators.add(conn, delta)
+        return entry
+
+    def remove_spectator(self, room_id: str, conn):
+        shard = self._shard(room_id)
+        entry = shard.get(room_id)
+        if entry is None or entry.spectators is None:
+            return
+        entry.spectators.discard(conn)
+        if not entry.connected and entry.game is None:
+            self._drop(shard, room_id)
+
+    # ---------------------------
+    # Eviction
+    # ---------------------------
+    def _expired(self, entry: RoomEntry, now: float) -> bool:
+        if entry.connected:
+            return False
+        if entry.finished_at is not None and now - entry.finished_at >= self.finished_ttl:
+            return True
+        return now - entry.last_active >= self.idle_ttl
+
+    def sweep_shard(self, shard: OrderedDict, now: Optional[float] = None) -> int:
+        now = self.clock() if now is None else now
+        expired = [room_id for room_id, entry in shard.items() if self._expired(entry, now)]
+        for room_id in expired:
+            self._evict(shard, room_id)
+        return len(expired)
+
+    def _evict(self, shard: OrderedDict, room_id: str):
+        entry = self._drop(shard, room_id)
+        self.evicted += 1
+        if entry.game is not None and self.on_evict:
+            self.on_evict(room_id, entry)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Evict expired rooms in every shard, then enforce ``max_games``."""
+        evicted = sum(self.sweep_shard(shard, now) for shard in self._shards)
+        return evicted + self.enforce_capacity()
+
+    def sweep_step(self) -> int:
+        """Sweep the next shard only (round robin), so a tick stays cheap."""
+        shard = self._shards[self._next_shard]
+        self._next_shard = (self._next_shard + 1) % len(self._shards)
+        return self.sweep_shard(shard) + self.enforce_capacity()
+
+    def enforce_capacity(self) -> int:
+        """
+        While above ``max_games``, drop the least recently used room without
+        sockets from each shard in turn (an approximation of global LRU).
+        """
+        excess = len(self) - self.max_games
+        evicted = 0
+        while excess > 0:
+            progressed = False
+            for shard in self._shards:
+                if excess <= 0:
+                    break
+                for room_id, entry in shard.items():
+                    if not entry.connected:
+                        self._evict(shard, room_id)
+                        evicted += 1
+                        excess -= 1
+                        progressed = True
+                        break
+            if not progressed:
+                break
+        return evicted
+
+    async def run_sweeper(self, interval: float = SWEEP_INTERVAL):
+        """Background task: sweep one shard every ``interval / shards`` seconds."""
+        step = interval / len(self._shards)
+        while True:
+            await asyncio.sleep(step)
+            self.sweep_step()
+
+    # ---------------------------
+    # Listing / accounting
+    # ---------------------------
+    def list(self, status: Optional[str] = None, player: Optional[str] = None,
+             cursor: Optional[str] = None, limit: int = 100):
+        """
+        One page of room summaries matching the filters, oldest first, plus
+        the match count and the cursor of the next page (None on the last).
+        Rooms are ordered by (creation wall-clock time, room_id), so pages
+        from several workers can be merged (see dispatcher.list_games).
+        Raises ValueError for a malformed cursor.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        if status is not None and player is not None:
+            by_status = self._by_status.get(status, [])
+            by_player = self._by_player.get(player, [])
+            # Walk the shorter index, check the other filter per room
+            if len(by_player) <= len(by_status):
+                keys = [key for key in by_player if self.get(key[1]).listed[0] == status]
+            else:
+                keys = [key for key in by_status if player in self.get(key[1]).listed[1]]
+        elif status is not None:
+            keys = self._by_status.get(status, [])
+        elif player is not None:
+            keys = self._by_player.get(player, [])
+        else:
+            keys = self._all
+        start = bisect.bisect_right(keys, after) if after else 0
+        page = keys[start:start + limit]
+        more = start + limit < len(keys)
+        next_cursor = encode_cursor(*page[-1]) if page and more else None
+        return len(keys), [self.get(room_id).summary() for _, room_id in page], next_cursor
+
+    def stats(self) -> dict:
+        """Room, game and socket counts: one walk, no deep sizing."""
+        counts = {STATUS_WAITING: 0, STATUS_ACTIVE: 0, STATUS_FINISHED: 0}
+        clients = spectators = 0
+        for entry in self.entries():
+            counts[entry.status] += 1
+            clients += len(entry.clients)
+            if entry.spectators:
+                spectators += len(entry.spectators)
+        return {
+            "rooms": len(self),
+            "games": counts,
+            "clients": clients,
+            "spectators": spectators,
+            "evicted": self.evicted,
+            "shards": [len(shard) for shard in self._shards],
+        }
+
+    def memory_stats(self) -> dict:
+        """``stats()`` plus a deep-size estimate from up to MEMORY_SAMPLE games (slow; not for scrapes)."""
+        stats = self.stats()
+        games = (entry.game for entry in self.entries() if entry.game is not None)
+        sample = list(itertools.islice(games, MEMORY_SAMPLE))
+        per_game = sum(map(approx_game_bytes, sample)) // len(sample) if sample else 0
+        counts = stats["games"]
+        stats["approx_bytes_per_game"] = per_game
+        stats["approx_bytes"] = per_game * (counts[STATUS_ACTIVE] + counts[STATUS_FINISHED])
+        return stats
+
+
+def order_key(entry: RoomEntry):
+    return entry.created_at, entry.room_id
+
+
+def _discard(keys: List[tuple], key: tuple):
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+def encode_cursor(created_at: float, room_id: str) -> str:
+    """Listing cursor: the position right after this room ("created:room_id")."""
+    return f"{created_at!r}:{room_id}"
+
+
+def decode_cursor(cursor: str):
+    created, sep, room_id = cursor.partition(":")
+    if not sep:
+        raise ValueError(f"bad cursor {cursor!r}")
+    return float(created), room_id
+
+
+def approx_game_bytes(game: GameManager) -> int:
+    """Rough deep size of a GameManager (boards, views, cached encodings)."""
+    seen = set()
+
+    def size(obj) -> int:
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        total = sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            total += sum(size(k) + size(v) for k, v in obj.items())
+        elif isinstance(obj, (list, tuple, set)):
+            total += sum(size(item) for item in obj)
+        elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+            total += size(vars(obj))
+        return total
+
+    return size(game)
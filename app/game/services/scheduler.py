@@ -0,0 +1,168 @@
+import asyncio
+import heapq
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List
+from app.game import wire
+from app.game.events import Ping
+from app.serialization import dumps
+
+# Seconds between heartbeat pings on every game and spectator socket (0 turns them off)
+HEARTBEAT_INTERVAL = float(os.environ.get("WS_HEARTBEAT_INTERVAL", "15"))
+# Seconds a socket may send nothing (no pong, no action) before it is closed (0 never closes)
+HEARTBEAT_TIMEOUT = float(os.environ.get("WS_HEARTBEAT_TIMEOUT", "45"))
+# Seconds the player on turn has for each shot (0 turns the turn clock off)
+TURN_TIMEOUT = float(os.environ.get("TURN_TIMEOUT", "60"))
+
+# What a turn timeout does to a player who is still connected
+# (a player with no open socket always forfeits):
+#   "auto_move" fire one shot for them; after MAX_AUTO_MOVES in a row they forfeit
+#   "forfeit"   end the game, the opponent wins
+POLICY_AUTO_MOVE = "auto_move"
+POLICY_FORFEIT = "forfeit"
+TURN_TIMEOUT_POLICY = os.environ.get("TURN_TIMEOUT_POLICY", POLICY_AUTO_MOVE)
+MAX_AUTO_MOVES = int(os.environ.get("TURN_TIMEOUT_MAX_AUTO_MOVES", "3"))
+
+# Resolution of the turn clock, in seconds
+SCHEDULER_TICK = float(os.environ.get("GAME_SCHEDULER_TICK", "1"))
+# Pings queued between yields to the event loop
+HEARTBEAT_CHUNK = 1024
+
+# Encoded once; every socket gets the same frame
+PING_FRAME = dumps(Ping())
+PING_BINARY = wire.encode_ping()
+
+log = logging.getLogger(__name__)
+
+
+class TurnTimers:
+    """
+    One deadline per room, kept in a heap. Re-arming a room records the new
+    deadline and pushes it; the old heap item is skipped when it comes up,
+    so arming on every shot is O(log n) and never searches. The heap is
+    rebuilt when stale items outnumber live ones.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.deadlines: Dict[str, float] = {}
+        self._heap: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.deadlines)
+
+    def arm(self, room_id: str, seconds: float):
+        deadline = self.clock() + seconds
+        self.deadlines[room_id] = deadline
+        heapq.heappush(self._heap, (deadline, room_id))
+        if len(self._heap) > 2 * len(self.deadlines) + 64:
+            self._heap = [(d, r) for r, d in self.deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, room_id: str):
+        self.deadlines.pop(room_id, None)
+
+    def due(self, now: float = None) -> List[str]:
+        """Rooms whose deadline has passed, oldest first; they are disarmed."""
+        now = self.clock() if now is None else now
+        heap = self._heap
+        rooms = []
+        while heap and heap[0][0] <= now:
+            deadline, room_id = heapq.heappop(heap)
+            if self.deadlines.get(room_id) == deadline:
+                del self.deadlines[room_id]
+                rooms.append(room_id)
+        return rooms
+
+
+class GameScheduler:
+    """
+    Background upkeep of the game service, run as one lifespan task.
+
+    Turn clock: ``arm(room_id)`` (re)starts the room's deadline, normally on
+    every shot; when it passes, ``on_turn_timeout(room_id)`` is awaited.
+    Heartbeats: every ``heartbeat_interval`` each player and spectator socket
+    of the registry is sent a ping, and a socket that has sent nothing for
+    ``heartbeat_timeout`` is handed to ``on_silent(conn)`` instead.
+    """
+
+    def __init__(
+        self,
+        registry,
+        on_turn_timeout: Callable[[str], Awaitable[None]],
+        on_silent: Callable[[object], None],
+        turn_timeout: float = TURN_TIMEOUT,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+        tick: float = SCHEDULER_TICK,
+        clock=time.monotonic,
+    ):
+        self.registry = registry
+        self.on_turn_timeout = on_turn_timeout
+        self.on_silent = on_silent
+        self.turn_timeout = turn_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.tick = tick
+        self.clock = clock
+        self.timers = TurnTimers(clock)
+        self.turn_timeouts = 0
+        self.pings = 0
+        self.silent = 0
+
+    def arm(self, room_id: str):
+        if self.turn_timeout > 0:
+            self.timers.arm(room_id, self.turn_timeout)
+
+    def disarm(self, room_id: str):
+        self.timers.cancel(room_id)
+
+    async def run(self):
+        clock = self.clock
+        next_heartbeat = clock() + self.heartbeat_interval
+        while True:
+            await asyncio.sleep(self.tick)
+            for room_id in self.timers.due():
+                self.turn_timeouts += 1
+                try:
+                    await self.on_turn_timeout(room_id)
+                except Exception:
+                    log.exception("turn timeout handler failed for room %s", room_id)
+            if self.heartbeat_interval > 0 and clock() >= next_heartbeat:
+                next_heartbeat = clock() + self.heartbeat_interval
+                await self.heartbeat()
+
+    async def heartbeat(self):
+        """Ping every open socket; hand over the ones that went silent."""
+        now = self.clock()
+        timeout = self.heartbeat_timeout
+        sent = 0
+        for entry in list(self.registry.entries()):
+            conns = list(entry.clients.values())
+            if entry.spectators:
+                conns.extend(entry.spectators)
+            for conn in conns:
+                if conn.closed:
+                    continue
+                if timeout > 0 and now - conn.last_seen > timeout:
+                    self.silent += 1
+                    self.on_silent(conn)
+                    continue
+                conn.send(PING_BINARY if conn.binary else PING_FRAME)
+                sent += 1
+                if sent % HEARTBEAT_CHUNK == 0:
+                    await asyncio.sleep(0)
+        self.pings += sent
+
+    def stats(self) -> dict:
+        return {
+            "turn_timeout": self.turn_timeout,
+            "turn_timeout_policy": TURN_TIMEOUT_POLICY,
+            "armed": len(self.timers),
+            "turn_timeouts": self.turn_timeouts,
+            "heartbeat_interval": self.heartbeat_interval,
+            "heartbeat_timeout": self.heartbeat_timeout,
+            "pings": self.pings,
+            "silent_closed": self.silent,
+        }
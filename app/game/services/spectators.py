@@ -0,0 +1,77 @@
+import asyncio
+import os
+from collections import deque
+from typing import Optional
+from app.common.connection import Connection, Frame
+
+# Spectator sends between yields to the event loop while fanning out one frame
+FANOUT_CHUNK = int(os.environ.get("SPECTATOR_FANOUT_CHUNK", "256"))
+
+
+class SpectatorChannel:
+    """
+    The spectators of one room.
+
+    Frames are encoded once by the caller and shared by every spectator of
+    the same protocol. ``publish()`` only appends to a pending list; a pump
+    task does the per-socket fan-out in chunks of ``FANOUT_CHUNK``, yielding
+    in between, so a room with thousands of viewers adds O(1) to the
+    players' move path instead of O(viewers).
+    """
+
+    def __init__(self, chunk: int = FANOUT_CHUNK):
+        self.chunk = chunk
+        self.full = set()     # protocol-1 spectators: public boards with every move
+        self.delta = set()    # protocol-2 spectators: the shared move delta
+        self._pending: deque = deque()
+        self._pump: Optional[asyncio.Task] = None
+        self.published = 0
+
+    def __len__(self) -> int:
+        return len(self.full) + len(self.delta)
+
+    def __iter__(self):
+        yield from self.full
+        yield from self.delta
+
+    def add(self, conn: Connection, delta: bool):
+        (self.delta if delta else self.full).add(conn)
+
+    def discard(self, conn: Connection):
+        self.full.discard(conn)
+        self.delta.discard(conn)
+
+    def publish(self, full: Optional[Frame], delta: Optional[Frame]):
+        """Queue a frame for each protocol group (None skips that group)."""
+        if full is None or not self.full:
+            full = None
+        if delta is None or not self.delta:
+            delta = None
+        if full is None and delta is None:
+            return
+        self._pending.append((full, delta))
+        self.published += 1
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run())
+
+    async def _run(self):
+        pending = self._pending
+        while pending:
+            full, delta = pending.popleft()
+            sent = 0
+            for group, frame in ((self.full, full), (self.delta, delta)):
+                if frame is None:
+                    continue
+                # snapshot: spectators may join or leave while this yields
+                for conn in list(group):
+                    conn.send(frame)
+                    sent += 1
+                    if sent % self.chunk == 0:
+                        await asyncio.sleep(0)
+
+    def stats(self) -> dict:
+        return {
+            "spectators": len(self),
+            "pending": len(self._pending),
+            "published": self.published,
+        }
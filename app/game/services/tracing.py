@@ -0,0 +1,136 @@
+import os
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# Finished traces kept for GET /debug/tracing
+TRACE_BUFFER = int(os.environ.get("MOVE_TRACE_BUFFER", "2000"))
+
+
+class MoveTrace:
+    """Span timings of one traced move, in the order they happened."""
+
+    __slots__ = ("room_id", "player", "started_at", "spans", "clock", "_last")
+
+    def __init__(self, room_id: str, player: str, clock=time.perf_counter):
+        self.room_id = room_id
+        self.player = player
+        self.started_at = time.time()
+        self.spans: List[tuple] = []
+        self.clock = clock
+        self._last = clock()
+
+    def add(self, name: str, seconds: float):
+        """Record a span measured elsewhere that has just ended; the next mark starts after it."""
+        self.spans.append((name, seconds))
+        self._last = self.clock()
+
+    def mark(self, name: str):
+        """Close a span running since the previous mark or add (or the start of the trace)."""
+        now = self.clock()
+        self.spans.append((name, now - self._last))
+        self._last = now
+
+    def to_dict(self) -> dict:
+        spans = {name: round(seconds * 1e6, 1) for name, seconds in self.spans}
+        return {
+            "room_id": self.room_id,
+            "player": self.player,
+            "at": self.started_at,
+            "total_us": round(sum(s for _, s in self.spans) * 1e6, 1),
+            "spans_us": spans,
+        }
+
+
+class MoveTracer:
+    """
+    Sampled per-move tracing, off by default.
+
+    ``begin()`` returns a MoveTrace for a ``sample_rate`` fraction of moves
+    (optionally only in one room) and None otherwise, so untraced moves pay
+    one attribute check. Finished traces go to a bounded ring buffer.
+    Tracing switches itself off at ``until`` when started with a duration.
+    """
+
+    def __init__(self, capacity: int = TRACE_BUFFER, rng=None, clock=time.monotonic):
+        self.sample_rate = 0.0
+        self.room_id: Optional[str] = None
+        self.until: Optional[float] = None
+        self.traces: deque = deque(maxlen=capacity)
+        self.sampled = 0
+        self.rng = rng or random.Random()
+        self.clock = clock
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def configure(self, sample_rate: float, room_id: Optional[str] = None, duration: Optional[float] = None):
+        self.sample_rate = sample_rate
+        self.room_id = room_id
+        self.until = self.clock() + duration if duration else None
+
+    def stop(self):
+        self.sample_rate = 0.0
+        self.room_id = None
+        self.until = None
+
+    def clear(self):
+        self.traces.clear()
+        self.sampled = 0
+
+    def begin(self, room_id: str, player: str) -> Optional[MoveTrace]:
+        if not self.sample_rate:
+            return None
+        if self.until is not None and self.clock() >= self.until:
+            self.stop()
+            return None
+        if self.room_id is not None and room_id != self.room_id:
+            return None
+        if self.sample_rate < 1 and self.rng.random() >= self.sample_rate:
+            return None
+        return MoveTrace(room_id, player)
+
+    def finish(self, trace: MoveTrace):
+        self.traces.append(trace)
+        self.sampled += 1
+
+    def recent(self, room_id: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """Newest traces first."""
+        out = []
+        for trace in reversed(self.traces):
+            if room_id is None or trace.room_id == room_id:
+                out.append(trace.to_dict())
+                if len(out) >= limit:
+                    break
+        return out
+
+    def rooms(self) -> Dict[str, dict]:
+        """Per-room count and mean span timings (us) over the buffered traces."""
+        totals: Dict[str, dict] = {}
+        for trace in self.traces:
+            room = totals.setdefault(trace.room_id, {"moves": 0, "spans": {}})
+            room["moves"] += 1
+            for name, seconds in trace.spans:
+                room["spans"][name] = room["spans"].get(name, 0.0) + seconds
+        return {
+            room_id: {
+                "moves": room["moves"],
+                "mean_us": {name: round(total / room["moves"] * 1e6, 1) for name, total in room["spans"].items()},
+            }
+            for room_id, room in totals.items()
+        }
+
+    def stats(self) -> dict:
+        remaining = None
+        if self.until is not None:
+            remaining = max(0.0, self.until - self.clock())
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "room_id": self.room_id,
+            "seconds_left": remaining,
+            "sampled": self.sampled,
+            "buffered": len(self.traces),
+        }
@@ -0,0 +1,335 @@
+# app/game/simulate.py
+#
+# Headless batch simulator: plays complete games between two strategies.
+#
+#   python -m app.game.simulate --games 100000 --a density --b parity --workers 4
+#   python -m app.game.simulate --games 20000 --specs '{"Carrier": [4, 2, 1], "Destroyer": [2, 1, 3]}'
+#
+# Rules match GameManager: a hit keeps the turn, a miss passes it. Seats
+# alternate every game, so neither strategy always shoots first.
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
+
+from app.game.bot import DensityBot
+from app.game.logic import BOARD_SIZE, SHIP_SPECS
+from app.game.placement import generate_layout
+
+CELLS = BOARD_SIZE * BOARD_SIZE
+
+# Games handed to a worker process at a time
+CHUNK = 500
+
+
+# ---------------------------
+# Strategies
+# ---------------------------
+# A strategy is a factory (specs, rng) -> player, where a player has
+# choose() -> (row, col) and observe(row, col, result) with the usual
+# receive_shot results. DensityBot is one; --a / --b also accept
+# "package.module:factory" for strategies defined elsewhere.
+
+class RandomPlayer:
+    """Fires at every cell once, in random order."""
+
+    def __init__(self, specs, rng):
+        self.order = list(range(CELLS))
+        rng.shuffle(self.order)
+
+    def choose(self):
+        return divmod(self.order.pop(), BOARD_SIZE)
+
+    def observe(self, row, col, result):
+        pass
+
+
+class ParityPlayer:
+    """Classic hunt/target: checkerboard hunting, then the neighbours of every hit."""
+
+    def __init__(self, specs, rng):
+        cells = list(range(CELLS))
+        rng.shuffle(cells)
+        # popped from the end, so even-parity cells come first: every ship of length >= 2 covers one
+        self.hunt = [c for c in cells if sum(divmod(c, BOARD_SIZE)) % 2] + \
+                    [c for c in cells if not sum(divmod(c, BOARD_SIZE)) % 2]
+        self.targets: List[int] = []
+        self.shot = bytearray(CELLS)
+
+    def choose(self):
+        for queue in (self.targets, self.hunt):
+            while queue:
+                cell = queue.pop()
+                if not self.shot[cell]:
+                    return divmod(cell, BOARD_SIZE)
+        raise RuntimeError("no cells left")
+
+    def observe(self, row, col, result):
+        self.shot[row * BOARD_SIZE + col] = 1
+        if result == "hit" or result.startswith("sunk "):
+            for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+                r, c = row + dr, col + dc
+                if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE and not self.shot[r * BOARD_SIZE + c]:
+                    self.targets.append(r * BOARD_SIZE + c)
+
+
+def density_player(specs, rng):
+    return DensityBot(specs=specs, rng=rng)
+
+
+STRATEGIES: Dict[str, Callable] = {
+    "random": RandomPlayer,
+    "parity": ParityPlayer,
+    "density": density_player,
+}
+
+
+def load_strategy(name: str) -> Callable:
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    if ":" in name:
+        module, attr = name.split(":", 1)
+        return getattr(importlib.import_module(module), attr)
+    raise ValueError(f"Unknown strategy {name!r} (known: {', '.join(STRATEGIES)})")
+
+
+# ---------------------------
+# Batched boards
+# ---------------------------
+class FleetBatch:
+    """
+    The fleets of a whole chunk of games as flat arrays instead of Board
+    objects: one occupied / hits bitmask per board, one bytearray mapping
+    every (board, cell) to its ship, and the ship masks and names per board.
+    Board ``b`` of game ``g`` is index ``2 * g + b``.
+    """
+
+    def __init__(self, specs, rng, boards: int):
+        self.occupied = [0] * boards
+        self.hits = [0] * boards
+        self.misses = [0] * boards
+        self.cell_ship = bytearray(boards * CELLS)  # ship index + 1, 0 = water
+        self.ship_masks: List[List[int]] = []
+        self.ship_names: List[List[str]] = []
+        for board in range(boards):
+            layout = generate_layout(specs, BOARD_SIZE, rng)
+            base = board * CELLS
+            occupied = 0
+            for index, (_, coords, mask) in enumerate(layout):
+                occupied |= mask
+                for r, c in coords:
+                    self.cell_ship[base + r * BOARD_SIZE + c] = index + 1
+            self.occupied[board] = occupied
+            self.ship_masks.append([mask for _, _, mask in layout])
+            self.ship_names.append([name for name, _, _ in layout])
+
+    def shoot(self, board: int, row: int, col: int) -> str:
+        """Same results as ``BitBoard.receive_shot``."""
+        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+            return "invalid"
+        cell = row * BOARD_SIZE + col
+        bit = 1 << cell
+        hits = self.hits[board]
+        if (hits | self.misses[board]) & bit:
+            return "already"
+        if self.occupied[board] & bit:
+            hits |= bit
+            self.hits[board] = hits
+            index = self.cell_ship[board * CELLS + cell] - 1
+            if not (self.ship_masks[board][index] & ~hits):
+                return f"sunk {self.ship_names[board][index]}"
+            return "hit"
+        self.misses[board] |= bit
+        return "miss"
+
+    def all_sunk(self, board: int) -> bool:
+        return not (self.occupied[board] & ~self.hits[board])
+
+
+# ---------------------------
+# Playing
+# ---------------------------
+# Shots after which a game is abandoned (a strategy that never finishes)
+MAX_SHOTS = 4 * CELLS
+
+
+def play_chunk(args) -> dict:
+    """Play ``count`` games from ``seed``; runs in a worker process."""
+    seed, count, first_game, names, specs = args
+    rng = random.Random(seed)
+    factories = [load_strategy(name) for name in names]
+    batch = FleetBatch(specs, rng, 2 * count)
+
+    wins = [0, 0]
+    shots_to_win = [Counter(), Counter()]
+    first_wins = 0
+    unfinished = 0
+    total_shots = 0
+
+    for game in range(count):
+        # strategy s sits in seat (s + game) % 2; seat 0 shoots first
+        swap = (first_game + game) % 2
+        seats = [1, 0] if swap else [0, 1]  # seat -> strategy
+        players = [factories[s](specs, rng) for s in seats]
+        shots = [0, 0]
+        turn = 0
+        while True:
+            board = 2 * game + (1 - turn)  # the opponent's board
+            row, col = players[turn].choose()
+            result = batch.shoot(board, row, col)
+            players[turn].observe(row, col, result)
+            shots[turn] += 1
+            if batch.all_sunk(board):
+                winner = seats[turn]
+                wins[winner] += 1
+                shots_to_win[winner][shots[turn]] += 1
+                first_wins += turn == 0
+                break
+            if shots[turn] >= MAX_SHOTS:
+                unfinished += 1
+                break
+            if result == "miss" or result == "already" or result == "invalid":
+                turn = 1 - turn
+        total_shots += shots[0] + shots[1]
+
+    return {
+        "games": count,
+        "wins": wins,
+        "shots_to_win": [dict(c) for c in shots_to_win],
+        "first_player_wins": first_wins,
+        "unfinished": unfinished,
+        "shots": total_shots,
+    }
+
+
+def merge(results: List[dict]) -> dict:
+    total = {"games": 0, "wins": [0, 0], "shots_to_win": [Counter(), Counter()],
+             "first_player_wins": 0, "unfinished": 0, "shots": 0}
+    for r in results:
+        total["games"] += r["games"]
+        total["first_player_wins"] += r["first_player_wins"]
+        total["unfinished"] += r["unfinished"]
+        total["shots"] += r["shots"]
+        for s in (0, 1):
+            total["wins"][s] += r["wins"][s]
+            total["shots_to_win"][s].update({int(k): v for k, v in r["shots_to_win"][s].items()})
+    return total
+
+
+def distribution(counts: Counter) -> dict:
+    n = sum(counts.values())
+    if not n:
+        return {"count": 0}
+    values = sorted(counts.items())
+
+    def percentile(q):
+        rank = q * n
+        seen = 0
+        for value, c in values:
+            seen += c
+            if seen >= rank:
+                return value
+        return values[-1][0]
+
+    return {
+        "count": n,
+        "mean": sum(v * c for v, c in values) / n,
+        "min": values[0][0],
+        "p10": percentile(0.1),
+        "p50": percentile(0.5),
+        "p90": percentile(0.9),
+        "max": values[-1][0],
+    }
+
+
+def simulate(games: int, a: str = "density", b: str = "random", specs=SHIP_SPECS,
+             workers: int = 1, seed: int = 0, chunk: int = CHUNK) -> dict:
+    """Play ``games`` games of strategy ``a`` against ``b`` and return the report."""
+    jobs = []
+    for start in range(0, games, chunk):
+        count = min(chunk, games - start)
+        jobs.append((seed * 1_000_003 + start, count, start, (a, b), specs))
+
+    started = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(play_chunk, jobs))
+    else:
+        results = [play_chunk(job) for job in jobs]
+    elapsed = time.perf_counter() - started
+
+    total = merge(results)
+    played = total["games"]
+    return {
+        "games": played,
+        "strategies": [a, b],
+        "specs": specs,
+        "workers": workers,
+        "seconds": elapsed,
+        "games_per_sec": played / elapsed if elapsed else None,
+        "shots_per_sec": total["shots"] / elapsed if elapsed else None,
+        "win_rate": {name: total["wins"][s] / played if played else None for s, name in enumerate(("a", "b"))},
+        "first_player_win_rate": total["first_player_wins"] / played if played else None,
+        "unfinished": total["unfinished"],
+        "shots_to_win": {name: distribution(total["shots_to_win"][s]) for s, name in enumerate(("a", "b"))},
+    }
+
+
+def print_report(report: dict):
+    a, b = report["strategies"]
+    print(f"=== {report['games']} games: {a} (a) vs {b} (b), {report['workers']} worker(s) ===")
+    if not report["games"]:
+        return
+    print(f"{report['seconds']:.2f}s  {report['games_per_sec']:.0f} games/s  "
+          f"{report['shots_per_sec']:.0f} shots/s")
+    for side, name in (("a", a), ("b", b)):
+        d = report["shots_to_win"][side]
+        line = f"  {side}={name:<10} win rate {report['win_rate'][side]:6.1%}"
+        if d["count"]:
+            line += (f"   shots to win: mean {d['mean']:.1f}  p10 {d['p10']}  p50 {d['p50']}  "
+                     f"p90 {d['p90']}  min {d['min']}  max {d['max']}")
+        print(line)
+    print(f"  first player wins {report['first_player_win_rate']:.1%}, unfinished {report['unfinished']}")
+
+
+def positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Battleship games headlessly between two strategies.")
+    parser.add_argument("--games", type=positive_int, default=10000)
+    parser.add_argument("--a", default="density", help=f"strategy a ({', '.join(STRATEGIES)} or module:factory)")
+    parser.add_argument("--b", default="random", help="strategy b")
+    parser.add_argument("--workers", type=positive_int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=positive_int, default=CHUNK, help="games per worker task")
+    parser.add_argument("--specs", help='fleet as JSON, e.g. \'{"Carrier": [4, 2, 1]}\' (default: SHIP_SPECS)')
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    specs = SHIP_SPECS
+    if args.specs:
+        specs = {name: tuple(spec) for name, spec in json.loads(args.specs).items()}
+    for name in (args.a, args.b):
+        load_strategy(name)
+
+    report = simulate(args.games, args.a, args.b, specs, args.workers, args.seed, args.chunk)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
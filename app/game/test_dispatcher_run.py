@@ -0,0 +1,112 @@
+from app.game.services.dispatcher import HashRing
+from websockets.asyncio.client import connect
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+import httpx
+
+# Starts the dispatcher with several local workers and checks room affinity.
+# Run with: python -m app.game.test_dispatcher_run
+
+WORKERS = 3
+ROOMS = 30
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def play_one_move(base_ws, room_id):
+    async with connect(f"{base_ws}/ws/{room_id}?player=p1_{room_id}&v=2") as ws:
+        connected = json.loads(await ws.recv())
+        assert connected["event"] == "connected" and connected["seq"] == 0, connected
+        await ws.send(json.dumps({"action": "move", "player_name": f"p1_{room_id}", "row": 0, "col": 0}))
+        move = json.loads(await ws.recv())
+        assert move["event"] == "move_made" and move["seq"] == 1, move
+        return move["result"]
+
+
+port = free_port()
+base_port = free_port()
+worker_ports = [base_port + i for i in range(WORKERS)]
+proc = subprocess.Popen([
+    sys.executable, "-m", "app.game.services.dispatcher",
+    "--workers", str(WORKERS), "--port", str(port), "--base-port", str(base_port),
+])
+try:
+    base = f"http://127.0.0.1:{port}"
+    for p in worker_ports:
+        wait_until_up(f"http://127.0.0.1:{p}/layout_pool")
+    wait_until_up(f"{base}/layout_pool")
+
+    ring = HashRing(WORKERS)
+    rooms = [f"room{i}" for i in range(ROOMS)]
+    with httpx.Client(base_url=base) as client:
+        for room_id in rooms:
+            r = client.post("/game/create", json={"player1": f"p1_{room_id}", "player2": f"p2_{room_id}", "room_id": room_id})
+            assert r.status_code == 200, r.text
+        # games without a room_id get a unique id from the dispatcher
+        auto = client.post("/game/create", json={"player1": "x", "player2": "y"}).json()["room_id"]
+        rooms.append(auto)
+
+        merged = client.get("/list_games", params={"limit": 1000}).json()
+        print(f"dispatcher sees {merged['total']} games")
+        assert merged["total"] == len(rooms)
+
+        # small pages walked with the cursor: every game once, in creation order
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/list_games", params=params).json()
+            seen.extend(page["games"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert sorted(g["room_id"] for g in seen) == sorted(rooms), "cursor pages skipped or repeated games"
+        keys = [(g["created"], g["room_id"]) for g in seen]
+        assert keys == sorted(keys)
+        print(f"{len(seen)} games over cursor pages of 7")
+
+        # whole-service endpoints are merged from every worker
+        assert client.get("/registry").json()["rooms"] == len(rooms)
+        metrics = client.get("/metrics").text
+        for i in range(WORKERS):
+            assert f'dispatcher_worker_up{{worker="{i}"}} 1' in metrics
+            assert f'games{{worker="{i}",status="active"}}' in metrics
+
+    per_worker = {}
+    for i, p in enumerate(worker_ports):
+        owned = httpx.get(f"http://127.0.0.1:{p}/list_games", params={"limit": 1000}).json()["active_games"]
+        per_worker[i] = owned
+        for room_id in owned:
+            assert ring.node_for(room_id) == i, f"{room_id} landed on worker {i}"
+        print(f"worker {i} (port {p}): {len(owned)} rooms")
+
+    async def play_all():
+        return await asyncio.gather(*[
+            play_one_move(f"ws://127.0.0.1:{port}", room_id) for room_id in rooms[:10]
+        ])
+
+    results = asyncio.run(asyncio.wait_for(play_all(), timeout=20))
+    print("websocket moves through dispatcher:", results)
+    print("\nAll rooms routed to their owning worker.")
+finally:
+    proc.terminate()
+    proc.wait()
@@ -0,0 +1,213 @@
+"""
+Compact binary wire format for the game WebSocket (``/ws/{room_id}?fmt=binary``).
+
+All integers are big-endian.
+
+Boards are packed 2 bits per cell, row-major, four cells per byte with the
+first cell in the high bits: 144 cells -> 36 bytes. Cell codes:
+0 water, 1 ship, 2 hit, 3 miss.
+
+Client -> server frames are always 3 bytes: ``op, row, col``.
+
+    OP_MOVE    fire at (row, col)
+    OP_RESYNC  ask for a full snapshot (row/col ignored)
+    OP_PONG    answer to a heartbeat ping (row/col ignored)
+
+Server -> client frames start with a type byte and a flags byte:
+
+    snapshot   type, flags, seq:u32, own board (36), opponent view (36)  = 78 bytes
+               type is FRAME_CONNECTED, FRAME_GAME_CREATED or FRAME_RESYNC
+    waiting    FRAME_WAITING, 0                                          = 2 bytes
+    ping       FRAME_PING, 0 (heartbeat; answer with OP_PONG)            = 2 bytes
+    move       FRAME_MOVE, flags, seq:u32, row, col, result, sunk        = 10 bytes
+
+``flags`` are relative to the recipient (FLAG_*). ``result`` is one of the
+RESULT_* codes and ``sunk`` is the index of the sunk ship in SHIP_NAMES
+(NO_SHIP otherwise).
+"""
+import struct
+from app.game.logic import BOARD_SIZE, SHIP_SPECS
+from app.game.placement import fleet
+
+CELL_CODES = {"~": 0, "O": 1, "X": 2, "M": 3}
+CELL_MARKS = "~OXM"
+BOARD_BYTES = (BOARD_SIZE * BOARD_SIZE * 2 + 7) // 8
+
+OP_MOVE = 0x01
+OP_RESYNC = 0x02
+OP_PONG = 0x03
+
+FRAME_CONNECTED = 0x10
+FRAME_GAME_CREATED = 0x11
+FRAME_RESYNC = 0x12
+FRAME_WAITING = 0x13
+FRAME_PING = 0x14
+FRAME_MOVE = 0x20
+
+FLAG_YOUR_TURN = 0x01
+FLAG_GAME_OVER = 0x02
+FLAG_YOU_WON = 0x04
+FLAG_YOUR_BOARD = 0x08  # move frames: the shot landed on the recipient's board
+
+RESULT_MISS = 0
+RESULT_HIT = 1
+RESULT_SUNK = 2
+RESULT_ALREADY = 3
+RESULT_INVALID = 4
+RESULT_REJECTED = 5  # not your turn / game already over
+
+RESULT_CODES = {"miss": RESULT_MISS, "hit": RESULT_HIT, "already": RESULT_ALREADY}
+RESULT_NAMES = ["miss", "hit", "sunk", "already", "invalid", "rejected"]
+
+SHIP_NAMES = [name for name, _, _ in fleet(SHIP_SPECS)]
+NO_SHIP = 0xFF
+
+CLIENT_FRAME = struct.Struct("!BBB")
+SNAPSHOT_HEADER = struct.Struct("!BBI")
+MOVE_FRAME = struct.Struct("!BBIBBBB")
+
+SNAPSHOT_FRAMES = {
+    "connected": FRAME_CONNECTED,
+    "game_created": FRAME_GAME_CREATED,
+    "resync": FRAME_RESYNC,
+}
+FRAME_EVENTS = {code: event for event, code in SNAPSHOT_FRAMES.items()}
+
+
+# --------------------------------------
+# Boards
+# --------------------------------------
+def pack_board(grid) -> bytes:
+    """Pack a list-of-lists board into BOARD_BYTES bytes."""
+    out = bytearray(BOARD_BYTES)
+    i = 0
+    for row in grid:
+        for cell in row:
+            out[i >> 2] |= CELL_CODES[cell] << (6 - 2 * (i & 3))
+            i += 1
+    return bytes(out)
+
+
+def unpack_board(data: bytes):
+    """Inverse of ``pack_board``."""
+    cells = [
+        CELL_MARKS[(data[i >> 2] >> (6 - 2 * (i & 3))) & 3]
+        for i in range(BOARD_SIZE * BOARD_SIZE)
+    ]
+    return [cells[r * BOARD_SIZE:(r + 1) * BOARD_SIZE] for r in range(BOARD_SIZE)]
+
+
+# --------------------------------------
+# Server -> client
+# --------------------------------------
+def player_flags(game, player: str) -> int:
+    flags = 0
+    if game.current_turn == player and not game.winner:
+        flags |= FLAG_YOUR_TURN
+    if game.winner:
+        flags |= FLAG_GAME_OVER
+        if game.winner == player:
+            flags |= FLAG_YOU_WON
+    return flags
+
+
+def encode_snapshot(event: str, game, player: str) -> bytes:
+    """connected / game_created / resync frame with both boards of ``player``."""
+    return (
+        SNAPSHOT_HEADER.pack(SNAPSHOT_FRAMES[event], player_flags(game, player), game.seq)
+        + game.encoded("self", player, pack_board)
+        + game.encoded("view", player, pack_board)
+    )
+
+
+def encode_waiting() -> bytes:
+    return bytes((FRAME_WAITING, 0))
+
+
+def encode_ping() -> bytes:
+    return bytes((FRAME_PING, 0))
+
+
+def encode_move(game, player: str, row: int, col: int, result: str, move) -> bytes:
+    """
+    move frame for recipient ``player``. ``move`` is the game's last Move if
+    the shot reached a board, else None (``result`` then says why not).
+    """
+    sunk = NO_SHIP
+    if move is None:
+        code = RESULT_INVALID if result == "invalid" else RESULT_REJECTED
+    elif move.result.startswith("sunk "):
+        code = RESULT_SUNK
+        sunk = SHIP_NAMES.index(move.result[len("sunk "):])
+    else:
+        code = RESULT_CODES[move.result]
+
+    flags = player_flags(game, player)
+    if move is not None and move.target == player:
+        flags |= FLAG_YOUR_BOARD
+    return MOVE_FRAME.pack(FRAME_MOVE, flags, game.seq, row & 0xFF, col & 0xFF, code, sunk)
+
+
+def decode_server_frame(data: bytes) -> dict:
+    """Decode a server frame into a dict (for bots, tools and tests)."""
+    kind = data[0]
+    if kind == FRAME_WAITING:
+        return {"event": "connected", "message": "waiting_for_game"}
+    if kind == FRAME_PING:
+        return {"event": "ping"}
+
+    if kind == FRAME_MOVE:
+        _, flags, seq, row, col, code, sunk = MOVE_FRAME.unpack(data)
+        return {
+            "event": "move_made",
+            "seq": seq,
+            "row": row,
+            "col": col,
+            "result": RESULT_NAMES[code],
+            "sunk": SHIP_NAMES[sunk] if sunk != NO_SHIP else None,
+            "flags": flags,
+        }
+
+    _, flags, seq = SNAPSHOT_HEADER.unpack_from(data)
+    offset = SNAPSHOT_HEADER.size
+    return {
+        "event": FRAME_EVENTS[kind],
+        "seq": seq,
+        "flags": flags,
+        "boards": {
+            "self": unpack_board(data[offset:offset + BOARD_BYTES]),
+            "opponent": unpack_board(data[offset + BOARD_BYTES:offset + 2 * BOARD_BYTES]),
+        },
+    }
+
+
+# --------------------------------------
+# Client -> server
+# --------------------------------------
+def encode_client_move(row: int, col: int) -> bytes:
+    return CLIENT_FRAME.pack(OP_MOVE, row, col)
+
+
+def encode_client_resync() -> bytes:
+    return CLIENT_FRAME.pack(OP_RESYNC, 0, 0)
+
+
+def encode_client_pong() -> bytes:
+    return CLIENT_FRAME.pack(OP_PONG, 0, 0)
+
+
+def decode_client_frame(data: bytes):
+    """
+    Decode a client frame into the same action dict the JSON path uses, or
+    None if the frame is malformed.
+    """
+    if len(data) != CLIENT_FRAME.size:
+        return None
+    op, row, col = CLIENT_FRAME.unpack(data)
+    if op == OP_MOVE:
+        return {"action": "move", "row": row, "col": col}
+    if op == OP_RESYNC:
+        return {"action": "resync"}
+    if op == OP_PONG:
+        return {"action": "pong"}
+    return None
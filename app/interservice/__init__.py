@@ -0,0 +1,10 @@
+import os
+from app.interservice.breaker import CircuitBreaker, CircuitOpenError
+from app.interservice.client import ServiceClient
+from app.interservice.guard import require_internal
+from app.interservice.histogram import LatencyHistogram
+
+# Where each service listens; override to run them on other hosts / ports
+USER_SERVICE_URL = os.environ.get("USER_SERVICE_URL", "http://127.0.0.1:8001")
+GAME_SERVICE_URL = os.environ.get("GAME_SERVICE_URL", "http://127.0.0.1:8002")
+ROOM_SERVICE_URL = os.environ.get("ROOM_SERVICE_URL", "http://127.0.0.1:8003")
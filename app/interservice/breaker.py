@@ -0,0 +1,67 @@
+import time
+import httpx
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised instead of calling a target whose breaker is open.
+
+    Subclasses ``httpx.RequestError`` so existing "service unreachable"
+    handlers treat a fast failure the same way as a refused connection.
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for one target.
+
+    After ``failure_threshold`` failures in a row the breaker opens and every
+    call fails immediately for ``reset_timeout`` seconds. Then a single trial
+    call is let through (half-open): success closes the breaker, failure
+    opens it again. Only used from the event loop, so no locking.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    def before_call(self, target: str):
+        if self.state == OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit open for {target}")
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit half-open for {target}, trial call in flight")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = self.clock()
+        self._trial_in_flight = False
+
+    def abandon(self):
+        """The call finished without a verdict (e.g. cancelled): free the trial slot."""
+        self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Optional
+import httpx
+from app.interservice.breaker import CircuitBreaker
+from app.interservice.guard import token_headers
+from app.interservice.histogram import LatencyHistogram
+
+# Pool size per service process and how many calls may be in flight at once
+MAX_CONNECTIONS = int(os.environ.get("SERVICE_CLIENT_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.environ.get("SERVICE_CLIENT_MAX_KEEPALIVE", "20"))
+MAX_CONCURRENCY = int(os.environ.get("SERVICE_CLIENT_CONCURRENCY", "64"))
+# Connect fails fast; the overall timeout covers slow responses
+CONNECT_TIMEOUT = float(os.environ.get("SERVICE_CLIENT_CONNECT_TIMEOUT", "0.5"))
+TIMEOUT = float(os.environ.get("SERVICE_CLIENT_TIMEOUT", "5.0"))
+# Extra attempts for idempotent calls, with full-jitter exponential backoff
+RETRIES = int(os.environ.get("SERVICE_CLIENT_RETRIES", "2"))
+BACKOFF_BASE = float(os.environ.get("SERVICE_CLIENT_BACKOFF", "0.05"))
+BACKOFF_CAP = 1.0
+# Circuit breaker per target
+BREAKER_FAILURES = int(os.environ.get("SERVICE_CLIENT_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.environ.get("SERVICE_CLIENT_BREAKER_RESET", "10.0"))
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+# Upstream statuses that mean "try again / somewhere else", not "your request is wrong"
+RETRY_STATUSES = frozenset((502, 503, 504))
+
+
+class _Target:
+    __slots__ = ("name", "base_url", "breaker", "latency", "requests", "retries", "errors")
+
+    def __init__(self, name: str, base_url: str):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET)
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "breaker": self.breaker.stats(),
+            "latency": self.latency.snapshot(),
+        }
+
+
+class ServiceClient:
+    """
+    One pooled keep-alive HTTP client per service process for calls to the
+    other services, addressed by target name (``"user"``, ``"game"``, ...).
+
+    ``start()`` / ``aclose()`` belong in the app's lifespan. Every call goes
+    through a semaphore (bounded concurrency), the target's circuit breaker
+    (fails fast with ``CircuitOpenError`` while the target is down) and its
+    latency histogram. Idempotent calls are retried on transport errors and
+    502/503/504; other calls are retried only when the connection could not
+    be opened, i.e. the request was never sent. Every call carries the
+    internal token (``INTERNAL_SERVICE_TOKEN``) when one is set.
+    """
+
+    def __init__(self, targets: Dict[str, str], max_concurrency: int = MAX_CONCURRENCY, retries: int = RETRIES):
+        self.targets = {name: _Target(name, url) for name, url in targets.items()}
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+    async def start(self):
+        self._client = httpx.AsyncClient(
+            headers=token_headers(),
+            timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE),
+        )
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ---------------------------
+    # Calls
+    # ---------------------------
+    async def get(self, target: str, path: str, **kwargs) -> httpx.Response:
+        return await self.request(target, "GET", path, **kwargs)
+
+    async def post(self, target: str, path: str, **kwargs) -> httpx.Response:
+        return await self.request(target, "POST", path, **kwargs)
+
+    async def request(self, target: str, method: str, path: str, idempotent: bool = None, **kwargs) -> httpx.Response:
+        """
+        Send one call to ``target``. Raises ``httpx.RequestError`` (including
+        ``CircuitOpenError``) when the target could not be reached; HTTP error
+        statuses are returned, not raised.
+        """
+        t = self.targets[target]
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        url = t.base_url + path
+
+        attempt = 0
+        while True:
+            t.breaker.before_call(t.name)
+            t.requests += 1
+            started = time.perf_counter()
+            try:
+                async with self._slots:
+                    response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                t.latency.observe(time.perf_counter() - started)
+                t.errors += 1
+                t.breaker.record_failure()
+                retryable = idempotent or isinstance(e, httpx.ConnectError)
+                if not retryable or attempt >= self.retries:
+                    raise
+            except BaseException:
+                t.breaker.abandon()
+                raise
+            else:
+                t.latency.observe(time.perf_counter() - started)
+                if response.status_code not in RETRY_STATUSES:
+                    t.breaker.record_success()
+                    return response
+                t.errors += 1
+                t.breaker.record_failure()
+                if not idempotent or attempt >= self.retries:
+                    return response
+
+            attempt += 1
+            t.retries += 1
+            await asyncio.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+
+    def stats(self) -> dict:
+        in_flight = self.max_concurrency - self._slots._value if self._slots is not None else 0
+        return {
+            "in_flight": in_flight,
+            "max_concurrency": self.max_concurrency,
+            "targets": {name: t.stats() for name, t in self.targets.items()},
+        }
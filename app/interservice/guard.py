@@ -0,0 +1,31 @@
+import hmac
+import os
+from fastapi import HTTPException, Request
+
+# Shared secret the services present to each other's /internal and /debug routes.
+# Unset: those routes only answer clients on the same host.
+INTERNAL_TOKEN = os.environ.get("INTERNAL_SERVICE_TOKEN", "")
+TOKEN_HEADER = "X-Internal-Token"
+
+LOOPBACK_HOSTS = frozenset(("127.0.0.1", "::1", "localhost"))
+
+
+def token_headers() -> dict:
+    """Headers that let a call through ``require_internal`` on another service."""
+    return {TOKEN_HEADER: INTERNAL_TOKEN} if INTERNAL_TOKEN else {}
+
+
+def require_internal(request: Request):
+    """
+    FastAPI dependency for routes meant for the other services and operators.
+    With INTERNAL_SERVICE_TOKEN set the request must carry it in X-Internal-Token;
+    without one only loopback clients get through. A reverse proxy or the game
+    dispatcher on the same host connects from loopback, so set a token there.
+    """
+    if INTERNAL_TOKEN:
+        sent = request.headers.get(TOKEN_HEADER, "")
+        if hmac.compare_digest(sent.encode(), INTERNAL_TOKEN.encode()):
+            return
+    elif request.client is not None and request.client.host in LOOPBACK_HOSTS:
+        return
+    raise HTTPException(status_code=403, detail="Internal endpoint")
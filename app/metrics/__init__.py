@@ -0,0 +1,31 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from app.metrics.middleware import MetricsMiddleware
+from app.metrics.profiler import SamplingProfiler
+from app.metrics.registry import (
+    Counter, FAST_BUCKETS, Gauge, Histogram, MetricsRegistry, Value,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def instrument(app: FastAPI, metrics: MetricsRegistry, services=None):
+    """
+    Add request / WebSocket instrumentation and ``GET /metrics`` to a service.
+    With ``services`` (a ServiceClient), its per-target latency histograms
+    are exported too.
+    """
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+    if services is not None:
+        upstream = metrics.histogram("upstream_request_duration_seconds",
+                                     "Calls to other services by target", ("target",))
+        for name, target in services.targets.items():
+            upstream.attach(target.latency, name)
+        metrics.gauge("upstream_circuit_open", "1 while the target's circuit breaker is open", ("target",),
+                      fn=lambda: {(name, ): int(t.breaker.state != "closed") for name, t in services.targets.items()})
+
+    # async: the gauges walk state the event loop owns, so they must not run in a worker thread
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,58 @@
+import time
+from app.metrics.registry import MetricsRegistry
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no per-request task or body buffering): times every
+    HTTP request by route template, method and status, and counts open
+    WebSocket connections per route.
+    """
+
+    def __init__(self, app, metrics: MetricsRegistry):
+        self.app = app
+        self.latency = metrics.histogram(
+            "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"))
+        self.websockets = metrics.gauge(
+            "websocket_connections", "Open WebSocket connections by route", ("route",))
+
+    async def __call__(self, scope, receive, send):
+        kind = scope["type"]
+        if kind == "http":
+            status = 500
+            start = time.perf_counter()
+
+            async def send_wrapper(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # the router stores the matched route in the scope; unmatched paths share one label
+                route = scope.get("route")
+                path = route.path if route is not None else "<unmatched>"
+                self.latency.labels(scope["method"], path, status).observe(time.perf_counter() - start)
+
+        elif kind == "websocket":
+            gauge = None
+            accepted = False
+
+            async def send_wrapper(message):
+                nonlocal gauge, accepted
+                if message["type"] == "websocket.accept" and not accepted:
+                    accepted = True
+                    route = scope.get("route")
+                    gauge = self.websockets.labels(route.path if route is not None else "<unmatched>")
+                    gauge.inc()
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if gauge is not None:
+                    gauge.dec()
+        else:
+            await self.app(scope, receive, send)
@@ -0,0 +1,106 @@
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+# Longest profile a caller may ask for, in seconds
+MAX_PROFILE_SECONDS = 120.0
+# Deepest stack recorded per sample; deeper frames are cut from the root end
+MAX_STACK_DEPTH = 128
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler for one thread (normally the event loop's).
+
+    A background thread wakes every ``interval`` seconds, reads the target
+    thread's current frame and counts the stack, for at most ``seconds``.
+    The result is in the "folded stacks" format (``a;b;c 42`` per line)
+    that flamegraph.pl, speedscope and similar tools read. Only one profile
+    runs at a time; the last finished one stays available for download.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: Counter = Counter()
+        self._labels: Dict[object, str] = {}
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.seconds = 0.0
+        self.interval = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: float = 0.005, thread_id: Optional[int] = None) -> bool:
+        """Begin profiling ``thread_id`` (default: the calling thread). False if one is already running."""
+        if self.running:
+            return False
+        self._stacks = Counter()
+        self.samples = 0
+        self.seconds = min(seconds, MAX_PROFILE_SECONDS)
+        self.interval = interval
+        self.started_at = time.time()
+        self.finished_at = None
+        self._stop.clear()
+        target = thread_id if thread_id is not None else threading.get_ident()
+        self._thread = threading.Thread(target=self._run, args=(target,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            module = code.co_filename.rsplit("/", 1)[-1]
+            label = self._labels[code] = f"{code.co_name} ({module}:{code.co_firstlineno})"
+        return label
+
+    def _run(self, thread_id: int):
+        deadline = time.monotonic() + self.seconds
+        stacks = self._stacks
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                break
+            # code objects only: labels are built once per function, not per sample
+            codes = []
+            while frame is not None and len(codes) < MAX_STACK_DEPTH:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            stacks[tuple(codes)] += 1
+            self.samples += 1
+        self.finished_at = time.time()
+
+    def folded(self) -> str:
+        """The collected stacks, root first, one ``frame;frame;... count`` line each."""
+        lines = []
+        for codes, count in self._stacks.most_common():
+            lines.append(";".join(self._label(code) for code in reversed(codes)) + f" {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def top(self, limit: int = 20) -> list:
+        """Functions by samples in which they were on top of the stack."""
+        own = Counter()
+        for codes, count in self._stacks.items():
+            own[self._label(codes[0])] += count
+        return [{"function": label, "samples": n} for label, n in own.most_common(limit)]
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "seconds": self.seconds,
+            "interval": self.interval,
+            "samples": self.samples,
+            "stacks": len(self._stacks),
+        }
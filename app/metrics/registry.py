@@ -0,0 +1,185 @@
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+from app.interservice.histogram import DEFAULT_BUCKETS, LatencyHistogram
+
+# Buckets for in-process phases that take microseconds, not milliseconds
+FAST_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, float("inf"),
+)
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Value:
+    """One labelled counter or gauge value; bind it once and update it on the hot path."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter:
+    """Monotonic counter per label set; ``labels()`` children are cached."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, Value] = {}
+        if not self.labelnames:
+            self.labels()  # unlabelled metrics report 0 before the first update
+
+    def labels(self, *values) -> Value:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = Value()
+        return child
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for values, child in self._children.items():
+            yield self.name + "_total", _label_text(self.labelnames, values), child.value
+
+
+class Gauge(Counter):
+    """
+    Point-in-time value, either updated through ``labels()`` children or
+    computed at scrape time by ``fn`` (returning a number, or a
+    {label values tuple: number} dict), so nothing is counted on the hot path.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), fn: Optional[Callable] = None):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def samples(self):
+        if self.fn is None:
+            values = {labels: child.value for labels, child in self._children.items()}
+        else:
+            result = self.fn()
+            values = result if isinstance(result, dict) else {(): result}
+        for label_values, value in values.items():
+            yield self.name, _label_text(self.labelnames, label_values), value
+
+
+class Histogram:
+    """Histogram per label set; each child is a ``LatencyHistogram`` (fixed buckets, no allocation per sample)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._children: Dict[tuple, LatencyHistogram] = {}
+
+    def labels(self, *values) -> LatencyHistogram:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = LatencyHistogram(self.buckets)
+        return child
+
+    def attach(self, histogram: LatencyHistogram, *values):
+        """Expose a histogram kept elsewhere (e.g. a ServiceClient target's latency)."""
+        self._children[values] = histogram
+
+    def samples(self):
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(child.buckets, child.counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield self.name + "_bucket", _label_text(self.labelnames, values, le), cumulative
+            labels = _label_text(self.labelnames, values)
+            yield self.name + "_sum", labels, child.total
+            yield self.name + "_count", labels, child.count
+
+
+class MetricsRegistry:
+    """The metrics of one service process, rendered in the Prometheus text format."""
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: Dict[str, object] = {}
+        self.scrapes = 0
+
+    def _add(self, metric):
+        if self.namespace:
+            metric.name = f"{self.namespace}_{metric.name}"
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), fn: Optional[Callable] = None) -> Gauge:
+        return self._add(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def per_scrape(self, fn: Callable) -> Callable:
+        """
+        Wrap ``fn`` so it runs at most once per ``render()``: several gauges
+        reading one walk of the same data share a single call.
+        """
+        cache = [None, None]  # scrape number, result
+
+        def cached():
+            if cache[0] != self.scrapes:
+                cache[0], cache[1] = self.scrapes, fn()
+            return cache[1]
+
+        return cached
+
+    def render(self) -> str:
+        self.scrapes += 1
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        lines.append("")
+        return "\n".join(lines)
@@ -0,0 +1,76 @@
+from typing import Dict, FrozenSet, Optional
+from app.common.connection import Connection
+from app.serialization import dumps
+
+ROOM_CREATED = "room_created"
+GUEST_JOINED = "guest_joined"
+GAME_STARTED = "game_started"
+ROOM_CLOSED = "room_closed"
+MATCH_FOUND = "match_found"  # matchmaking paired two players and started their game
+GAME_FINISHED = "game_finished"  # won, forfeited or expired, as reported by the game service
+EVENTS = frozenset((ROOM_CREATED, GUEST_JOINED, GAME_STARTED, ROOM_CLOSED, MATCH_FOUND, GAME_FINISHED))
+
+
+class LobbyFilter:
+    """What one subscriber wants: any combination of room, host, player and event types."""
+
+    __slots__ = ("room_id", "host", "player", "events")
+
+    def __init__(self, room_id: Optional[str] = None, host: Optional[str] = None,
+                 player: Optional[str] = None, events: Optional[FrozenSet[str]] = None):
+        self.room_id = room_id
+        self.host = host
+        self.player = player
+        self.events = events or EVENTS
+
+    def matches(self, event: str, room_id: str, room: dict) -> bool:
+        if event not in self.events:
+            return False
+        if self.room_id is not None and room_id != self.room_id:
+            return False
+        if self.host is not None and room["host"] != self.host:
+            return False
+        if self.player is not None and self.player not in (room["host"], room["guest"]):
+            return False
+        return True
+
+
+class LobbyFeed:
+    """
+    Fan-out of room changes to lobby WebSocket subscribers.
+
+    Each event is encoded once and the same frame is queued on every
+    matching subscriber's Connection (bounded queue + writer task), so a
+    slow subscriber only delays itself; on overflow it gets a fresh
+    snapshot instead of the backlog.
+    """
+
+    def __init__(self):
+        self.subscribers: Dict[Connection, LobbyFilter] = {}
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, conn: Connection, lobby_filter: LobbyFilter):
+        self.subscribers[conn] = lobby_filter
+
+    def unsubscribe(self, conn: Connection):
+        self.subscribers.pop(conn, None)
+
+    def publish(self, event: str, room_id: str, room: dict, version: int = 0):
+        self.published += 1
+        frame = None
+        for conn, lobby_filter in self.subscribers.items():
+            if not lobby_filter.matches(event, room_id, room):
+                continue
+            if frame is None:
+                frame = dumps({"event": event, "room_id": room_id, "room": room, "version": version})
+            if conn.send(frame):
+                self.delivered += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "queued": sum(conn.queue_depth() for conn in self.subscribers),
+        }
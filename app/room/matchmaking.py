@@ -0,0 +1,131 @@
+import os
+import time
+from collections import OrderedDict, deque
+from typing import List, Optional, Tuple
+from app.interservice import LatencyHistogram
+
+# Seconds between pairing rounds
+MATCH_INTERVAL = float(os.environ.get("MATCHMAKING_INTERVAL", "0.1"))
+# Most pairs formed (and games created) per round
+MATCH_BATCH = int(os.environ.get("MATCHMAKING_BATCH", "500"))
+# Seconds of history behind the matches-per-second figure
+THROUGHPUT_WINDOW = 60.0
+# Recent results kept for GET /matchmaking/{username}
+RECENT_MATCHES = 10000
+
+# Queue waits range from milliseconds (busy hours) to minutes
+WAIT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, float("inf"))
+
+
+class Ticket:
+    __slots__ = ("username", "enqueued_at")
+
+    def __init__(self, username: str, enqueued_at: float):
+        self.username = username
+        self.enqueued_at = enqueued_at
+
+
+class MatchQueue:
+    """
+    FIFO of players waiting for an opponent, paired in batches.
+
+    ``take_pairs()`` removes up to ``batch`` pairs, oldest first; pairs whose
+    game could not be created go back to the front with ``requeue()`` so
+    they keep their place. Wait times and matches are recorded when the
+    caller reports a pair as ``matched()``.
+    """
+
+    def __init__(self, batch: int = MATCH_BATCH, clock=time.monotonic):
+        self.batch = batch
+        self.clock = clock
+        self._waiting: "OrderedDict[str, Ticket]" = OrderedDict()
+        self._recent: "OrderedDict[str, str]" = OrderedDict()  # username -> room_id
+        self._match_times = deque()
+        self.wait = LatencyHistogram(WAIT_BUCKETS)
+        self.matches = 0
+        self.requeued = 0
+        self.cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._waiting)
+
+    def __contains__(self, username: str) -> bool:
+        return username in self._waiting
+
+    def enqueue(self, username: str) -> int:
+        """Add a player (no-op if already waiting); returns their 1-based position."""
+        if username in self._waiting:
+            # walks only the players ahead; a new player is appended in O(1)
+            for position, waiting in enumerate(self._waiting, 1):
+                if waiting == username:
+                    return position
+        self._recent.pop(username, None)
+        self._waiting[username] = Ticket(username, self.clock())
+        return len(self._waiting)
+
+    def cancel(self, username: str) -> bool:
+        if self._waiting.pop(username, None) is None:
+            return False
+        self.cancelled += 1
+        return True
+
+    def take_pairs(self) -> List[Tuple[Ticket, Ticket]]:
+        pairs = []
+        while len(self._waiting) >= 2 and len(pairs) < self.batch:
+            _, first = self._waiting.popitem(last=False)
+            _, second = self._waiting.popitem(last=False)
+            pairs.append((first, second))
+        return pairs
+
+    def requeue(self, pair: Tuple[Ticket, Ticket]):
+        for ticket in reversed(pair):
+            if ticket.username not in self._waiting:
+                self._waiting[ticket.username] = ticket
+                self._waiting.move_to_end(ticket.username, last=False)
+        self.requeued += 1
+
+    def matched(self, pair: Tuple[Ticket, Ticket], room_id: str):
+        now = self.clock()
+        for ticket in pair:
+            self.wait.observe(now - ticket.enqueued_at)
+            self._recent[ticket.username] = room_id
+            self._recent.move_to_end(ticket.username)
+        while len(self._recent) > RECENT_MATCHES:
+            self._recent.popitem(last=False)
+        self.matches += 1
+        self._match_times.append(now)
+        self._prune(now)
+
+    def _prune(self, now: float):
+        """Forget match times older than THROUGHPUT_WINDOW."""
+        times = self._match_times
+        while times and now - times[0] > THROUGHPUT_WINDOW:
+            times.popleft()
+
+    def status(self, username: str) -> dict:
+        ticket = self._waiting.get(username)
+        if ticket is not None:
+            return {"status": "queued", "waited": self.clock() - ticket.enqueued_at}
+        room_id = self._recent.get(username)
+        if room_id is not None:
+            return {"status": "matched", "room_id": room_id}
+        return {"status": "idle"}
+
+    def oldest_wait(self) -> Optional[float]:
+        for ticket in self._waiting.values():
+            return self.clock() - ticket.enqueued_at
+        return None
+
+    def stats(self) -> dict:
+        now = self.clock()
+        self._prune(now)
+        times = self._match_times
+        return {
+            "queued": len(self._waiting),
+            "oldest_wait": self.oldest_wait(),
+            "matches": self.matches,
+            "matches_per_sec": len(times) / THROUGHPUT_WINDOW,
+            "requeued": self.requeued,
+            "cancelled": self.cancelled,
+            "wait": self.wait.snapshot(),
+        }
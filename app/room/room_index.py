@@ -0,0 +1,203 @@
+import asyncio
+import os
+import time
+import uuid
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional
+
+# Seconds a finished room stays listed before it is evicted
+FINISHED_TTL = float(os.environ.get("ROOM_FINISHED_TTL", "300"))
+# Seconds between eviction sweeps
+SWEEP_INTERVAL = float(os.environ.get("ROOM_SWEEP_INTERVAL", "5"))
+
+STATUS_WAITING = "waiting"
+STATUS_STARTED = "started"
+STATUS_FINISHED = "finished"
+STATUSES = (STATUS_WAITING, STATUS_STARTED, STATUS_FINISHED)
+
+
+class RoomIndex:
+    """
+    The room service's rooms plus secondary indexes by status and by host.
+
+    Every room gets a creation sequence number; each index is a sorted list
+    of those numbers, so a filtered page is a slice found by bisection and
+    the cursor of the next page is simply the last sequence number returned.
+    ``version`` is bumped on every change and backs the ETag of the listing
+    endpoints. Rooms that finished more than ``finished_ttl`` seconds ago
+    are evicted by ``sweep()``; ``on_evict(room_id, room)`` is called for each.
+    """
+
+    def __init__(self, finished_ttl: float = FINISHED_TTL, clock=time.time, on_evict=None):
+        self.rooms: Dict[str, dict] = {}  # room_id -> {"host", "guest", "status", "created", ...}
+        self.finished_ttl = finished_ttl
+        self.clock = clock
+        self.on_evict = on_evict
+        self.version = 0
+        self.evicted = 0
+        # Distinguishes ETags across restarts, since version starts over at 0
+        self._boot = uuid.uuid4().hex[:8]
+        self._last_seq = 0
+        self._seq_of: Dict[str, int] = {}
+        self._room_at: Dict[int, str] = {}
+        self._all: List[int] = []
+        self._by_status: Dict[str, List[int]] = {status: [] for status in STATUSES}
+        self._by_host: Dict[str, List[int]] = {}
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self.rooms
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def get(self, room_id: str) -> Optional[dict]:
+        return self.rooms.get(room_id)
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self._boot}-{self.version}"'
+
+    # ---------------------------
+    # Index maintenance
+    # ---------------------------
+    def _index(self, seq: int, room: dict):
+        insort(self._by_status.setdefault(room["status"], []), seq)
+        insort(self._by_host.setdefault(room["host"], []), seq)
+
+    def _unindex(self, seq: int, room: dict):
+        _discard(self._by_status[room["status"]], seq)
+        hosted = self._by_host[room["host"]]
+        _discard(hosted, seq)
+        if not hosted:
+            del self._by_host[room["host"]]
+
+    # ---------------------------
+    # Updates
+    # ---------------------------
+    def add(self, room_id: str, room: dict) -> dict:
+        room.setdefault("created", self.clock())
+        self._last_seq += 1
+        seq = self._last_seq
+        self.rooms[room_id] = room
+        self._seq_of[room_id] = seq
+        self._room_at[seq] = room_id
+        self._all.append(seq)
+        self._index(seq, room)
+        self.version += 1
+        return room
+
+    def load(self, rooms: Dict[str, dict]) -> int:
+        """Rebuild from stored rooms (startup recovery), oldest first."""
+        for room_id, room in sorted(rooms.items(), key=lambda item: item[1].get("created", 0)):
+            self.add(room_id, room)
+        return len(rooms)
+
+    def update(self, room_id: str, **changes) -> dict:
+        """Change fields of a room, re-indexing it if its status changes."""
+        room = self.rooms[room_id]
+        seq = self._seq_of[room_id]
+        self._unindex(seq, room)
+        room.update(changes)
+        if changes.get("status") == STATUS_FINISHED:
+            room.setdefault("finished_at", self.clock())
+        self._index(seq, room)
+        self.version += 1
+        return room
+
+    def remove(self, room_id: str) -> Optional[dict]:
+        room = self.rooms.pop(room_id, None)
+        if room is None:
+            return None
+        seq = self._seq_of.pop(room_id)
+        del self._room_at[seq]
+        _discard(self._all, seq)
+        self._unindex(seq, room)
+        self.version += 1
+        return room
+
+    # ---------------------------
+    # Listing
+    # ---------------------------
+    def list(self, status: Optional[str] = None, host: Optional[str] = None,
+             cursor: Optional[int] = None, limit: int = 50, newest_first: bool = True):
+        """
+        One page of rooms matching the filters, the cursor of the next page
+        (None on the last page) and the number of matching rooms.
+        """
+        if status is not None and host is not None:
+            by_status = self._by_status.get(status, [])
+            by_host = self._by_host.get(host, [])
+            # Walk the shorter index, check the other field per room
+            if len(by_host) <= len(by_status):
+                seqs, field, value = by_host, "status", status
+            else:
+                seqs, field, value = by_status, "host", host
+            seqs = [s for s in seqs if self.rooms[self._room_at[s]][field] == value]
+        elif status is not None:
+            seqs = self._by_status.get(status, [])
+        elif host is not None:
+            seqs = self._by_host.get(host, [])
+        else:
+            seqs = self._all
+
+        if newest_first:
+            end = bisect_left(seqs, cursor) if cursor is not None else len(seqs)
+            start = max(0, end - limit)
+            page = seqs[start:end][::-1]
+            more = start > 0
+        else:
+            start = bisect_left(seqs, cursor + 1) if cursor is not None else 0
+            page = seqs[start:start + limit]
+            more = start + limit < len(seqs)
+
+        rooms = [self._row(seq) for seq in page]
+        next_cursor = page[-1] if more and page else None
+        return rooms, next_cursor, len(seqs)
+
+    def _row(self, seq: int) -> dict:
+        room_id = self._room_at[seq]
+        return {"room_id": room_id, **self.rooms[room_id]}
+
+    # ---------------------------
+    # Eviction
+    # ---------------------------
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Evict rooms that finished more than ``finished_ttl`` seconds ago.
+        Rooms become finished through the game service's report
+        (``POST /internal/game_finished`` in room_service).
+        """
+        now = self.clock() if now is None else now
+        expired = [
+            self._room_at[seq] for seq in self._by_status[STATUS_FINISHED]
+            if now - self.rooms[self._room_at[seq]].get("finished_at", now) >= self.finished_ttl
+        ]
+        for room_id in expired:
+            room = self.remove(room_id)
+            self.evicted += 1
+            if self.on_evict:
+                self.on_evict(room_id, room)
+        return len(expired)
+
+    async def run_sweeper(self, interval: float = SWEEP_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self.rooms),
+            "by_status": {status: len(seqs) for status, seqs in self._by_status.items()},
+            "hosts": len(self._by_host),
+            "evicted": self.evicted,
+            "version": self.version,
+        }
+
+
+def _discard(seqs: List[int], seq: int):
+    i = bisect_left(seqs, seq)
+    if i < len(seqs) and seqs[i] == seq:
+        del seqs[i]
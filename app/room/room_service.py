@@ -1,9 +1,46 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import quote
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 import httpx
 from fastapi.middleware.cors import CORSMiddleware
+from app import serialization
+from app.common.connection import Connection
+from app.interservice import ServiceClient, USER_SERVICE_URL, GAME_SERVICE_URL, require_internal
+from app.metrics import MetricsRegistry, instrument
+from app.room.lobby_feed import (
+    LobbyFeed, LobbyFilter, EVENTS, ROOM_CREATED, GUEST_JOINED, GAME_STARTED, ROOM_CLOSED, MATCH_FOUND,
+    GAME_FINISHED,
+)
+from app.room.matchmaking import MatchQueue, MATCH_INTERVAL
+from app.room.room_index import RoomIndex, STATUS_WAITING, STATUS_STARTED, STATUS_FINISHED
+from app.room.user_cache import UserCache
+from app.storage import service_storage
+
+# Durable copy of `rooms` (ROOM_STORAGE / BATTLESHIP_STORAGE, in-memory by default)
+storage = service_storage("ROOM_STORAGE")
+
+# Pooled client for calls to the user and game services
+services = ServiceClient({"user": USER_SERVICE_URL, "game": GAME_SERVICE_URL})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    room_index.load(storage.load_rooms())
+    await services.start()
+    sweeper = asyncio.create_task(room_index.run_sweeper())
+    matchmaker = asyncio.create_task(run_matchmaker())
+    yield
+    matchmaker.cancel()
+    sweeper.cancel()
+    await services.aclose()
+    storage.close()
 
-app = FastAPI(title="Room Service")
+
+app = FastAPI(title="Room Service", lifespan=lifespan, default_response_class=serialization.JSONResponse)
 
 # ---------------------------
 # CORS (required for frontend)
@@ -16,6 +53,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency, upstream calls, rooms, lobby and matchmaking at GET /metrics
+metrics = MetricsRegistry()
+instrument(app, metrics, services)
+metrics.gauge("rooms", "Rooms by status", ("status",),
+              fn=lambda: {(status,): count for status, count in room_index.stats()["by_status"].items()})
+metrics.gauge("lobby_subscribers", "Open lobby feed sockets", fn=lambda: len(lobby.subscribers))
+metrics.gauge("lobby_send_queue_frames", "Frames waiting in lobby sockets' send queues",
+              fn=lambda: sum(conn.queue_depth() for conn in lobby.subscribers))
+metrics.gauge("matchmaking_queued", "Players waiting for an opponent", fn=lambda: len(match_queue))
+
 # ---------------------------
 # Models
 # ---------------------------
@@ -27,26 +74,63 @@ class JoinRoomRequest(BaseModel):
     room_id: str
     guest_player: str
 
+class UserRegistered(BaseModel):
+    username: str
+
+class MatchRequest(BaseModel):
+    username: str
+
+class GameFinished(BaseModel):
+    room_id: str
+    winner: Optional[str] = None
+    reason: str
+
 # ---------------------------
 # In-memory storage
 # ---------------------------
-rooms = {}  # room_id -> {"host": str, "guest": Optional[str], "status": str}
+# Lobby WebSocket subscribers (see /ws/lobby)
+lobby = LobbyFeed()
+
+
+def room_evicted(room_id: str, room: dict):
+    storage.delete_room(room_id)
+    lobby.publish(ROOM_CLOSED, room_id, room, room_index.version)
+
+
+# rooms plus indexes by status and host; finished rooms are evicted after ROOM_FINISHED_TTL
+room_index = RoomIndex(on_evict=room_evicted)
+rooms = room_index.rooms  # room_id -> {"host": str, "guest": Optional[str], "status": str, "created": float}
+
+
+def not_modified(request: Request, response: Response) -> Optional[Response]:
+    """Set the lobby ETag; a 304 if the poller already has this version."""
+    etag = room_index.etag
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
 
 # ---------------------------
 # Helper: check if user is registered
 # ---------------------------
-USER_SERVICE_URL = "http://127.0.0.1:8001"
-GAME_SERVICE_URL = "http://127.0.0.1:8002"
+# username -> registered, for positive and negative answers
+user_cache = UserCache()
 
 async def is_registered(username: str) -> bool:
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        try:
-            resp = await client.get(f"{USER_SERVICE_URL}/users")
-            if resp.status_code == 200:
-                users = resp.json().get("registered_users", [])
-                return username in users
-        except httpx.RequestError:
-            raise HTTPException(status_code=500, detail="User service unreachable")
+    cached = user_cache.get(username)
+    if cached is not None:
+        return cached
+
+    try:
+        resp = await services.get("user", f"/users/{quote(username, safe='')}")
+    except httpx.RequestError:
+        raise HTTPException(status_code=500, detail="User service unreachable")
+
+    if resp.status_code == 200:
+        user_cache.put(username, True)
+        return True
+    if resp.status_code == 404:
+        user_cache.put(username, False)
     return False
 
 # ---------------------------
@@ -60,11 +144,13 @@ async def create_room(req: CreateRoomRequest):
     if req.room_id in rooms:
         raise HTTPException(status_code=400, detail="Room already exists")
 
-    rooms[req.room_id] = {
+    room = room_index.add(req.room_id, {
         "host": req.host_player,
         "guest": None,
-        "status": "waiting"
-    }
+        "status": STATUS_WAITING
+    })
+    storage.save_room(req.room_id, room)
+    lobby.publish(ROOM_CREATED, req.room_id, room, room_index.version)
 
     return {"message": f"Room '{req.room_id}' created successfully by {req.host_player}"}
 
@@ -83,13 +169,36 @@ async def join_room(req: JoinRoomRequest):
     if rooms[req.room_id]["host"] == req.guest_player:
         raise HTTPException(status_code=400, detail="Cannot join your own room as guest")
 
-    rooms[req.room_id]["guest"] = req.guest_player
+    room = room_index.update(req.room_id, guest=req.guest_player)
+    storage.save_room(req.room_id, room)
+    lobby.publish(GUEST_JOINED, req.room_id, room, room_index.version)
     return {"message": f"{req.guest_player} joined room '{req.room_id}'"}
 
 
 @app.get("/list_rooms")
-def list_rooms():
-    return rooms
+async def list_rooms(request: Request, response: Response):
+    """Every room keyed by id (kept for the web lobby); prefer /rooms for large lobbies."""
+    return not_modified(request, response) or rooms
+
+
+@app.get("/rooms")
+async def list_rooms_page(
+    request: Request,
+    response: Response,
+    status: Optional[str] = Query(None, pattern="^(waiting|started|finished)$"),
+    host: Optional[str] = None,
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("newest", pattern="^(newest|oldest)$"),
+):
+    """One page of rooms, e.g. ?status=waiting for open rooms newest first; follow next_cursor."""
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+    page, next_cursor, total = room_index.list(
+        status=status, host=host, cursor=cursor, limit=limit, newest_first=order == "newest"
+    )
+    return {"rooms": page, "next_cursor": next_cursor, "total": total, "version": room_index.version}
 
 
 @app.post("/start_game/{room_id}")
@@ -106,7 +215,7 @@ async def start_game(room_id: str, username: str):
     if not room["guest"]:
         raise HTTPException(status_code=400, detail="Waiting for another player to join")
 
-    if room.get("status") == "started":
+    if room.get("status") != STATUS_WAITING:
         raise HTTPException(status_code=400, detail="Game already started")
 
     payload = {
@@ -115,21 +224,201 @@ async def start_game(room_id: str, username: str):
         "room_id": room_id,
     }
 
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        try:
-            response = await client.post(
-                f"{GAME_SERVICE_URL}/game/create",
-                json=payload
-            )
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=500, detail=f"Game service unreachable: {str(e)}")
+    try:
+        response = await services.post("game", "/game/create", json=payload)
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=500, detail=f"Game service unreachable: {str(e)}")
 
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail="Failed to start game")
 
-    room["status"] = "started"
+    room_index.update(room_id, status=STATUS_STARTED)
+    storage.save_room(room_id, room)
+    lobby.publish(GAME_STARTED, room_id, room, room_index.version)
 
     return {
         "message": f"Game started for room '{room_id}'",
         "details": response.json()
     }
+
+
+# ---------------------------
+# Matchmaking
+# ---------------------------
+# Players waiting for an automatic opponent
+match_queue = MatchQueue()
+metrics.histogram("matchmaking_wait_seconds", "Time from joining the queue to being matched").attach(match_queue.wait)
+
+
+async def create_match(pair) -> bool:
+    """Create the game and room for one pair; False if the game service refused or is down."""
+    first, second = pair
+    room_id = f"match_{uuid.uuid4().hex[:12]}"
+    payload = {
+        "player1": first.username,
+        "player2": second.username,
+        "room_id": room_id,
+    }
+    try:
+        response = await services.post("game", "/game/create", json=payload)
+    except httpx.RequestError:
+        return False
+    if response.status_code != 200:
+        return False
+
+    room = room_index.add(room_id, {
+        "host": first.username,
+        "guest": second.username,
+        "status": STATUS_STARTED
+    })
+    storage.save_room(room_id, room)
+    match_queue.matched(pair, room_id)
+    lobby.publish(MATCH_FOUND, room_id, room, room_index.version)
+    return True
+
+
+async def run_matchmaker(interval: float = MATCH_INTERVAL):
+    """Background task: every interval, pair the queue and create all games of the round concurrently."""
+    while True:
+        await asyncio.sleep(interval)
+        pairs = match_queue.take_pairs()
+        if not pairs:
+            continue
+        results = await asyncio.gather(*(create_match(pair) for pair in pairs), return_exceptions=True)
+        # back to the front of the queue, oldest pair first
+        for pair, ok in reversed(list(zip(pairs, results))):
+            if ok is not True:
+                match_queue.requeue(pair)
+
+
+@app.post("/matchmaking/join")
+async def join_matchmaking(req: MatchRequest):
+    """Queue a player for an opponent; the match arrives as match_found on /ws/lobby?player=..."""
+    if not await is_registered(req.username):
+        raise HTTPException(status_code=403, detail=f"User '{req.username}' is not registered")
+    position = match_queue.enqueue(req.username)
+    return {"status": "queued", "position": position}
+
+
+@app.post("/matchmaking/leave")
+async def leave_matchmaking(req: MatchRequest):
+    if not match_queue.cancel(req.username):
+        raise HTTPException(status_code=404, detail="Not in the matchmaking queue")
+    return {"status": "cancelled"}
+
+
+# Queue depth, wait-time histogram and matches per second
+@app.get("/matchmaking/stats")
+async def matchmaking_stats():
+    return match_queue.stats()
+
+
+@app.get("/matchmaking/{username}")
+async def matchmaking_status(username: str):
+    """queued (with seconds waited), matched (with room_id) or idle; for clients without the feed."""
+    return match_queue.status(username)
+
+
+# ---------------------------
+# Lobby feed
+# ---------------------------
+# Rooms sent in the snapshot that opens every lobby subscription
+LOBBY_SNAPSHOT_LIMIT = 100
+
+
+def lobby_snapshot(lobby_filter: LobbyFilter) -> str:
+    """The rooms a subscriber starts from: its room, its host's rooms, or the open rooms."""
+    if lobby_filter.room_id is not None:
+        room = room_index.get(lobby_filter.room_id)
+        page = [{"room_id": lobby_filter.room_id, **room}] if room else []
+    elif lobby_filter.host is not None:
+        page, _, _ = room_index.list(host=lobby_filter.host, limit=LOBBY_SNAPSHOT_LIMIT)
+    else:
+        page, _, _ = room_index.list(status=STATUS_WAITING, limit=LOBBY_SNAPSHOT_LIMIT)
+    if lobby_filter.player is not None:
+        page = [r for r in page if lobby_filter.player in (r["host"], r["guest"])]
+    return serialization.dumps({"event": "snapshot", "rooms": page, "version": room_index.version})
+
+
+@app.websocket("/ws/lobby")
+async def lobby_ws(
+    ws: WebSocket,
+    room_id: Optional[str] = None,
+    host: Optional[str] = None,
+    player: Optional[str] = None,
+    events: Optional[str] = None,
+):
+    """
+    Push feed of room_created / guest_joined / game_started / room_closed.
+    Optional filters: one room, one host, rooms a player is in, and a
+    comma-separated list of event types.
+    """
+    wanted = None
+    if events:
+        wanted = frozenset(e.strip() for e in events.split(",") if e.strip())
+        if not wanted <= EVENTS:
+            await ws.close(code=1008)
+            return
+    lobby_filter = LobbyFilter(room_id=room_id, host=host, player=player, events=wanted)
+
+    await ws.accept()
+    conn = Connection(ws, player or "", resync=lambda c: lobby_snapshot(lobby_filter))
+    conn.start()
+    conn.send(lobby_snapshot(lobby_filter))
+    lobby.subscribe(conn, lobby_filter)
+    try:
+        while True:
+            # nothing to act on; just notice when the client goes away
+            await ws.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        lobby.unsubscribe(conn)
+        await conn.close()
+
+
+# ---------------------------
+# Internal: cache invalidation pushed by the user service
+# ---------------------------
+# async like every handler that touches the index, the lobby or the caches:
+# those belong to the event loop, and a sync handler would run in a worker thread
+@app.post("/internal/user_registered", dependencies=[Depends(require_internal)])
+async def user_registered(req: UserRegistered):
+    user_cache.put(req.username, True)
+    return {"ok": True}
+
+
+# ---------------------------
+# Internal: game results pushed by the game service
+# ---------------------------
+@app.post("/internal/game_finished", dependencies=[Depends(require_internal)])
+async def game_finished(req: GameFinished):
+    """
+    Mark the room finished (won, forfeited, or expired unplayed); it is then
+    evicted ROOM_FINISHED_TTL later like any finished room. Repeats are no-ops.
+    """
+    room = room_index.get(req.room_id)
+    if room is None:
+        raise HTTPException(status_code=404, detail="Room not found")
+    if room.get("status") == STATUS_FINISHED:
+        return {"ok": True}
+    room = room_index.update(req.room_id, status=STATUS_FINISHED, winner=req.winner, reason=req.reason)
+    storage.save_room(req.room_id, room)
+    lobby.publish(GAME_FINISHED, req.room_id, room, room_index.version)
+    return {"ok": True}
+
+
+@app.get("/internal/rooms", dependencies=[Depends(require_internal)])
+async def room_index_stats():
+    return {**room_index.stats(), "lobby": lobby.stats()}
+
+
+@app.get("/internal/user_cache", dependencies=[Depends(require_internal)])
+async def user_cache_stats():
+    return user_cache.stats()
+
+
+@app.get("/internal/upstreams", dependencies=[Depends(require_internal)])
+async def upstream_stats():
+    """Per-target request counts, breaker state and latency histograms."""
+    return services.stats()
@@ -0,0 +1,58 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Seconds a "user exists" answer is trusted (usernames are never deleted)
+POSITIVE_TTL = float(os.environ.get("USER_CACHE_POSITIVE_TTL", "600"))
+# Seconds a "no such user" answer is trusted; the user service also pushes
+# an invalidation on register, so this only bounds a lost push
+NEGATIVE_TTL = float(os.environ.get("USER_CACHE_NEGATIVE_TTL", "30"))
+# Entries kept before the least recently used ones are dropped
+MAX_ENTRIES = int(os.environ.get("USER_CACHE_SIZE", "100000"))
+
+
+class UserCache:
+    """TTL + LRU cache of username -> registered (True / False)."""
+
+    def __init__(self, positive_ttl: float = POSITIVE_TTL, negative_ttl: float = NEGATIVE_TTL,
+                 max_entries: int = MAX_ENTRIES, clock=time.monotonic):
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # username -> (registered, expires)
+
+    def get(self, username: str) -> Optional[bool]:
+        """Cached answer, or None if unknown or expired."""
+        entry = self._entries.get(username)
+        if entry is not None:
+            registered, expires = entry
+            if self.clock() < expires:
+                self._entries.move_to_end(username)
+                self.hits += 1
+                return registered
+            del self._entries[username]
+        self.misses += 1
+        return None
+
+    def put(self, username: str, registered: bool):
+        ttl = self.positive_ttl if registered else self.negative_ttl
+        self._entries[username] = (registered, self.clock() + ttl)
+        self._entries.move_to_end(username)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        self._entries.pop(username, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
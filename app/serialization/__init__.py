@@ -0,0 +1,89 @@
+import dataclasses
+import json
+import os
+from typing import Callable, NamedTuple
+from starlette.responses import JSONResponse as _StarletteJSONResponse
+
+# JSON library used by every service: "auto" picks the first available of
+# orjson and msgspec and falls back to the standard library; naming one
+# forces it (and fails at import if it is not installed).
+JSON_BACKEND = os.environ.get("BATTLESHIP_JSON", "auto")
+
+
+class Codec(NamedTuple):
+    name: str
+    dumps: Callable[[object], str]            # compact JSON text
+    dumps_bytes: Callable[[object], bytes]    # same, UTF-8 encoded
+    loads: Callable[[object], object]
+
+
+_field_names = {}
+
+
+def _default(obj):
+    # typed event structs (slotted dataclasses) encode as objects, fields in order
+    names = _field_names.get(type(obj))
+    if names is None:
+        if not dataclasses.is_dataclass(obj):
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+        names = _field_names[type(obj)] = tuple(f.name for f in dataclasses.fields(obj))
+    return {name: getattr(obj, name) for name in names}
+
+
+def _stdlib() -> Codec:
+    # one prebuilt encoder: same output as Starlette's send_json, without per-call setup
+    encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_default).encode
+    return Codec("stdlib", encode, lambda obj: encode(obj).encode(), json.loads)
+
+
+def _orjson() -> Codec:
+    import orjson
+    encode = orjson.dumps
+    return Codec("orjson", lambda obj: encode(obj).decode(), encode, orjson.loads)
+
+
+def _msgspec() -> Codec:
+    import msgspec
+    encode = msgspec.json.Encoder().encode
+    return Codec("msgspec", lambda obj: encode(obj).decode(), encode, msgspec.json.decode)
+
+
+BACKENDS = {"orjson": _orjson, "msgspec": _msgspec, "stdlib": _stdlib}
+
+
+def available() -> list:
+    """Names of the backends that can be loaded here."""
+    names = []
+    for name, load in BACKENDS.items():
+        try:
+            load()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def select(name: str = "auto") -> Codec:
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend {name!r} (known: {', '.join(BACKENDS)})")
+        return BACKENDS[name]()
+    for load in BACKENDS.values():
+        try:
+            return load()
+        except ImportError:
+            continue
+    return _stdlib()
+
+
+codec = select(JSON_BACKEND)
+dumps = codec.dumps
+dumps_bytes = codec.dumps_bytes
+loads = codec.loads
+
+
+class JSONResponse(_StarletteJSONResponse):
+    """Starlette JSONResponse rendered with the selected backend (``default_response_class`` of the services)."""
+
+    def render(self, content) -> bytes:
+        return dumps_bytes(content)
@@ -0,0 +1,23 @@
+import os
+from app.storage.base import Storage
+from app.storage.memory import MemoryStorage
+
+# Storage URL used when a service has no specific one:
+#   "memory" (default)  or  "sqlite:///path/to/file.db"
+DEFAULT_STORAGE_URL = os.environ.get("BATTLESHIP_STORAGE", "memory")
+
+
+def open_storage(url: str = None) -> Storage:
+    """Create the backend for a storage URL ("memory" or "sqlite:///path")."""
+    url = url or DEFAULT_STORAGE_URL
+    if url == "memory":
+        return MemoryStorage()
+    if url.startswith("sqlite:///"):
+        from app.storage.sqlite import SQLiteStorage
+        return SQLiteStorage(url[len("sqlite:///"):])
+    raise ValueError(f"Unknown storage URL: {url}")
+
+
+def service_storage(env_var: str) -> Storage:
+    """Backend for one service: its own env var (e.g. GAME_STORAGE), else BATTLESHIP_STORAGE."""
+    return open_storage(os.environ.get(env_var) or DEFAULT_STORAGE_URL)
@@ -0,0 +1,60 @@
+from typing import Dict, Iterable, Optional
+
+
+class Storage:
+    """
+    Persistence interface shared by the user, room and game services.
+
+    Writes are fire-and-forget: implementations may buffer and batch them, so
+    callers on a hot path never wait for the disk. ``flush()`` forces buffered
+    writes out; ``close()`` flushes and releases resources. The ``load_*``
+    methods are meant for startup recovery. ``durable`` says whether what is
+    saved survives a restart; callers may skip costly snapshots when it does not.
+    """
+
+    durable = False
+
+    # ---------------------------
+    # Users
+    # ---------------------------
+    def add_user(self, username: str):
+        raise NotImplementedError
+
+    def load_users(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    # ---------------------------
+    # Rooms
+    # ---------------------------
+    def save_room(self, room_id: str, room: dict):
+        raise NotImplementedError
+
+    def delete_room(self, room_id: str):
+        raise NotImplementedError
+
+    def load_rooms(self) -> Dict[str, dict]:
+        raise NotImplementedError
+
+    # ---------------------------
+    # Games (GameManager.to_state() dicts)
+    # ---------------------------
+    def save_game(self, room_id: str, state: dict):
+        raise NotImplementedError
+
+    def delete_game(self, room_id: str):
+        raise NotImplementedError
+
+    def load_games(self) -> Dict[str, dict]:
+        raise NotImplementedError
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def stats(self) -> Optional[dict]:
+        return None
@@ -0,0 +1,39 @@
+from typing import Dict, Iterable
+from app.storage.base import Storage
+
+
+class MemoryStorage(Storage):
+    """Default backend: keeps copies in process memory, nothing survives a restart."""
+
+    def __init__(self):
+        self.users = set()
+        self.rooms: Dict[str, dict] = {}
+        self.games: Dict[str, dict] = {}
+
+    def add_user(self, username: str):
+        self.users.add(username)
+
+    def load_users(self) -> Iterable[str]:
+        return list(self.users)
+
+    def save_room(self, room_id: str, room: dict):
+        self.rooms[room_id] = dict(room)
+
+    def delete_room(self, room_id: str):
+        self.rooms.pop(room_id, None)
+
+    def load_rooms(self) -> Dict[str, dict]:
+        return {room_id: dict(room) for room_id, room in self.rooms.items()}
+
+    def save_game(self, room_id: str, state: dict):
+        self.games[room_id] = state
+
+    def delete_game(self, room_id: str):
+        self.games.pop(room_id, None)
+
+    def load_games(self) -> Dict[str, dict]:
+        return dict(self.games)
+
+    def stats(self):
+        return {"backend": "memory", "users": len(self.users),
+                "rooms": len(self.rooms), "games": len(self.games)}
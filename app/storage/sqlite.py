@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable
+from app.storage.base import Storage
+
+# Buffered writes are committed at least this often (seconds) ...
+FLUSH_INTERVAL = float(os.environ.get("STORAGE_FLUSH_INTERVAL", "0.05"))
+# ... or as soon as this many distinct keys are pending
+FLUSH_BATCH = int(os.environ.get("STORAGE_FLUSH_BATCH", "1000"))
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS rooms (room_id TEXT PRIMARY KEY, data TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS games (room_id TEXT PRIMARY KEY, data TEXT NOT NULL)",
+]
+
+_DELETE = object()
+
+log = logging.getLogger(__name__)
+
+
+class SQLiteStorage(Storage):
+    """
+    Durable backend on an embedded SQLite database in WAL mode.
+
+    Writes only record the latest value per key in a pending map (so ten
+    moves in one game between two flushes cost one row write); a background
+    thread commits the map in a single transaction every FLUSH_INTERVAL
+    seconds. With ``synchronous=NORMAL`` WAL commits do not fsync, so a
+    crash can lose at most the last flush interval, never corrupt the file.
+    A batch whose commit fails goes back into the pending map (behind any
+    newer writes to the same keys) and is retried on the next flush.
+    """
+
+    durable = True
+
+    def __init__(self, path: str, flush_interval: float = FLUSH_INTERVAL, flush_batch: int = FLUSH_BATCH):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.commits = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.last_error = None
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+
+        self._pending: Dict[tuple, object] = {}  # (table, key) -> value or _DELETE
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sqlite-storage", daemon=True)
+        self._thread.start()
+
+    # ---------------------------
+    # Buffered writes
+    # ---------------------------
+    def _put(self, table: str, key: str, value):
+        with self._lock:
+            self._pending[(table, key)] = value
+            if len(self._pending) >= self.flush_batch:
+                self._wake.set()
+
+    def add_user(self, username: str):
+        self._put("users", username, True)
+
+    def save_room(self, room_id: str, room: dict):
+        self._put("rooms", room_id, dict(room))
+
+    def delete_room(self, room_id: str):
+        self._put("rooms", room_id, _DELETE)
+
+    def save_game(self, room_id: str, state: dict):
+        self._put("games", room_id, state)
+
+    def delete_game(self, room_id: str):
+        self._put("games", room_id, _DELETE)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # logged and re-queued by flush(); retried next interval
+
+    def flush(self):
+        # _db_lock is held across swap and commit so two flushes cannot reorder writes
+        with self._db_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            try:
+                self._commit(pending)
+            except Exception as e:
+                # keep the batch, but never over a write made since the swap
+                with self._lock:
+                    for key, value in pending.items():
+                        self._pending.setdefault(key, value)
+                self.failures += 1
+                self.last_error = repr(e)
+                log.exception("sqlite flush of %d rows to %s failed; will retry", len(pending), self.path)
+                raise
+            self.commits += 1
+            self.rows_written += len(pending)
+
+    def _commit(self, pending: Dict[tuple, object]):
+        upserts = {"users": [], "rooms": [], "games": []}
+        deletes = {"users": [], "rooms": [], "games": []}
+        for (table, key), value in pending.items():
+            if value is _DELETE:
+                deletes[table].append((key,))
+            elif table == "users":
+                upserts[table].append((key,))
+            else:
+                upserts[table].append((key, json.dumps(value, separators=(",", ":"))))
+
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("INSERT OR IGNORE INTO users (username) VALUES (?)", upserts["users"])
+            for table in ("rooms", "games"):
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} (room_id, data) VALUES (?, ?)", upserts[table]
+                )
+                conn.executemany(f"DELETE FROM {table} WHERE room_id = ?", deletes[table])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ---------------------------
+    # Recovery
+    # ---------------------------
+    def _select(self, sql: str):
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute(sql).fetchall()
+
+    def load_users(self) -> Iterable[str]:
+        return [username for (username,) in self._select("SELECT username FROM users")]
+
+    def load_rooms(self) -> Dict[str, dict]:
+        return {room_id: json.loads(data) for room_id, data in self._select("SELECT room_id, data FROM rooms")}
+
+    def load_games(self) -> Dict[str, dict]:
+        return {room_id: json.loads(data) for room_id, data in self._select("SELECT room_id, data FROM games")}
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "pending": pending,
+            "commits": self.commits,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
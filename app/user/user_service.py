@@ -1,8 +1,31 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import httpx
+from app import serialization
+from app.interservice import ServiceClient, ROOM_SERVICE_URL, require_internal
+from app.metrics import MetricsRegistry, instrument
+from app.storage import service_storage
 
-app = FastAPI(title="User Service")
+# Durable copy of `users` (USER_STORAGE / BATTLESHIP_STORAGE, in-memory by default)
+storage = service_storage("USER_STORAGE")
+
+# Pooled client for pushes to the room service
+services = ServiceClient({"room": ROOM_SERVICE_URL})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    users.update(storage.load_users())
+    await services.start()
+    yield
+    await services.aclose()
+    storage.close()
+
+
+app = FastAPI(title="User Service", lifespan=lifespan, default_response_class=serialization.JSONResponse)
 
 # Enable CORS so React frontend can call this API
 app.add_middleware(
@@ -13,18 +36,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency, upstream calls and user counts at GET /metrics
+metrics = MetricsRegistry()
+instrument(app, metrics, services)
+metrics.gauge("registered_users", "Registered usernames", fn=lambda: len(users))
+
 # In-memory store for registered usernames
 users = set()
 
 class UserRequest(BaseModel):
     username: str
 
+class UsersExistRequest(BaseModel):
+    usernames: List[str]
+
+async def notify_registered(username: str):
+    """Tell the room service to drop any cached "not registered" answer (best effort)."""
+    try:
+        await services.post("room", "/internal/user_registered", json={"username": username}, idempotent=True)
+    except httpx.RequestError:
+        pass
+
 @app.post("/register")
-def register_user(req: UserRequest):
+def register_user(req: UserRequest, background_tasks: BackgroundTasks):
     """Register a new username. Fails if username already exists."""
     if req.username in users:
         raise HTTPException(status_code=400, detail="Username already exists")
     users.add(req.username)
+    storage.add_user(req.username)
+    background_tasks.add_task(notify_registered, req.username)
     return {"message": f"User '{req.username}' registered successfully"}
 
 @app.post("/login")
@@ -38,3 +78,22 @@ def login_user(req: UserRequest):
 def list_users():
     """Get a list of all registered usernames."""
     return {"registered_users": list(users)}
+
+@app.get("/users/{username}")
+def get_user(username: str):
+    """Point lookup: 200 if the username is registered, 404 otherwise."""
+    if username not in users:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"username": username, "registered": True}
+
+@app.post("/users/exists")
+def users_exist(req: UsersExistRequest):
+    """Batch existence check: splits the given usernames into registered / missing."""
+    registered = [u for u in req.usernames if u in users]
+    missing = [u for u in req.usernames if u not in users]
+    return {"registered": registered, "missing": missing}
+
+@app.get("/internal/upstreams", dependencies=[Depends(require_internal)])
+async def upstream_stats():
+    """Per-target request counts, breaker state and latency histograms."""
+    return services.stats()
@@ -0,0 +1,43 @@
+import pytest
+from app.game.services.registry import GameRegistry
+from app.room.room_index import RoomIndex
+
+
+class Clock:
+    """Stand-in for the ``clock=`` time sources: tests set or advance ``now``."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def evicted():
+    """What the ``on_evict`` callbacks of ``make_registry`` / ``make_index`` were called with."""
+    return []
+
+
+@pytest.fixture
+def make_registry(clock, evicted):
+    """GameRegistry on the test clock (one shard unless told otherwise), recording evicted room ids."""
+    def make(**kwargs):
+        kwargs.setdefault("shards", 1)
+        return GameRegistry(clock=clock, on_evict=lambda room_id, entry: evicted.append(room_id), **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def make_index(clock, evicted):
+    """RoomIndex on the test clock, recording (room_id, status) of evicted rooms."""
+    def make(**kwargs):
+        return RoomIndex(clock=clock, on_evict=lambda room_id, room: evicted.append((room_id, room["status"])), **kwargs)
+
+    return make
@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.game import wire
+from app.game.game_manager import GameManager
+from app.game.logic import BOARD_SIZE
+from app.game.services import game_service
+from app.game.services.actions import TokenBucket, parse_dict, parse_text
+
+
+def test_valid_actions_pass_and_extra_keys_are_dropped():
+    move = parse_text('{"action": "move", "row": 0, "col": 11, "player_name": "leia", "room_id": "r1"}')
+    assert move == {"action": "move", "row": 0, "col": BOARD_SIZE - 1}
+    assert parse_text('{"action": "resync"}') == {"action": "resync"}
+    assert parse_text('{"action": "resume", "seq": 0}') == {"action": "resume", "seq": 0}
+    assert parse_text('{"action": "pong"}') == {"action": "pong"}
+
+
+@pytest.mark.parametrize("text", [
+    '{"action": "move", "row": -1, "col": 0}',
+    f'{{"action": "move", "row": 0, "col": {BOARD_SIZE}}}',
+    '{"action": "move", "row": "3", "col": 0}',
+    '{"action": "move", "row": true, "col": 0}',
+    '{"action": "move", "row": 1.0, "col": 0}',
+    '{"action": "move", "row": 1}',
+    '{"action": "resume", "seq": -1}',
+    '{"action": "resume"}',
+    '{"action": "fire", "row": 1, "col": 1}',
+    '{"row": 1, "col": 1}',
+    '["move", 1, 1]',
+    '{"action": "move", "row": 1, "col": 1',
+    '',
+])
+def test_invalid_frames_are_rejected(text):
+    assert parse_text(text) is None
+
+
+def test_binary_frames_go_through_the_same_schema():
+    assert parse_dict(wire.decode_client_frame(wire.encode_client_move(3, 4))) == {"action": "move", "row": 3, "col": 4}
+    assert parse_dict(wire.decode_client_frame(wire.encode_client_pong())) == {"action": "pong"}
+    # the wire format carries a byte per coordinate; the schema keeps it on the board
+    assert parse_dict(wire.decode_client_frame(wire.encode_client_move(BOARD_SIZE, 0))) is None
+    assert parse_dict(wire.decode_client_frame(b"\x01\x02")) is None
+
+
+def test_bucket_allows_the_burst_then_refills_at_the_rate(clock):
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.allow() for _ in range(4)] == [True, True, True, False]
+    assert (bucket.rejected, bucket.rejected_in_row) == (1, 1)
+
+    clock.now += 0.25  # half a token
+    assert not bucket.allow()
+    assert bucket.rejected_in_row == 2
+    clock.now += 0.25
+    assert bucket.allow()
+    assert (bucket.rejected, bucket.rejected_in_row) == (2, 0)
+
+    clock.now += 60  # a long pause saves up no more than the burst
+    assert [bucket.allow() for _ in range(4)] == [True, True, True, False]
+
+
+def test_socket_survives_bad_frames_and_is_closed_for_flooding(clock, monkeypatch):
+    monkeypatch.setattr(game_service, "TokenBucket", lambda: TokenBucket(rate=1, burst=2, clock=clock))
+    monkeypatch.setattr(game_service, "WS_FLOOD_LIMIT", 3)
+    game_service.registry.put_game("flood-room", GameManager("luke", "leia", seed=5))
+
+    with TestClient(game_service.app) as client:
+        with client.websocket_connect("/ws/flood-room?player=luke&v=2") as ws:
+            assert ws.receive_json()["event"] == "connected"
+
+            # a malformed frame is dropped; the socket keeps working
+            ws.send_text('{"action": "move", "row": 99, "col": 0}')
+            ws.send_json({"action": "resync"})
+            assert ws.receive_json()["event"] == "resync"
+
+            # the bucket is empty now: three drops in a row close the socket
+            for _ in range(3):
+                ws.send_json({"action": "resync"})
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == 1008
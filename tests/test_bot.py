@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.game.bot import DensityBot
+from app.game.game_manager import GameManager
+from app.game.logic import BitBoard, Board, BOARD_SIZE
+
+
+def play_until_sunk(board_cls):
+    """A game where "a" has fired until at least one of b's ships sank, plus some misses."""
+    gm = GameManager("a", "b", board_cls=board_cls, seed=3)
+    target = gm.boards["b"]
+    sunk = 0
+    for ship in list(target.ships):
+        for row, col in list(ship["coords"]):
+            result = target.receive_shot(row, col)
+        sunk += result.startswith("sunk ")
+        if sunk:
+            break
+    shots = 0
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            if target.grid[row][col] == "~" and shots < 10:
+                target.receive_shot(row, col)
+                shots += 1
+    return gm, target
+
+
+@pytest.mark.parametrize("board_cls", [BitBoard, Board])
+def test_from_board_reads_any_board_engine(board_cls):
+    gm, target = play_until_sunk(board_cls)
+    bot = DensityBot.from_board(target, "a")
+
+    grid = target.grid
+    shot = {divmod(cell, BOARD_SIZE) for cell in range(BOARD_SIZE * BOARD_SIZE) if bot.shot[cell]}
+    assert shot == {(r, c) for r in range(BOARD_SIZE) for c in range(BOARD_SIZE) if grid[r][c] in "XM"}
+    assert sum(bot.afloat.values()) == sum(1 for ship in target.ships if ship["coords"])
+
+    row, col = bot.choose()
+    assert grid[row][col] not in "XM"
+
+
+@pytest.mark.parametrize("board_cls", [BitBoard, Board])
+def test_from_board_after_restore(board_cls):
+    gm, target = play_until_sunk(board_cls)
+    restored = GameManager.from_state(gm.to_state())
+    assert type(restored.boards["b"]) is board_cls
+
+    bot = DensityBot.from_board(restored.boards["b"], "a")
+    row, col = bot.choose()
+    restored.make_move("a", row, col)
+    assert restored.last_move is not None and restored.last_move.result != "already"
+
+
+def test_sockets_cannot_take_the_bot_seat():
+    from app.game.services import game_service
+
+    with TestClient(game_service.app) as client:
+        client.post("/game/create", json={"player1": "luke", "player2": game_service.BOT_PLAYER, "room_id": "bot-seat"})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(f"/ws/bot-seat?player={game_service.BOT_PLAYER}") as ws:
+                ws.receive_json()
+        assert closed.value.code == 1008
@@ -0,0 +1,114 @@
+import asyncio
+from app.common.connection import Connection, POLICY_DISCONNECT, POLICY_RESYNC
+
+
+class FakeSocket:
+    """Records what is written; ``gate`` holds every write until it is set."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send_text(self, text):
+        await self.gate.wait()
+        self.sent.append(text)
+
+    async def send_bytes(self, data):
+        await self.gate.wait()
+        self.sent.append(data)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_frames_are_written_in_order():
+    async def scenario():
+        ws = FakeSocket()
+        conn = Connection(ws, "luke")
+        conn.start()
+        for frame in ("a", b"b", "c"):
+            assert conn.send(frame)
+        await settle()
+        await conn.close()
+        return ws.sent
+
+    assert asyncio.run(scenario()) == ["a", b"b", "c"]
+
+
+def test_slow_consumer_gets_one_snapshot_instead_of_the_backlog():
+    async def scenario():
+        ws = FakeSocket()
+        snapshots = []
+
+        def resync(conn):
+            snapshots.append(conn)
+            return "snapshot"
+
+        conn = Connection(ws, "luke", resync=resync, max_queue=4, policy=POLICY_RESYNC)
+        conn.start()
+        ws.gate.clear()
+        assert conn.send("first")   # taken by the writer, stuck in send_text
+        await settle()
+        for i in range(4):
+            assert conn.send(f"queued {i}")
+        assert not conn.send("overflow")
+        assert conn.queue_depth() == 1
+        assert conn.dropped == 4
+
+        ws.gate.set()
+        await settle()
+        await conn.close()
+        return ws, conn, snapshots
+
+    ws, conn, snapshots = asyncio.run(scenario())
+    assert ws.sent == ["first", "snapshot"]
+    assert snapshots == [conn]
+    assert ws.closed_with is None
+
+
+def test_slow_consumer_is_disconnected_under_the_disconnect_policy():
+    async def scenario():
+        ws = FakeSocket()
+        conn = Connection(ws, "luke", resync=lambda conn: "snapshot", max_queue=2, policy=POLICY_DISCONNECT)
+        conn.start()
+        ws.gate.clear()
+        conn.send("first")
+        await settle()
+        conn.send("a")
+        conn.send("b")
+        assert not conn.send("overflow")
+        await settle()
+        return ws, conn
+
+    ws, conn = asyncio.run(scenario())
+    assert ws.closed_with == 1013
+    assert conn.closed
+    assert conn.dropped == 2
+    assert not conn.send("late")
+
+
+def test_nothing_to_resync_skips_the_snapshot():
+    async def scenario():
+        ws = FakeSocket()
+        conn = Connection(ws, "luke", resync=lambda conn: None, max_queue=1)
+        conn.start()
+        ws.gate.clear()
+        conn.send("first")
+        await settle()
+        conn.send("a")
+        conn.send("b")
+        ws.gate.set()
+        await settle()
+        conn.send("after")
+        await settle()
+        await conn.close()
+        return ws.sent
+
+    assert asyncio.run(scenario()) == ["first", "after"]
@@ -0,0 +1,68 @@
+import heapq
+import pytest
+from app.game.game_manager import GameManager
+from app.game.services.dispatcher import BadRequest, Dispatcher, merge_metrics, merge_stats
+from app.game.services.registry import GameRegistry
+
+
+def test_room_less_requests_follow_room_id_and_worker():
+    dispatcher = Dispatcher([9001, 9002, 9003])
+    owner = dispatcher.worker_for("room-7")
+    assert dispatcher.route("GET", "/debug/tracing?room_id=room-7", b"")[0] == owner
+    assert dispatcher.route("POST", "/debug/profile?seconds=5&worker=2", b"")[0] == 2
+    assert dispatcher.route("GET", "/layout_pool", b"")[0] == 0
+    with pytest.raises(BadRequest):
+        dispatcher.route("GET", "/debug/profile?worker=3", b"")
+
+
+def test_cursor_pages_merge_across_workers():
+    registries = [GameRegistry(shards=2), GameRegistry(shards=2)]
+    rooms = [f"room-{i}" for i in range(25)]
+    for i, room_id in enumerate(rooms):
+        registries[i % 2].put_game(room_id, GameManager("a", "b", seed=i))
+
+    seen, keys, cursor = [], [], None
+    while True:
+        pages, more = [], False
+        for registry in registries:
+            _, page, next_cursor = registry.list(cursor=cursor, limit=4)
+            pages.append(page)
+            more = more or next_cursor is not None
+        page = list(heapq.merge(*pages, key=lambda g: (g["created"], g["room_id"])))[:4]
+        seen.extend(g["room_id"] for g in page)
+        keys.extend((g["created"], g["room_id"]) for g in page)
+        if not (more or sum(map(len, pages)) > len(page)):
+            break
+        cursor = f"{page[-1]['created']!r}:{page[-1]['room_id']}"
+
+    assert sorted(seen) == sorted(rooms) and len(seen) == len(rooms)
+    assert keys == sorted(keys)
+
+
+def test_merge_stats_sums_counts_and_keeps_settings():
+    merged = merge_stats([
+        {"rooms": 3, "games": {"active": 1}, "shards": [1, 2], "turn_timeout": 60.0, "backend": "memory"},
+        {"rooms": 4, "games": {"active": 2, "finished": 1}, "shards": [4], "turn_timeout": 60.0, "backend": "memory"},
+    ])
+    assert merged == {"rooms": 7, "games": {"active": 3, "finished": 1}, "shards": [1, 2, 4],
+                      "turn_timeout": 60.0, "backend": "memory"}
+
+
+def test_merge_metrics_labels_samples_and_keeps_families_together():
+    worker = (
+        "# HELP games Rooms by game status\n# TYPE games gauge\n"
+        'games{status="active"} 2\n'
+        "# HELP games_finished Games played to a winner\n# TYPE games_finished counter\n"
+        "games_finished_total 5\n"
+    )
+    text = merge_metrics([(0, worker), (1, worker)])
+    assert text.splitlines() == [
+        "# HELP games Rooms by game status",
+        "# TYPE games gauge",
+        'games{worker="0",status="active"} 2',
+        'games{worker="1",status="active"} 2',
+        "# HELP games_finished Games played to a winner",
+        "# TYPE games_finished counter",
+        'games_finished_total{worker="0"} 5',
+        'games_finished_total{worker="1"} 5',
+    ]
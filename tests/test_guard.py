@@ -0,0 +1,37 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from app.interservice import guard
+from app.game.services import game_service
+
+app = FastAPI()
+
+
+@app.get("/internal/thing", dependencies=[Depends(guard.require_internal)])
+def thing():
+    return {"ok": True}
+
+
+def client(host):
+    return TestClient(app, client=(host, 50000))
+
+
+def test_without_a_token_only_loopback_gets_in(monkeypatch):
+    monkeypatch.setattr(guard, "INTERNAL_TOKEN", "")
+    assert client("127.0.0.1").get("/internal/thing").status_code == 200
+    assert client("10.0.0.7").get("/internal/thing").status_code == 403
+
+
+@pytest.mark.parametrize("host", ["127.0.0.1", "10.0.0.7"])
+def test_with_a_token_every_caller_must_send_it(monkeypatch, host):
+    monkeypatch.setattr(guard, "INTERNAL_TOKEN", "s3cret")
+    assert client(host).get("/internal/thing").status_code == 403
+    assert client(host).get("/internal/thing", headers={guard.TOKEN_HEADER: "wrong"}).status_code == 403
+    assert client(host).get("/internal/thing", headers=guard.token_headers()).status_code == 200
+
+
+def test_debug_routes_are_off_unless_enabled():
+    assert not game_service.DEBUG_ENDPOINTS
+    paths = {route.path for route in game_service.app.routes}
+    assert "/debug/tracing" not in paths and "/debug/profile" not in paths
+    assert "/debug/tracing" in {route.path for route in game_service.debug.routes}
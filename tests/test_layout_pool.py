@@ -0,0 +1,33 @@
+import time
+import pytest
+from app.game.layout_pool import LayoutPool
+
+
+def test_pool_fills_up_to_its_size_and_serves_hits():
+    pool = LayoutPool(size=4)
+    pool.start()
+    try:
+        deadline = time.monotonic() + 5
+        while pool.stats()["ready"] < 4:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert pool.stats()["ready"] == 4
+        assert pool.get()
+        assert pool.hits == 1
+    finally:
+        pool.stop()
+
+
+def test_size_zero_turns_the_pool_off():
+    pool = LayoutPool(size=0)
+    pool.start()
+    assert not pool.stats()["running"]
+    assert pool.get()
+    assert (pool.hits, pool.misses) == (0, 1)
+    assert pool.stats()["ready"] == 0
+
+
+def test_negative_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        LayoutPool(size=-1)
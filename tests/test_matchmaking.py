@@ -0,0 +1,79 @@
+import pytest
+from app.room.matchmaking import MatchQueue, THROUGHPUT_WINDOW
+
+
+def names(pairs):
+    return [(a.username, b.username) for a, b in pairs]
+
+
+@pytest.fixture
+def make_queue(clock):
+    def make(*players, **kwargs):
+        queue = MatchQueue(clock=clock, **kwargs)
+        for player in players:
+            queue.enqueue(player)
+        return queue
+
+    return make
+
+
+def test_pairs_are_taken_oldest_first_up_to_the_batch(make_queue):
+    queue = make_queue("a", "b", "c", "d", "e", batch=1)
+    assert names(queue.take_pairs()) == [("a", "b")]
+    assert names(queue.take_pairs()) == [("c", "d")]
+    assert queue.take_pairs() == []
+    assert len(queue) == 1 and "e" in queue
+
+
+def test_failed_pairs_go_back_to_the_front_in_their_old_order(make_queue):
+    queue = make_queue("a", "b", "c", "d", "e")
+    pairs = queue.take_pairs()
+    assert names(pairs) == [("a", "b"), ("c", "d")]
+    queue.enqueue("f")
+    # the matchmaker requeues failed pairs newest first
+    for pair in reversed(pairs):
+        queue.requeue(pair)
+
+    assert queue.requeued == 2
+    assert names(queue.take_pairs()) == [("a", "b"), ("c", "d"), ("e", "f")]
+
+
+def test_requeue_skips_players_who_joined_again(make_queue):
+    queue = make_queue("a", "b")
+    pair = queue.take_pairs()[0]
+    queue.enqueue("b")
+    queue.requeue(pair)
+    assert names(queue.take_pairs()) == [("a", "b")]
+
+
+def test_positions_and_cancellation(make_queue):
+    queue = make_queue("a", "b", "c")
+    assert queue.enqueue("b") == 2  # already waiting: keeps the place
+    assert queue.enqueue("d") == 4
+    assert queue.cancel("b") and not queue.cancel("b")
+    assert queue.enqueue("d") == 3
+    assert queue.cancelled == 1
+
+
+def test_matches_record_waits_and_status(make_queue, clock):
+    queue = make_queue("a", "b", "c")
+    clock.now += 4
+    pair = queue.take_pairs()[0]
+    queue.matched(pair, "room-1")
+
+    assert queue.status("a") == {"status": "matched", "room_id": "room-1"}
+    assert queue.status("c") == {"status": "queued", "waited": 4}
+    assert queue.status("z") == {"status": "idle"}
+    assert queue.wait.count == 2
+    assert queue.stats()["matches"] == 1
+
+
+def test_match_times_are_pruned_without_reading_stats(make_queue, clock):
+    queue = make_queue()
+    for i in range(50):
+        queue.enqueue(f"a{i}")
+        queue.enqueue(f"b{i}")
+        queue.matched(queue.take_pairs()[0], f"room-{i}")
+        clock.now += THROUGHPUT_WINDOW / 10
+    assert len(queue._match_times) <= 11
+    assert queue.stats()["matches"] == 50
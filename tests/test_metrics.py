@@ -0,0 +1,36 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.metrics import MetricsRegistry, instrument
+
+
+def test_per_scrape_runs_once_for_every_gauge_of_a_render():
+    metrics = MetricsRegistry()
+    calls = []
+
+    def walk():
+        calls.append(1)
+        return {"queued": 3, "deepest": 2}
+
+    scraped = metrics.per_scrape(walk)
+    metrics.gauge("queued", "Frames queued", fn=lambda: scraped()["queued"])
+    metrics.gauge("deepest", "Deepest queue", fn=lambda: scraped()["deepest"])
+
+    text = metrics.render()
+    assert "queued 3" in text and "deepest 2" in text
+    assert len(calls) == 1
+    metrics.render()
+    assert len(calls) == 2
+
+
+def test_scrapes_render_on_the_event_loop():
+    app = FastAPI()
+    metrics = MetricsRegistry()
+    instrument(app, metrics)
+    # raises (and fails the scrape) unless called on the loop's own thread
+    metrics.gauge("on_loop", "1 when rendered on the event loop", fn=lambda: int(asyncio.get_running_loop() is not None))
+
+    with TestClient(app) as client:
+        r = client.get("/metrics")
+    assert r.status_code == 200
+    assert "on_loop 1" in r.text
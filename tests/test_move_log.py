@@ -0,0 +1,98 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.game.game_manager import GameManager
+from app.game.logic import BitBoard, Board, BOARD_SIZE
+from app.game.services import game_service
+
+CELLS = [(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)]
+
+
+def play(gm, shots=None):
+    """Each player fires down the grid in order; returns every Move, until ``shots`` or a winner."""
+    next_cell = {player: 0 for player in gm.players}
+    moves = []
+    while not gm.winner and (shots is None or len(moves) < shots):
+        player = gm.current_turn
+        row, col = CELLS[next_cell[player]]
+        next_cell[player] += 1
+        gm.make_move(player, row, col)
+        moves.append(gm.last_move)
+    return moves
+
+
+@pytest.mark.parametrize("board_cls", [BitBoard, Board])
+def test_log_replays_every_move(board_cls):
+    gm = GameManager("luke", "leia", board_cls=board_cls, seed=11)
+    moves = play(gm)
+
+    assert gm.winner
+    assert any(m.result.startswith("sunk ") for m in moves)
+    assert len(gm.log) == 2 * len(moves)
+    assert gm.moves_since(0) == moves
+    assert gm.moves_since(len(moves) - 3) == moves[-3:]
+    assert gm.moves_since(gm.seq) == []
+
+
+def test_log_survives_to_state():
+    gm = GameManager("luke", "leia", seed=11)
+    moves = play(gm, shots=20)
+    restored = GameManager.from_state(json.loads(json.dumps(gm.to_state())))
+    assert restored.moves_since(0) == moves
+
+
+def test_gaps_the_log_cannot_cover_need_a_snapshot():
+    gm = GameManager("luke", "leia", seed=11)
+    play(gm, shots=5)
+    assert gm.moves_since(gm.seq + 1) is None
+    assert gm.moves_since(-1) is None
+
+    # a game saved before the log existed starts its history at its seq
+    state = gm.to_state()
+    del state["log"], state["log_start"]
+    restored = GameManager.from_state(state)
+    assert restored.moves_since(0) is None
+    assert restored.moves_since(5) == []
+
+
+def test_reconnect_with_since_gets_only_the_missed_moves():
+    gm = GameManager("luke", "leia", seed=11)
+    moves = play(gm, shots=6)
+    game_service.registry.put_game("resume-room", gm)
+
+    with TestClient(game_service.app) as client:
+        with client.websocket_connect("/ws/resume-room?player=luke&v=2&since=4") as ws:
+            frame = ws.receive_json()
+            assert frame["event"] == "resume"
+            assert (frame["since"], frame["seq"]) == (4, 6)
+            assert frame["moves"] == [[m.seq, m.player, m.target, m.row, m.col, m.result] for m in moves[4:]]
+
+            ws.send_json({"action": "resume", "seq": 0})
+            frame = ws.receive_json()
+            assert frame["event"] == "resume" and len(frame["moves"]) == 6
+
+            # ahead of the game: the log cannot help, so a full snapshot comes instead
+            ws.send_json({"action": "resume", "seq": 99})
+            frame = ws.receive_json()
+            assert frame["event"] == "resync" and "boards" in frame and frame["seq"] == 6
+
+
+def test_replay_streams_the_finished_game():
+    gm = GameManager("luke", "leia", seed=11)
+    moves = play(gm)
+    game_service.registry.put_game("replay-room", gm)
+    game_service.registry.put_game("unfinished-room", GameManager("luke", "leia", seed=1))
+
+    with TestClient(game_service.app) as client:
+        r = client.get("/game/replay-room/replay")
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        header, *lines = [json.loads(line) for line in r.text.splitlines()]
+
+        assert client.get("/game/unfinished-room/replay").status_code == 409
+        assert client.get("/game/no-such-room/replay").status_code == 404
+
+    assert header == {"game_id": "replay-room", "players": ["luke", "leia"], "winner": gm.winner,
+                      "first_seq": 1, "moves": len(moves)}
+    assert lines == [{"seq": m.seq, "by": m.player, "target": m.target, "row": m.row, "col": m.col,
+                      "result": m.result} for m in moves]
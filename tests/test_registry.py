@@ -0,0 +1,166 @@
+from app.game.game_manager import GameManager
+from app.game.services.registry import STATUS_ACTIVE, STATUS_FINISHED
+
+
+def new_game():
+    return GameManager("luke", "leia", seed=7)
+
+
+def finish(game):
+    game.winner = game.players[0]
+
+
+def test_least_recently_used_room_goes_first_above_capacity(make_registry, evicted):
+    registry = make_registry(max_games=2)
+    registry.put_game("a", new_game())
+    registry.put_game("b", new_game())
+    registry.touch("a")  # b is now the least recently used
+    registry.put_game("c", new_game())
+
+    assert evicted == ["b"]
+    assert "a" in registry and "c" in registry and "b" not in registry
+    assert registry.evicted == 1
+
+
+def test_rooms_with_sockets_survive_capacity_pressure(make_registry, evicted):
+    registry = make_registry(max_games=1)
+    registry.put_game("a", new_game())
+    registry.add_client("a", object(), object())
+    registry.put_game("b", new_game())
+
+    assert "a" in registry
+    assert evicted == ["b"]
+
+
+def test_idle_rooms_expire_after_idle_ttl(make_registry, clock, evicted):
+    registry = make_registry(idle_ttl=60, finished_ttl=10)
+    registry.put_game("a", new_game())
+    clock.now += 59
+    assert registry.sweep() == 0
+    clock.now += 1
+    assert registry.sweep() == 1
+    assert evicted == ["a"]
+
+
+def test_finished_games_expire_after_finished_ttl(make_registry, clock, evicted):
+    registry = make_registry(idle_ttl=3600, finished_ttl=10)
+    game = new_game()
+    registry.put_game("a", game)
+    registry.put_game("b", new_game())
+    finish(game)
+    registry.touch("a")
+    assert registry.get("a").status == STATUS_FINISHED
+    assert registry.get("b").status == STATUS_ACTIVE
+
+    clock.now += 10
+    registry.sweep()
+    assert evicted == ["a"]
+    assert "b" in registry
+
+
+def test_connected_rooms_never_expire(make_registry, clock):
+    registry = make_registry(idle_ttl=1)
+    registry.put_game("a", new_game())
+    ws = object()
+    registry.add_client("a", ws, object())
+    clock.now += 100
+    assert registry.sweep() == 0
+
+    registry.remove_client("a", ws)
+    clock.now += 1
+    assert registry.sweep() == 1
+
+
+def test_socket_only_rooms_are_dropped_when_the_last_socket_leaves(make_registry, evicted):
+    registry = make_registry()
+    ws = object()
+    registry.add_client("lobby", ws, object())
+    registry.remove_client("lobby", ws)
+    assert "lobby" not in registry
+    assert evicted == []  # no game, nothing to report
+
+
+def test_lookups_do_not_create_rooms(make_registry):
+    registry = make_registry()
+    assert registry.lock("nope") is None
+    assert registry.game("nope") is None
+    assert registry.get("nope") is None
+    assert len(registry) == 0
+
+    registry.put_game("a", new_game())
+    assert registry.lock("a") is registry.get("a").lock
+
+
+def test_sweep_step_walks_one_shard_per_call(make_registry, clock, evicted):
+    registry = make_registry(shards=4, idle_ttl=1)
+    for i in range(20):
+        registry.put_game(f"room-{i}", new_game())
+    clock.now += 5
+    for _ in range(4):
+        registry.sweep_step()
+    assert len(registry) == 0
+    assert sorted(evicted) == sorted(f"room-{i}" for i in range(20))
+
+
+def test_stats_counts_without_the_deep_size_estimate(make_registry):
+    registry = make_registry()
+    registry.put_game("a", new_game())
+    registry.add_client("b", object(), object())
+
+    stats = registry.stats()
+    assert stats["rooms"] == 2
+    assert stats["games"] == {"waiting": 1, "active": 1, "finished": 0}
+    assert stats["clients"] == 1
+    assert "approx_bytes" not in stats
+
+    memory = registry.memory_stats()
+    assert memory["approx_bytes_per_game"] > 0
+    assert memory["approx_bytes"] == memory["approx_bytes_per_game"]
+
+
+def test_restored_finished_games_expire_after_finished_ttl(make_registry, clock, evicted):
+    registry = make_registry(idle_ttl=3600, finished_ttl=10)
+    game = new_game()
+    finish(game)
+    registry.restore({"done": game.to_state(), "live": new_game().to_state()})
+    assert registry.get("done").finished_at == clock.now
+
+    clock.now += 10
+    registry.sweep()
+    assert evicted == ["done"]
+    assert "live" in registry
+
+
+def test_list_follows_status_changes_and_evictions(make_registry, clock):
+    registry = make_registry(idle_ttl=60)
+    games = {}
+    for i in range(6):
+        games[f"room-{i}"] = GameManager("luke" if i % 2 else "han", "leia", seed=i)
+        registry.put_game(f"room-{i}", games[f"room-{i}"])
+    registry.add_client("lobby", object(), object())
+    finish(games["room-1"])
+    registry.touch("room-1")
+    finish(games["room-4"])
+    registry.touch("room-4")
+
+    def ids(**filters):
+        return [game["room_id"] for game in registry.list(**filters)[1]]
+
+    assert ids() == [f"room-{i}" for i in range(6)] + ["lobby"]
+    assert ids(status="waiting") == ["lobby"]
+    assert ids(status="finished") == ["room-1", "room-4"]
+    assert ids(status="active", player="luke") == ["room-3", "room-5"]
+    assert ids(player="han") == ["room-0", "room-2", "room-4"]
+    assert ids(player="nobody") == [] and ids(status="bogus") == []
+
+    total, page, cursor = registry.list(status="active", limit=2)
+    assert total == 4 and [g["room_id"] for g in page] == ["room-0", "room-2"]
+    _, page, cursor = registry.list(status="active", cursor=cursor, limit=2)
+    assert [g["room_id"] for g in page] == ["room-3", "room-5"] and cursor is None
+
+    clock.now += 30
+    registry.touch("room-3")
+    clock.now += 30
+    registry.sweep()
+    assert ids() == ["room-3", "lobby"]
+    assert ids(player="han") == [] and ids(status="finished") == []
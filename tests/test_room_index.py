@@ -0,0 +1,35 @@
+from app.room.room_index import STATUS_FINISHED, STATUS_STARTED, STATUS_WAITING
+
+
+def test_pages_follow_the_status_and_host_indexes(make_index):
+    index = make_index()
+    for i in range(5):
+        index.add(f"r{i}", {"host": "luke" if i % 2 else "leia", "guest": None, "status": STATUS_WAITING})
+    index.update("r3", status=STATUS_STARTED)
+
+    page, cursor, total = index.list(status=STATUS_WAITING, limit=2)
+    assert [room["room_id"] for room in page] == ["r4", "r2"]
+    assert total == 4
+    page, cursor, _ = index.list(status=STATUS_WAITING, limit=2, cursor=cursor)
+    assert [room["room_id"] for room in page] == ["r1", "r0"]
+    assert cursor is None
+
+    page, _, total = index.list(status=STATUS_WAITING, host="luke")
+    assert [room["room_id"] for room in page] == ["r1"]
+
+
+def test_finished_rooms_are_evicted_after_finished_ttl(make_index, clock, evicted):
+    index = make_index(finished_ttl=300)
+    index.add("done", {"host": "luke", "guest": "leia", "status": STATUS_STARTED})
+    index.add("playing", {"host": "leia", "guest": "luke", "status": STATUS_STARTED})
+    index.update("done", status=STATUS_FINISHED, winner="luke")
+    assert index.get("done")["finished_at"] == clock.now
+
+    clock.now += 299
+    assert index.sweep() == 0
+    clock.now += 1
+    assert index.sweep() == 1
+
+    assert evicted == [("done", STATUS_FINISHED)]
+    assert "done" not in index and "playing" in index
+    assert index.stats()["by_status"][STATUS_FINISHED] == 0
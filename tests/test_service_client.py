@@ -0,0 +1,162 @@
+import asyncio
+import httpx
+import pytest
+from app.interservice import client as client_module
+from app.interservice.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from app.interservice.client import ServiceClient
+from app.interservice.histogram import LatencyHistogram
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(client_module, "BACKOFF_BASE", 0.0)
+
+
+def run(handler, calls, **kwargs):
+    """Run ``calls(client)`` against a ServiceClient whose "user" target answers with ``handler``."""
+    async def main():
+        client = ServiceClient({"user": "http://user"}, **kwargs)
+        await client.start()
+        await client._client.aclose()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await calls(client)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(main())
+
+
+def answers(*outcomes):
+    """A handler giving these outcomes in turn: a status code, or an exception class to raise."""
+    seen = []
+
+    def handler(request):
+        outcome = outcomes[min(len(seen), len(outcomes) - 1)]
+        seen.append(request.method)
+        if isinstance(outcome, int):
+            return httpx.Response(outcome)
+        raise outcome("boom", request=request)
+
+    return handler, seen
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers_through_one_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.before_call("user")
+    breaker.record_failure()
+    breaker.before_call("user")
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("user")
+
+    clock.now += 10
+    breaker.before_call("user")  # the trial call
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("user")  # only one trial at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.opened_at == clock.now
+
+    clock.now += 10
+    breaker.before_call("user")
+    breaker.record_success()
+    assert breaker.stats() == {"state": CLOSED, "consecutive_failures": 0, "rejected": 2}
+
+
+def test_a_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, clock=clock)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_an_abandoned_trial_frees_the_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_call("user")
+    breaker.abandon()
+    breaker.before_call("user")
+    assert breaker.state == HALF_OPEN
+
+
+def test_idempotent_calls_are_retried_on_retry_statuses_and_transport_errors():
+    handler, seen = answers(503, httpx.ReadTimeout, 200)
+
+    async def calls(client):
+        response = await client.get("user", "/users/luke")
+        return response.status_code, client.targets["user"].stats()
+
+    status, stats = run(handler, calls, retries=2)
+    assert status == 200 and seen == ["GET"] * 3
+    assert (stats["requests"], stats["retries"], stats["errors"]) == (3, 2, 2)
+    assert stats["breaker"]["state"] == CLOSED
+    assert stats["latency"]["count"] == 3
+
+
+def test_idempotent_calls_give_up_after_the_retries():
+    handler, seen = answers(httpx.ConnectError)
+
+    async def calls(client):
+        with pytest.raises(httpx.ConnectError):
+            await client.get("user", "/users/luke")
+
+    run(handler, calls, retries=2)
+    assert len(seen) == 3
+
+
+def test_other_calls_are_retried_only_when_nothing_was_sent():
+    async def post(client):
+        try:
+            return (await client.post("user", "/internal/game_finished")).status_code
+        except httpx.TransportError as e:
+            return type(e)
+
+    handler, seen = answers(httpx.ConnectError, 200)
+    assert run(handler, post) == 200 and len(seen) == 2
+
+    handler, seen = answers(httpx.ReadTimeout, 200)
+    assert run(handler, post) is httpx.ReadTimeout and len(seen) == 1
+
+    handler, seen = answers(503, 200)
+    assert run(handler, post) == 503 and len(seen) == 1
+
+
+def test_an_explicitly_idempotent_post_is_retried():
+    handler, seen = answers(502, 200)
+
+    async def calls(client):
+        return (await client.post("user", "/internal/x", idempotent=True)).status_code
+
+    assert run(handler, calls) == 200 and seen == ["POST", "POST"]
+
+
+def test_an_open_breaker_fails_fast_without_calling_the_target(monkeypatch):
+    monkeypatch.setattr(client_module, "BREAKER_FAILURES", 2)
+    handler, seen = answers(503)
+
+    async def calls(client):
+        for _ in range(2):
+            assert (await client.post("user", "/internal/x")).status_code == 503
+        with pytest.raises(CircuitOpenError):
+            await client.post("user", "/internal/x")
+        return client.targets["user"].stats()["breaker"]
+
+    breaker = run(handler, calls)
+    assert len(seen) == 2
+    assert breaker == {"state": OPEN, "consecutive_failures": 2, "rejected": 1}
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = LatencyHistogram(buckets=(0.01, 0.1, 1.0, float("inf")))
+    assert histogram.quantile(0.5) is None
+    for seconds in (0.005, 0.01, 0.05, 0.5, 0.5, 2.0):
+        histogram.observe(seconds)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.01": 2, "0.1": 1, "1.0": 2, "+Inf": 1}
+    assert snapshot["count"] == 6 and snapshot["sum"] == pytest.approx(3.065)
+    assert (snapshot["p50"], snapshot["p90"], snapshot["p99"]) == (0.1, float("inf"), float("inf"))
@@ -0,0 +1,23 @@
+import pytest
+from app.game.simulate import main, simulate
+
+
+def test_zero_games_reports_no_rates():
+    report = simulate(0)
+    assert report["games"] == 0
+    assert report["win_rate"] == {"a": None, "b": None}
+    assert report["first_player_win_rate"] is None
+
+
+def test_small_run_adds_up():
+    report = simulate(6, chunk=4)
+    assert report["games"] == 6
+    assert sum(report["win_rate"].values()) + report["unfinished"] / 6 == pytest.approx(1)
+
+
+@pytest.mark.parametrize("flag", ["--games", "--workers", "--chunk"])
+def test_cli_rejects_counts_below_one(flag, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main([flag, "0"])
+    assert exc.value.code == 2
+    assert "must be at least 1" in capsys.readouterr().err
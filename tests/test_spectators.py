@@ -0,0 +1,75 @@
+import asyncio
+from app.game.services.spectators import SpectatorChannel
+
+
+class FakeConn:
+    """Stands in for a Connection: records the frames handed to ``send``."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, frame):
+        self.sent.append(frame)
+        return True
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_each_protocol_group_gets_its_own_frame():
+    async def scenario():
+        channel = SpectatorChannel()
+        full, delta = FakeConn(), FakeConn()
+        channel.add(full, delta=False)
+        channel.add(delta, delta=True)
+        channel.publish("boards-1", b"move-1")
+        channel.publish("boards-2", b"move-2")
+        before = (list(full.sent), list(delta.sent))
+        await settle()
+        return before, full.sent, delta.sent, channel.stats()
+
+    before, full, delta, stats = asyncio.run(scenario())
+    assert before == ([], [])  # publish only queues; the pump sends
+    assert full == ["boards-1", "boards-2"]
+    assert delta == [b"move-1", b"move-2"]
+    assert stats == {"spectators": 2, "pending": 0, "published": 2}
+
+
+def test_frames_for_an_empty_or_skipped_group_are_not_queued():
+    async def scenario():
+        channel = SpectatorChannel()
+        delta = FakeConn()
+        channel.add(delta, delta=True)
+        channel.publish("boards", None)      # no full spectators, no delta frame
+        channel.publish("boards", b"move")   # only the delta half goes out
+        await settle()
+        return delta.sent, channel.published
+
+    sent, published = asyncio.run(scenario())
+    assert sent == [b"move"]
+    assert published == 1
+
+
+def test_fan_out_yields_between_chunks_and_skips_departed_spectators():
+    async def scenario():
+        channel = SpectatorChannel(chunk=2)
+        conns = [FakeConn() for _ in range(5)]
+        for conn in conns:
+            channel.add(conn, delta=True)
+        channel.publish(None, b"move-1")
+        await asyncio.sleep(0)  # the pump sends one chunk, then yields
+        partial = sum(len(conn.sent) for conn in conns)
+        await settle()
+
+        channel.discard(conns[0])
+        channel.publish(None, b"move-2")
+        await settle()
+        return partial, [conn.sent for conn in conns], len(channel)
+
+    partial, sent, spectators = asyncio.run(scenario())
+    assert partial == 2
+    assert sent[0] == [b"move-1"]
+    assert sent[1:] == [[b"move-1", b"move-2"]] * 4
+    assert spectators == 4
@@ -0,0 +1,103 @@
+import sqlite3
+import time
+import pytest
+from app.game.game_manager import GameManager
+from app.game.services import game_service
+from app.storage import MemoryStorage
+from app.storage.sqlite import SQLiteStorage
+
+
+class FailingConnection:
+    """Wraps the real connection; the next ``fail`` executemany calls raise."""
+
+    def __init__(self, conn, fail=1):
+        self.conn = conn
+        self.fail = fail
+
+    def execute(self, *args):
+        return self.conn.execute(*args)
+
+    def executemany(self, *args):
+        if self.fail:
+            self.fail -= 1
+            raise sqlite3.OperationalError("disk I/O error")
+        return self.conn.executemany(*args)
+
+    def close(self):
+        self.conn.close()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    # flush by hand only: the background thread waits an hour between ticks
+    store = SQLiteStorage(str(tmp_path / "battleship.db"), flush_interval=3600)
+    yield store
+    store.close()
+
+
+def test_writes_round_trip(storage):
+    storage.add_user("luke")
+    storage.save_room("r1", {"host": "luke"})
+    storage.save_game("g1", {"seq": 3})
+    storage.save_game("g2", {"seq": 1})
+    storage.delete_game("g2")
+    storage.flush()
+
+    assert storage.load_users() == ["luke"]
+    assert storage.load_rooms() == {"r1": {"host": "luke"}}
+    assert storage.load_games() == {"g1": {"seq": 3}}
+
+
+def test_failed_commit_keeps_the_batch_without_overwriting_newer_writes(storage):
+    storage.save_game("g1", {"seq": 1})
+    storage.save_game("g2", {"seq": 1})
+    storage._conn = FailingConnection(storage._conn)
+
+    with pytest.raises(sqlite3.OperationalError):
+        storage.flush()
+    assert storage.stats()["failures"] == 1
+    assert storage.stats()["pending"] == 2
+
+    storage.save_game("g1", {"seq": 2})  # newer than the failed batch
+    storage.flush()
+    assert storage.load_games() == {"g1": {"seq": 2}, "g2": {"seq": 1}}
+    assert storage.stats()["pending"] == 0
+
+
+def test_flush_thread_survives_a_failed_commit(tmp_path):
+    store = SQLiteStorage(str(tmp_path / "battleship.db"), flush_interval=0.01)
+    try:
+        store._conn = FailingConnection(store._conn, fail=3)
+        store.save_game("g1", {"seq": 1})
+        for _ in range(500):
+            if store.commits:
+                break
+            time.sleep(0.01)
+        assert store._thread.is_alive()
+        assert store.failures >= 1
+        assert store.commits >= 1
+    finally:
+        store.close()
+    reopened = SQLiteStorage(str(tmp_path / "battleship.db"))
+    assert reopened.load_games() == {"g1": {"seq": 1}}
+    reopened.close()
+
+
+def test_only_the_sqlite_backend_is_durable(storage):
+    assert storage.durable
+    assert not MemoryStorage().durable
+
+
+def test_moves_are_snapshotted_only_into_a_durable_backend(monkeypatch, storage):
+    game = GameManager("luke", "leia", seed=3)
+    game_service.registry.put_game("snapshots", game)
+    memory = MemoryStorage()
+
+    monkeypatch.setattr(game_service, "storage", memory)
+    game_service.play_move("snapshots", game, "luke", 0, 0)
+    assert memory.games == {}
+
+    monkeypatch.setattr(game_service, "storage", storage)
+    game_service.play_move("snapshots", game, game.current_turn, 1, 1)
+    storage.flush()
+    assert storage.load_games()["snapshots"]["seq"] == 2
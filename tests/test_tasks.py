@@ -0,0 +1,36 @@
+import asyncio
+import gc
+import logging
+from app.common import tasks
+
+
+def test_spawned_tasks_survive_garbage_collection_and_are_released():
+    async def scenario():
+        done = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            done.set()
+
+        tasks.spawn(work())
+        gc.collect()
+        assert tasks.running() == 1
+        await asyncio.wait_for(done.wait(), 1)
+        await asyncio.sleep(0)
+        return tasks.running()
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_failures_are_logged(caplog):
+    async def boom():
+        raise RuntimeError("room service down")
+
+    async def scenario():
+        task = tasks.spawn(boom())
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    with caplog.at_level(logging.ERROR, logger="app.common.tasks"):
+        asyncio.run(scenario())
+    assert "room service down" in caplog.text
@@ -0,0 +1,33 @@
+import random
+from app.game.services.tracing import MoveTrace, MoveTracer
+
+
+def test_spans_add_up_to_the_wall_time(clock):
+    clock.now = 0.0  # absolute times below keep the spans exact in binary
+    trace = MoveTrace("r1", "luke", clock=clock)
+    clock.now = 0.001
+    trace.mark("lock_wait")
+    clock.now = 0.003
+    trace.add("make_move", 0.002)  # measured by the caller, ended just now
+    clock.now = 0.004
+    trace.mark("save")
+    clock.now = 0.0045
+    trace.add("fanout", 0.0005)
+
+    assert trace.spans == [("lock_wait", 0.001), ("make_move", 0.002), ("save", 0.001), ("fanout", 0.0005)]
+    assert trace.to_dict()["total_us"] == 4500.0
+
+
+def test_tracer_samples_one_room_until_it_expires(clock):
+    tracer = MoveTracer(capacity=2, rng=random.Random(1), clock=clock)
+    assert tracer.begin("r1", "luke") is None
+
+    tracer.configure(1.0, room_id="r1", duration=10)
+    assert tracer.begin("r2", "luke") is None
+    for _ in range(3):
+        tracer.finish(tracer.begin("r1", "luke"))
+    assert tracer.sampled == 3 and len(tracer.recent()) == 2
+
+    clock.now += 10
+    assert tracer.begin("r1", "luke") is None
+    assert not tracer.enabled
@@ -0,0 +1,137 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.game.services import game_service
+from app.game.services.scheduler import POLICY_AUTO_MOVE, TurnTimers
+from app.interservice import guard
+from app.room import room_service
+from app.room.room_index import STATUS_FINISHED, STATUS_STARTED
+
+
+@pytest.fixture
+def reports(monkeypatch):
+    """What the game service POSTs to the room service, instead of sending it."""
+    sent = []
+
+    async def post(target, path, **kwargs):
+        sent.append((target, path, kwargs["json"]))
+
+    monkeypatch.setattr(game_service.services, "post", post)
+    return sent
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def armed(room_id):
+    return room_id in game_service.scheduler.timers.deadlines
+
+
+def create(client, room_id):
+    r = client.post("/game/create", json={"player1": "luke", "player2": "leia", "room_id": room_id})
+    assert r.status_code == 200
+    return game_service.registry.game(room_id)
+
+
+def test_timers_skip_rearmed_and_cancelled_rooms(clock):
+    timers = TurnTimers(clock)
+    timers.arm("a", 10)
+    timers.arm("b", 5)
+    timers.arm("c", 1)
+    timers.arm("a", 20)  # the first deadline of a is now stale
+    timers.cancel("c")
+
+    clock.now += 10
+    assert timers.due() == ["b"]
+    clock.now += 10
+    assert timers.due() == ["a"]
+    assert len(timers) == 0
+
+
+def test_clock_waits_until_both_players_are_connected():
+    with TestClient(game_service.app) as client:
+        create(client, "clock-seats")
+        assert not armed("clock-seats")
+        with client.websocket_connect("/ws/clock-seats?player=luke&v=2") as luke:
+            luke.receive_json()
+            assert not armed("clock-seats")
+            with client.websocket_connect("/ws/clock-seats?player=leia&v=2") as leia:
+                leia.receive_json()
+                assert armed("clock-seats")
+
+
+def test_first_shot_starts_the_clock():
+    with TestClient(game_service.app) as client:
+        create(client, "clock-shot")
+        with client.websocket_connect("/ws/clock-shot?player=luke&v=2") as luke:
+            luke.receive_json()
+            luke.send_json({"action": "move", "row": 0, "col": 0})
+            assert luke.receive_json()["event"] == "move_made"
+            assert armed("clock-shot")
+
+
+def test_player_without_a_socket_forfeits_as_abandoned(reports):
+    with TestClient(game_service.app) as client:
+        gm = create(client, "clock-abandoned")
+        with client.websocket_connect("/ws/clock-abandoned?player=leia&v=2") as leia:
+            leia.receive_json()
+            client.portal.call(game_service.turn_timeout, "clock-abandoned")  # luke is on turn, not here
+
+            frame = leia.receive_json()
+            assert frame["event"] == "resync" and frame["winner"] == "leia"
+        wait_for(lambda: reports)
+
+    assert gm.winner == "leia"
+    assert not armed("clock-abandoned")
+    assert reports == [("room", "/internal/game_finished",
+                        {"room_id": "clock-abandoned", "winner": "leia", "reason": "abandoned"})]
+
+
+def test_connected_player_gets_auto_moves_then_forfeits(monkeypatch, reports):
+    monkeypatch.setattr(game_service, "TURN_TIMEOUT_POLICY", POLICY_AUTO_MOVE)
+    monkeypatch.setattr(game_service, "MAX_AUTO_MOVES", 2)
+    with TestClient(game_service.app) as client:
+        gm = create(client, "clock-auto")
+        with client.websocket_connect("/ws/clock-auto?player=luke&v=2"), \
+                client.websocket_connect("/ws/clock-auto?player=leia&v=2"):
+            for _ in range(10):
+                player = gm.current_turn
+                fired = game_service.auto_moves.get("clock-auto", {}).get(player, 0)
+                seq = gm.seq
+                client.portal.call(game_service.turn_timeout, "clock-auto")
+                if gm.winner:
+                    break
+                assert gm.seq == seq + 1 and gm.last_move.player == player
+        wait_for(lambda: reports)
+
+    assert fired == 2
+    assert gm.winner == gm.get_opponent(player)
+    assert reports[0][2] == {"room_id": "clock-auto", "winner": gm.winner, "reason": "forfeit"}
+    assert "clock-auto" not in game_service.auto_moves
+
+
+def test_room_service_marks_the_reported_game_finished(monkeypatch):
+    monkeypatch.setattr(guard, "INTERNAL_TOKEN", "")
+    room_service.room_index.add("reported", {"host": "luke", "guest": "leia", "status": STATUS_STARTED})
+    report = {"room_id": "reported", "winner": "leia", "reason": "forfeit"}
+
+    with TestClient(room_service.app, client=("127.0.0.1", 50000)) as client:
+        with client.websocket_connect("/ws/lobby?room_id=reported") as lobby:
+            assert lobby.receive_json()["event"] == "snapshot"
+            assert client.post("/internal/game_finished", json=report).status_code == 200
+            frame = lobby.receive_json()
+            assert frame["event"] == "game_finished" and frame["room_id"] == "reported"
+        room = room_service.room_index.get("reported")
+        assert (room["status"], room["winner"], room["reason"]) == (STATUS_FINISHED, "leia", "forfeit")
+
+        # repeats are no-ops, unknown rooms are 404
+        assert client.post("/internal/game_finished", json={**report, "winner": "luke"}).status_code == 200
+        assert room_service.room_index.get("reported")["winner"] == "leia"
+        assert client.post("/internal/game_finished", json={**report, "room_id": "nope"}).status_code == 404
+
+    with TestClient(room_service.app, client=("10.0.0.7", 50000)) as outsider:
+        assert outsider.post("/internal/game_finished", json=report).status_code == 403